@@ -0,0 +1,22 @@
+"""Static analyses over assembled or linked program images."""
+
+from .flow import Instruction, decode, memory_image
+from .stack import RoutineStack, StackReport, analyze_stack, write_stack_report
+from .wcet import LoopBound, LoopCost, PathStep, RoutineWcet, analyze_wcet, loop_bounds, write_wcet_report
+
+__all__ = [
+    "Instruction",
+    "LoopBound",
+    "LoopCost",
+    "PathStep",
+    "RoutineStack",
+    "RoutineWcet",
+    "StackReport",
+    "analyze_stack",
+    "analyze_wcet",
+    "decode",
+    "loop_bounds",
+    "memory_image",
+    "write_stack_report",
+    "write_wcet_report",
+]
@@ -0,0 +1,95 @@
+"""Instruction decoding and control-flow classification for static analysis.
+
+The analyses work on the assembled bytes rather than on source lines, so the
+same code covers single-file assemblies and linked programs: only bytes that
+are reached by following control flow from an entry point are decoded.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from ..asm import opcodes_mb8861h
+
+_BY_OPCODE: Dict[int, dict] = {spec['opcode']: spec for spec in opcodes_mb8861h.OPCODES}
+
+# Net hardware stack effect of instructions that move S by a fixed amount.
+STACK_EFFECTS: Dict[str, int] = {'PSHA': 1, 'PSHB': 1, 'DES': 1, 'PULA': -1, 'PULB': -1, 'INS': -1}
+# Bytes stacked while an interrupt (SWI, or one taken during WAI) is serviced.
+INTERRUPT_FRAME = 7
+RETURN_ADDRESS = 2
+
+
+@dataclass(frozen=True)
+class Instruction:
+    address: int
+    mnemonic: str
+    addressing: str
+    size: int
+    cycles: int
+    # Absolute target for REL/EXT/DIR, the value for IMM, the offset for IDX.
+    operand: Optional[int]
+
+    @property
+    def next(self) -> int:
+        return (self.address + self.size) & 0xFFFF
+
+    @property
+    def is_call(self) -> bool:
+        return self.mnemonic in ('JSR', 'BSR')
+
+    @property
+    def is_return(self) -> bool:
+        return self.mnemonic in ('RTS', 'RTI')
+
+    @property
+    def is_jump(self) -> bool:
+        return self.mnemonic in ('JMP', 'BRA')
+
+    @property
+    def is_conditional(self) -> bool:
+        return self.addressing == 'REL' and self.mnemonic not in ('BRA', 'BSR')
+
+    @property
+    def target(self) -> Optional[int]:
+        """Destination of a branch, jump or call; None when it is computed from X."""
+        if self.addressing in ('REL', 'EXT'):
+            return self.operand
+        return None
+
+    @property
+    def resets_stack(self) -> bool:
+        return self.mnemonic in ('LDS', 'TXS')
+
+
+def decode(memory: Sequence[int], address: int) -> Optional[Instruction]:
+    """Decode the instruction at `address`, or None for an undefined opcode."""
+
+    spec = _BY_OPCODE.get(memory[address & 0xFFFF])
+    if spec is None:
+        return None
+    size = spec['size']
+    operand: Optional[int] = None
+    if size == 2:
+        operand = memory[(address + 1) & 0xFFFF]
+    elif size == 3:
+        operand = (memory[(address + 1) & 0xFFFF] << 8) | memory[(address + 2) & 0xFFFF]
+    if spec['addressing'] == 'REL' and operand is not None:
+        offset = operand - 0x100 if operand & 0x80 else operand
+        operand = (address + size + offset) & 0xFFFF
+    return Instruction(
+        address=address & 0xFFFF,
+        mnemonic=spec['mnemonic'],
+        addressing=spec['addressing'],
+        size=size,
+        cycles=spec['cycles'],
+        operand=operand,
+    )
+
+
+def memory_image(origin: int, image: bytes) -> bytearray:
+    """Place `image` at `origin` in a zeroed 64 KiB address space."""
+
+    memory = bytearray(0x10000)
+    memory[origin : origin + len(image)] = image[: 0x10000 - origin]
+    return memory
@@ -0,0 +1,190 @@
+"""Static call graph and worst-case hardware stack depth.
+
+Each routine is walked from its first instruction along every branch,
+tracking how many bytes it has pushed (`PSHA`/`PSHB`/`DES` and their
+inverses).  A call adds the return address plus the callee's own worst case,
+so the depth reported for an entry point is the most the hardware stack can
+grow below the S it was entered with.  The hand-managed data stacks used by
+the samples live in ordinary RAM and are not counted.
+
+Anything the walk cannot bound is reported instead of guessed: calls and
+jumps through X, recursion, loops that push without popping, and SWI
+handlers, whose vector is in ROM.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Set, TextIO
+
+from .flow import INTERRUPT_FRAME, RETURN_ADDRESS, STACK_EFFECTS, decode
+
+
+@dataclass
+class RoutineStack:
+    name: str
+    address: int
+    # Deepest push inside the routine itself, not counting calls.
+    frame: int = 0
+    # Worst case including nested calls; None when it cannot be bounded.
+    depth: Optional[int] = 0
+    # Addresses of the routines called, in call-site order.
+    calls: List[int] = field(default_factory=list)
+    # Routines along the deepest path, starting with this one.
+    chain: List[int] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StackReport:
+    entries: List[int]
+    routines: Dict[int, RoutineStack]
+
+    def routine(self, name: str) -> RoutineStack:
+        for routine in self.routines.values():
+            if routine.name == name:
+                return routine
+        raise KeyError(name)
+
+
+def analyze_stack(memory: Sequence[int], entries: Sequence[int], symbols: Mapping[str, int]) -> StackReport:
+    """Walk every routine reachable from `entries` in a 64 KiB `memory` image."""
+
+    names: Dict[int, str] = {}
+    for name, address in symbols.items():
+        names.setdefault(address, name)
+    analyzer = _StackAnalyzer(memory, names)
+    for entry in entries:
+        analyzer.routine(entry)
+    return StackReport(entries=list(entries), routines=analyzer.routines)
+
+
+class _StackAnalyzer:
+    def __init__(self, memory: Sequence[int], names: Mapping[int, str]) -> None:
+        self.memory = memory
+        self.names = names
+        self.routines: Dict[int, RoutineStack] = {}
+        self._active: Set[int] = set()
+
+    def name(self, address: int) -> str:
+        return self.names.get(address, f"${address:04X}")
+
+    def routine(self, address: int) -> RoutineStack:
+        known = self.routines.get(address)
+        if known is not None:
+            return known
+        routine = RoutineStack(name=self.name(address), address=address, chain=[address])
+        self.routines[address] = routine
+        self._active.add(address)
+        try:
+            self._walk(routine)
+        finally:
+            self._active.discard(address)
+        return routine
+
+    def _walk(self, routine: RoutineStack) -> None:
+        depths: Dict[int, int] = {routine.address: 0}
+        pending = [routine.address]
+        deepest = 0
+        deepest_callee: Optional[int] = None
+        bounded = True
+        call_sites: Dict[int, int] = {}
+
+        while pending:
+            pc = pending.pop()
+            depth = depths[pc]
+            instruction = decode(self.memory, pc)
+            if instruction is None:
+                routine.notes.append(f"undefined opcode ${self.memory[pc]:02X} at ${pc:04X}")
+                continue
+            mnemonic = instruction.mnemonic
+            after = depth + STACK_EFFECTS.get(mnemonic, 0)
+            peak = max(depth, after)
+            successors: List[int] = []
+
+            if instruction.is_call:
+                successors.append(instruction.next)
+                target = instruction.target
+                if depth + RETURN_ADDRESS > deepest:
+                    deepest = depth + RETURN_ADDRESS
+                    deepest_callee = None
+                if target is None:
+                    routine.notes.append(f"{mnemonic} ,X at ${pc:04X} not followed")
+                elif target in self._active:
+                    call_sites[target] = min(pc, call_sites.get(target, pc))
+                    routine.notes.append(f"recursive call to {self.name(target)} at ${pc:04X}")
+                    bounded = False
+                else:
+                    call_sites[target] = min(pc, call_sites.get(target, pc))
+                    callee = self.routine(target)
+                    if callee.depth is None:
+                        bounded = False
+                    elif depth + RETURN_ADDRESS + callee.depth > deepest:
+                        deepest = depth + RETURN_ADDRESS + callee.depth
+                        deepest_callee = target
+            elif instruction.is_return:
+                if depth != 0 and mnemonic == 'RTS':
+                    routine.notes.append(f"RTS at ${pc:04X} with {depth} byte(s) still pushed")
+            elif mnemonic in ('SWI', 'WAI'):
+                peak = depth + INTERRUPT_FRAME
+                if mnemonic == 'SWI':
+                    routine.notes.append(f"SWI at ${pc:04X}: handler not followed")
+                successors.append(instruction.next)
+            elif instruction.is_jump:
+                if instruction.target is None:
+                    routine.notes.append(f"JMP ,X at ${pc:04X} not followed")
+                else:
+                    successors.append(instruction.target)
+            elif instruction.is_conditional:
+                successors.extend((instruction.next, instruction.target))
+            else:
+                successors.append(instruction.next)
+
+            if instruction.resets_stack:
+                routine.notes.append(f"{mnemonic} at ${pc:04X} resets S; later depths count from there")
+                after = 0
+            routine.frame = max(routine.frame, peak)
+            if peak > deepest:
+                deepest = peak
+                deepest_callee = None
+
+            for successor in successors:
+                seen = depths.get(successor)
+                if seen is None:
+                    depths[successor] = after
+                    pending.append(successor)
+                elif seen != after:
+                    routine.notes.append(
+                        f"stack depth at ${successor:04X} differs between paths ({seen} vs {after} byte(s))"
+                    )
+                    bounded = False
+
+        routine.calls = sorted(call_sites, key=call_sites.__getitem__)
+        routine.depth = deepest if bounded else None
+        if deepest_callee is not None:
+            routine.chain = [routine.address] + self.routines[deepest_callee].chain
+
+
+def write_stack_report(stream: TextIO, report: StackReport) -> None:
+    """Append the stack table and call graph as `;` comment lines of a `.map` file."""
+
+    order = list(dict.fromkeys(report.entries + sorted(report.routines)))
+    routines = [report.routines[address] for address in order if address in report.routines]
+    width = max([len(routine.name) for routine in routines] + [7])
+
+    stream.write("\n; Hardware stack usage in bytes (DEPTH includes nested calls and return addresses)\n")
+    stream.write(f"; {'ROUTINE':<{width}}  FRAME  DEPTH  DEEPEST CALL CHAIN\n")
+    for routine in routines:
+        depth = "?" if routine.depth is None else str(routine.depth)
+        chain = " > ".join(report.routines[address].name for address in routine.chain)
+        stream.write(f"; {routine.name:<{width}}  {routine.frame:>5}  {depth:>5}  {chain}\n")
+
+    stream.write(";\n; Call graph\n")
+    for routine in routines:
+        callees = ", ".join(report.routines[address].name for address in routine.calls) or "(leaf)"
+        stream.write(f"; {routine.name} -> {callees}\n")
+
+    notes = [(routine.name, note) for routine in routines for note in routine.notes]
+    if notes:
+        stream.write(";\n; Not bounded or not followed\n")
+        for name, note in notes:
+            stream.write(f"; {name}: {note}\n")
@@ -0,0 +1,532 @@
+"""Worst-case execution time of routines from their assembled bytes.
+
+A routine is decoded from its label into an instruction-level control-flow
+graph.  Natural loops (a back edge to a dominating header) are collapsed
+innermost first into single nodes costing::
+
+    iterations * longest iteration + longest exit path
+
+where the longest paths run from the header over the loop body with the
+back edges removed.  Loops that only leave through their closing branch
+(`DECB`/`BNE LOOP`) run the exit path as their last iteration, so one
+iteration is subtracted for them.  What is left is a DAG whose longest path
+from the entry to a return is the worst case.  Calls cost the callee's own
+worst case on top of the `JSR`/`BSR` cycles.
+
+Loop bounds come from the source: a `; @loop N` comment on the loop label,
+its first instruction or its closing branch, or a `FOR_BEGIN` expansion
+from `ctl.inc`, which runs `LIMIT - START + 1` times.  A loop without a
+bound, recursion, and jumps through X make the routine unbounded; the
+reason is reported instead of a number.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, TextIO
+
+from ..asm.encoder import AssemblyResult
+from ..asm.eval import ExpressionError, evaluate
+from ..sim.profile import SourceLine
+from .flow import Instruction, decode
+
+_LOOP_ANNOTATION = re.compile(r"@loop\s+([^\s;]+)", re.IGNORECASE)
+_FOR_BEGIN = re.compile(r"^\s*(?:\w+:)?\s*FOR_BEGIN\s+(.*)$", re.IGNORECASE)
+
+
+@dataclass
+class LoopBound:
+    iterations: int
+    # `file:line` of the annotation or FOR_BEGIN it was read from.
+    origin: str
+
+
+@dataclass
+class LoopCost:
+    header: int
+    iterations: int
+    origin: str
+    # Full iterations before the exit path; one less than `iterations` for bottom-tested loops.
+    repeats: int
+    per_iteration: int
+    exit: int
+    cycles: int
+
+
+@dataclass
+class PathStep:
+    address: int
+    # Everything the step costs: one instruction, a call with its callee, or a whole loop.
+    cycles: int
+    callee: Optional[int] = None
+    loop: Optional[LoopCost] = None
+
+
+@dataclass
+class RoutineWcet:
+    name: str
+    address: int
+    # None when some part of the routine cannot be bounded (see `notes`).
+    cycles: Optional[int]
+    path: List[PathStep] = field(default_factory=list)
+    loops: List[LoopCost] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+
+def loop_bounds(units: Iterable[AssemblyResult], symbols: Mapping[str, int]) -> Dict[int, LoopBound]:
+    """Collect `@loop` annotations and `FOR_BEGIN` bounds by (linked) address.
+
+    Source lines are read back from the files the units were assembled
+    from, so comments on a macro invocation apply to every address it
+    expanded to.
+    """
+
+    bounds: Dict[int, LoopBound] = {}
+    texts: Dict[str, List[str]] = {}
+    for result in units:
+        values = dict(result.symbols)
+        values.update(symbols)
+        delta = 0
+        for emission in result.emissions:
+            if emission.address is None:
+                continue
+            label = emission.line.label
+            if label is not None and label in symbols and label in result.symbols:
+                delta = symbols[label] - result.symbols[label]
+            filename, line_no = result.source_location(emission.line.line_no)
+            text = _source_text(texts, filename, line_no) or emission.line.text
+            bound = _parse_bound(text, values, f"{filename}:{line_no}")
+            if bound is not None:
+                bounds[(emission.address + delta) & 0xFFFF] = bound
+    return bounds
+
+
+def analyze_wcet(
+    memory: Sequence[int],
+    address: int,
+    symbols: Mapping[str, int],
+    bounds: Mapping[int, LoopBound],
+) -> Dict[int, RoutineWcet]:
+    """Worst case of the routine at `address` and of every routine it calls."""
+
+    names: Dict[int, str] = {}
+    for name, value in symbols.items():
+        names.setdefault(value, name)
+    analyzer = _WcetAnalyzer(memory, names, bounds)
+    analyzer.routine(address)
+    return analyzer.routines
+
+
+def write_wcet_report(
+    stream: TextIO,
+    routine: RoutineWcet,
+    routines: Mapping[int, RoutineWcet],
+    lines: Mapping[int, SourceLine],
+    *,
+    clock_hz: int,
+    budget: Optional[int] = None,
+) -> None:
+    """Write the worst case of `routine`, its loops and the path that reaches it."""
+
+    if routine.cycles is None:
+        stream.write(f"{routine.name}: worst case unbounded\n")
+    else:
+        millis = routine.cycles * 1000 / clock_hz
+        stream.write(f"{routine.name}: worst case {routine.cycles} cycles ({millis:.2f} ms @ {clock_hz} Hz)\n")
+        if budget is not None:
+            status = "over" if routine.cycles > budget else "within"
+            stream.write(
+                f"  frame budget {budget} cycles: {routine.cycles * 100 / budget:.1f}% used, {status} budget\n"
+            )
+    for note in _collect_notes(routine, routines):
+        stream.write(f"  ! {note}\n")
+    if routine.loops:
+        stream.write("  loops:\n")
+        for loop in routine.loops:
+            stream.write(
+                f"    ${loop.header:04X}  {_location(lines, loop.header):<24} {loop.iterations} iteration(s):"
+                f" {loop.repeats} x {loop.per_iteration} + {loop.exit} = {loop.cycles} cycles (bound from {loop.origin})\n"
+            )
+    if routine.path:
+        stream.write("  worst path:\n")
+        for step in routine.path:
+            line = lines.get(step.address)
+            text = line.text if line else ""
+            if step.loop is not None:
+                text = f"loop x{step.loop.iterations}: {text}"
+            elif step.callee is not None:
+                callee = routines[step.callee]
+                text = f"{text}  (+{callee.cycles} in {callee.name})"
+            stream.write(f"    ${step.address:04X}  {_location(lines, step.address):<24} {step.cycles:>7}  {text}\n")
+
+
+class _WcetAnalyzer:
+    def __init__(self, memory: Sequence[int], names: Mapping[int, str], bounds: Mapping[int, LoopBound]) -> None:
+        self.memory = memory
+        self.names = names
+        self.bounds = bounds
+        self.routines: Dict[int, RoutineWcet] = {}
+        self._active: Set[int] = set()
+
+    def name(self, address: int) -> str:
+        return self.names.get(address, f"${address:04X}")
+
+    def routine(self, address: int) -> RoutineWcet:
+        known = self.routines.get(address)
+        if known is not None:
+            return known
+        routine = RoutineWcet(name=self.name(address), address=address, cycles=None)
+        self.routines[address] = routine
+        self._active.add(address)
+        try:
+            _RoutineGraph(self, routine).solve()
+        finally:
+            self._active.discard(address)
+        return routine
+
+
+class _RoutineGraph:
+    """Control-flow graph of one routine, collapsed loop by loop."""
+
+    def __init__(self, analyzer: _WcetAnalyzer, routine: RoutineWcet) -> None:
+        self.analyzer = analyzer
+        self.routine = routine
+        self.entry = routine.address
+        self.instructions: Dict[int, Instruction] = {}
+        self.successors: Dict[int, List[int]] = {}
+        self.costs: Dict[int, int] = {}
+        self.callees: Dict[int, int] = {}
+        self.bounded = True
+        # Collapsed loops: node -> header it was folded into, header -> loop.
+        self.owner: Dict[int, int] = {}
+        self.loops: Dict[int, LoopCost] = {}
+        self.loop_exits: Dict[int, Set[int]] = {}
+
+    def note(self, message: str) -> None:
+        self.routine.notes.append(message)
+        self.bounded = False
+
+    def solve(self) -> None:
+        self._discover()
+        if not self.bounded:
+            return
+        for header, body, latches in self._natural_loops():
+            if not self._collapse(header, body, latches):
+                return
+        order = self._topological(self._find(self.entry), None)
+        if order is None:
+            self.note("control flow has a cycle that is not a natural loop")
+            return
+        best, previous = self._longest(order)
+        ends = [node for node in order if not self._next(node)]
+        if not ends:
+            self.note("never returns")
+            return
+        end = max(ends, key=lambda node: best[node])
+        path: List[int] = []
+        node: Optional[int] = end
+        while node is not None:
+            path.append(node)
+            node = previous.get(node)
+        path.reverse()
+        self.routine.cycles = best[end]
+        self.routine.path = [
+            PathStep(
+                address=node,
+                cycles=self._cost(node),
+                callee=self.callees.get(node),
+                loop=self.loops.get(node),
+            )
+            for node in path
+        ]
+        self.routine.loops = sorted(self.loops.values(), key=lambda loop: loop.header)
+
+    # -- graph construction ---------------------------------------------
+
+    def _discover(self) -> None:
+        pending = [self.entry]
+        while pending:
+            pc = pending.pop()
+            if pc in self.instructions:
+                continue
+            instruction = decode(self.analyzer.memory, pc)
+            if instruction is None:
+                self.note(f"undefined opcode ${self.analyzer.memory[pc]:02X} at ${pc:04X}")
+                continue
+            self.instructions[pc] = instruction
+            cost = instruction.cycles
+            successors: List[int] = []
+            mnemonic = instruction.mnemonic
+            if instruction.is_call:
+                successors.append(instruction.next)
+                target = instruction.target
+                if target is None:
+                    self.note(f"{mnemonic} ,X at ${pc:04X} calls an unknown routine")
+                elif target in self.analyzer._active:
+                    self.note(f"recursive call to {self.analyzer.name(target)} at ${pc:04X}")
+                else:
+                    callee = self.analyzer.routine(target)
+                    if callee.cycles is None:
+                        message = f"calls {callee.name}, which is unbounded"
+                        if message not in self.routine.notes:
+                            self.note(message)
+                        self.bounded = False
+                    else:
+                        cost += callee.cycles
+                        self.callees[pc] = target
+            elif instruction.is_return:
+                pass
+            elif mnemonic in ('SWI', 'WAI'):
+                self.note(f"{mnemonic} at ${pc:04X} waits for or enters an interrupt handler")
+            elif instruction.is_jump:
+                if instruction.target is None:
+                    self.note(f"JMP ,X at ${pc:04X} has an unknown target")
+                else:
+                    successors.append(instruction.target)
+            elif instruction.is_conditional:
+                successors.extend(dict.fromkeys((instruction.next, instruction.target)))
+            else:
+                successors.append(instruction.next)
+            self.costs[pc] = cost
+            self.successors[pc] = successors
+            pending.extend(successors)
+
+    def _natural_loops(self) -> List[tuple]:
+        """`(header, body, latches)` for every loop, innermost (smallest) first."""
+
+        idom = self._dominators()
+
+        def dominates(header: int, node: int) -> bool:
+            while True:
+                if node == header:
+                    return True
+                parent = idom[node]
+                if parent == node:
+                    return False
+                node = parent
+
+        latches: Dict[int, List[int]] = {}
+        for node, successors in self.successors.items():
+            for successor in successors:
+                if node in idom and dominates(successor, node):
+                    latches.setdefault(successor, []).append(node)
+
+        predecessors: Dict[int, List[int]] = {node: [] for node in self.instructions}
+        for node, successors in self.successors.items():
+            for successor in successors:
+                predecessors[successor].append(node)
+
+        loops = []
+        for header, sources in latches.items():
+            body = {header}
+            pending = [source for source in sources if source != header]
+            body.update(pending)
+            while pending:
+                node = pending.pop()
+                for predecessor in predecessors[node]:
+                    if predecessor not in body:
+                        body.add(predecessor)
+                        pending.append(predecessor)
+            loops.append((header, body, sources))
+        loops.sort(key=lambda loop: len(loop[1]))
+        return loops
+
+    def _dominators(self) -> Dict[int, int]:
+        # Cooper, Harvey and Kennedy's iterative algorithm over reverse postorder.
+        postorder: List[int] = []
+        seen = {self.entry}
+        stack = [(self.entry, iter(self.successors[self.entry]))]
+        while stack:
+            node, successors = stack[-1]
+            for successor in successors:
+                if successor not in seen and successor in self.successors:
+                    seen.add(successor)
+                    stack.append((successor, iter(self.successors[successor])))
+                    break
+            else:
+                stack.pop()
+                postorder.append(node)
+        rank = {node: index for index, node in enumerate(postorder)}
+        predecessors: Dict[int, List[int]] = {node: [] for node in postorder}
+        for node in postorder:
+            for successor in self.successors[node]:
+                if successor in predecessors:
+                    predecessors[successor].append(node)
+
+        idom = {self.entry: self.entry}
+        changed = True
+        while changed:
+            changed = False
+            for node in reversed(postorder):
+                if node == self.entry:
+                    continue
+                candidates = [pred for pred in predecessors[node] if pred in idom]
+                new = candidates[0]
+                for pred in candidates[1:]:
+                    a, b = pred, new
+                    while a != b:
+                        while rank[a] < rank[b]:
+                            a = idom[a]
+                        while rank[b] < rank[a]:
+                            b = idom[b]
+                    new = a
+                if idom.get(node) != new:
+                    idom[node] = new
+                    changed = True
+        return idom
+
+    # -- loop collapsing ------------------------------------------------
+
+    def _find(self, node: int) -> int:
+        while node in self.owner:
+            node = self.owner[node]
+        return node
+
+    def _cost(self, node: int) -> int:
+        loop = self.loops.get(node)
+        return loop.cycles if loop is not None else self.costs[node]
+
+    def _next(self, node: int) -> List[int]:
+        targets = self.loop_exits[node] if node in self.loops else self.successors[node]
+        return list(dict.fromkeys(self._find(target) for target in targets))
+
+    def _collapse(self, header: int, body: Set[int], latches: List[int]) -> bool:
+        members = {self._find(node) for node in body}
+        order = self._topological(header, members)
+        if order is None:
+            self.note(f"loop at ${header:04X} has a cycle that is not a natural loop")
+            return False
+
+        best, _ = self._longest(order, members)
+        ends: List[int] = []
+        exits: Set[int] = set()
+        exit_sources: Set[int] = set()
+        for node in order:
+            for target in self._next(node):
+                if target == header:
+                    ends.append(node)
+                elif target not in members:
+                    exit_sources.add(node)
+        for node in body:
+            exits.update(target for target in self.successors[node] if target not in body)
+        if not exits:
+            self.note(f"loop at ${header:04X} never exits")
+            return False
+
+        bound = self.analyzer.bounds.get(header)
+        for latch in latches:
+            bound = bound or self.analyzer.bounds.get(latch)
+        if bound is None:
+            self.note(f"loop at ${header:04X} has no bound; add '; @loop N' to its label or closing branch")
+            return False
+
+        per_iteration = max(best[node] for node in ends)
+        exit_cost = max(best[node] for node in exit_sources)
+        repeats = bound.iterations
+        if exit_sources <= set(ends):
+            # Bottom-tested: the path that leaves is the last iteration.
+            repeats = max(repeats - 1, 0)
+        loop = LoopCost(
+            header=header,
+            iterations=bound.iterations,
+            origin=bound.origin,
+            repeats=repeats,
+            per_iteration=per_iteration,
+            exit=exit_cost,
+            cycles=repeats * per_iteration + exit_cost,
+        )
+        for node in members:
+            if node != header:
+                self.owner[node] = header
+        self.loops[header] = loop
+        self.loop_exits[header] = exits
+        return True
+
+    def _topological(self, start: int, members: Optional[Set[int]]) -> Optional[List[int]]:
+        """Nodes reachable from `start` (within `members`, ignoring edges back to it) in topological order."""
+
+        order: List[int] = []
+        state: Dict[int, int] = {start: 1}
+        stack = [(start, iter(self._next(start)))]
+        while stack:
+            node, successors = stack[-1]
+            for successor in successors:
+                if successor == start and members is not None:
+                    continue
+                if members is not None and successor not in members:
+                    continue
+                mark = state.get(successor)
+                if mark == 1:
+                    return None
+                if mark is None:
+                    state[successor] = 1
+                    stack.append((successor, iter(self._next(successor))))
+                    break
+            else:
+                stack.pop()
+                state[node] = 2
+                order.append(node)
+        order.reverse()
+        return order
+
+    def _longest(self, order: List[int], members: Optional[Set[int]] = None):
+        best: Dict[int, int] = {order[0]: self._cost(order[0])}
+        previous: Dict[int, int] = {}
+        for node in order:
+            if node not in best:
+                continue
+            for successor in self._next(node):
+                if successor == order[0] and members is not None:
+                    continue
+                if members is not None and successor not in members:
+                    continue
+                total = best[node] + self._cost(successor)
+                if total > best.get(successor, -1):
+                    best[successor] = total
+                    previous[successor] = node
+        return best, previous
+
+
+def _parse_bound(text: str, symbols: Mapping[str, int], origin: str) -> Optional[LoopBound]:
+    comment = text.split(";", 1)[1] if ";" in text else ""
+    try:
+        match = _LOOP_ANNOTATION.search(comment)
+        if match:
+            return LoopBound(evaluate(match.group(1), dict(symbols), origin), f"{origin} @loop")
+        match = _FOR_BEGIN.match(text.split(";", 1)[0])
+        if match:
+            arguments = [argument.strip() for argument in match.group(1).split(",")]
+            if len(arguments) != 5:
+                return None
+            start = evaluate(arguments[3], dict(symbols), origin) & 0xFF
+            limit = evaluate(arguments[4], dict(symbols), origin) & 0xFF
+            if limit == 0xFF:
+                return None  # INC wraps back to 0, so the loop never ends
+            return LoopBound(max(limit - start + 1, 0), f"{origin} FOR_BEGIN")
+    except ExpressionError:
+        return None
+    return None
+
+
+def _source_text(cache: Dict[str, List[str]], filename: str, line_no: int) -> Optional[str]:
+    if filename not in cache:
+        try:
+            cache[filename] = Path(filename).read_text(encoding="utf-8").splitlines()
+        except OSError:
+            cache[filename] = []
+    lines = cache[filename]
+    return lines[line_no - 1] if 0 < line_no <= len(lines) else None
+
+
+def _collect_notes(routine: RoutineWcet, routines: Mapping[int, RoutineWcet]) -> List[str]:
+    notes = list(routine.notes)
+    for other in routines.values():
+        if other is not routine and other.cycles is None:
+            notes.extend(f"{other.name}: {note}" for note in other.notes if not note.startswith("calls "))
+    return notes
+
+
+def _location(lines: Mapping[int, SourceLine], address: int) -> str:
+    line = lines.get(address)
+    return f"{line.file}:{line.line}" if line else "?"
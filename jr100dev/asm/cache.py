@@ -0,0 +1,180 @@
+"""Persistent content-addressed cache of assembly results."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Mapping, Optional, Sequence
+
+from . import opcodes_mb8861h
+from .encoder import AssemblyResult
+from .preprocessor import IncludeLookup, find_include
+
+CACHE_FORMAT = 4
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+_MANIFEST_SUFFIX = ".json"
+_RESULT_SUFFIX = ".pickle"
+
+
+class BuildCache:
+    """On-disk cache keyed by source, includes, opcode table and options.
+
+    Lookup is two-level: the source text, file name, options and toolchain
+    fingerprint select a manifest listing the includes seen when the entry
+    was stored, each as written with the directories searched for it.  Every
+    include is resolved again, and the entry misses if one now finds a
+    different file (say, a new file earlier on the search path); otherwise
+    the current contents of those files complete the key of the pickled
+    `AssemblyResult`.  Entries are evicted least
+    recently used first once the directory grows beyond `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, filename: str, source: str, options: Mapping[str, object]) -> Optional[AssemblyResult]:
+        primary = self._primary_key(filename, source, options)
+        manifest_path = self.directory / f"{primary}{_MANIFEST_SUFFIX}"
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            includes = _resolve_includes(manifest["includes"])
+            result = None
+            if includes is not None:
+                key = _result_key(primary, includes)
+                result_path = self.directory / f"{key}{_RESULT_SUFFIX}"
+                with result_path.open("rb") as handle:
+                    result = pickle.load(handle)
+        except (OSError, ValueError, KeyError, TypeError, pickle.UnpicklingError, EOFError, AttributeError):
+            self.misses += 1
+            return None
+        if not isinstance(result, AssemblyResult):
+            self.misses += 1
+            return None
+        _touch(manifest_path)
+        _touch(result_path)
+        self.hits += 1
+        return result
+
+    def store(
+        self,
+        filename: str,
+        source: str,
+        options: Mapping[str, object],
+        includes: Sequence[IncludeLookup],
+        result: AssemblyResult,
+    ) -> None:
+        primary = self._primary_key(filename, source, options)
+        lookups = [
+            {"name": lookup.name, "search": [str(item) for item in lookup.search], "path": str(lookup.path)}
+            for lookup in dict.fromkeys(includes)
+        ]
+        try:
+            key = _result_key(primary, list(dict.fromkeys(lookup.path for lookup in includes)))
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _write_atomic(
+                self.directory / f"{key}{_RESULT_SUFFIX}",
+                pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+            manifest = {"format": CACHE_FORMAT, "source": filename, "includes": lookups, "result": key}
+            _write_atomic(
+                self.directory / f"{primary}{_MANIFEST_SUFFIX}",
+                json.dumps(manifest).encode("utf-8"),
+            )
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self) -> List[Path]:
+        """Delete least recently used entries until the cache fits `max_bytes`."""
+        try:
+            entries = [
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry)
+                for entry in self.directory.iterdir()
+                if entry.suffix in (_MANIFEST_SUFFIX, _RESULT_SUFFIX)
+            ]
+        except OSError:
+            return []
+        total = sum(size for _, size, _ in entries)
+        removed: List[Path] = []
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed.append(entry)
+        return removed
+
+    def _primary_key(self, filename: str, source: str, options: Mapping[str, object]) -> str:
+        digest = hashlib.sha256()
+        digest.update(_toolchain_fingerprint().encode("ascii"))
+        digest.update(b"\0")
+        digest.update(str(Path(filename).resolve()).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(dict(options), sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+
+def _resolve_includes(entries: Sequence[Mapping[str, object]]) -> Optional[List[Path]]:
+    """Resolve the manifest's includes again; None if one now finds a different file."""
+    paths: List[Path] = []
+    for entry in entries:
+        path = Path(entry["path"])
+        if find_include(entry["name"], [Path(item) for item in entry["search"]]) != path:
+            return None
+        paths.append(path)
+    return list(dict.fromkeys(paths))
+
+
+def _result_key(primary: str, includes: Sequence[Path]) -> str:
+    digest = hashlib.sha256(primary.encode("ascii"))
+    for path in includes:
+        digest.update(b"\0")
+        digest.update(str(path).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _toolchain_fingerprint() -> str:
+    """Hash of the opcode table and the assembler sources (computed once per process)."""
+    digest = hashlib.sha256(f"format={CACHE_FORMAT}".encode("ascii"))
+    digest.update(repr(opcodes_mb8861h.OPCODES).encode("utf-8"))
+    for module_path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(module_path.name.encode("utf-8"))
+        digest.update(module_path.read_bytes())
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            stream.write(payload)
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path)
+    except OSError:
+        pass
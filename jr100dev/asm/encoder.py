@@ -1,34 +1,41 @@
 """Two-pass assembler implementation for JR-100."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import heapq
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from struct import Struct
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from ..link.object_binary import FLAG_FUNCTION_SECTIONS, pack_object
 from . import opcodes_mb8861h
-from .eval import ExpressionError, evaluate
-from .parser import ParsedLine, ParserError, parse_source
-from .preprocessor import PreprocessError, preprocess_source
+from .eval import CompiledExpression, ExpressionCache, ExpressionError
+from .lexer import TokenKind
+from .parser import LineOrigins, Operand, ParsedLine, ParserError, parse_lines
+from .peephole import PeepholeOptimizer, PeepholeRewrite
+from .preprocessor import IncludeLookup, PreprocessError, preprocess_lines
 
 
 class AssemblyError(RuntimeError):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class OpcodeSpec:
     mnemonic: str
     addressing: str
     opcode: int
     size: int
+    cycles: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class LineState:
     line: ParsedLine
     address: Optional[int]
     opcode: Optional[OpcodeSpec]
-    operands: List[str]
+    operands: List[Operand]
     forced_mode: Optional[str] = None
     bss_size: int = 0
     section_kind: str = "code"
@@ -36,15 +43,43 @@ class LineState:
 
 @dataclass
 class AssemblyResult:
+    # Lowest address written; the entry point is the first `.org`.
     origin: int
     entry_point: int
-    machine_code: bytes
+    # (address, bytes) of each `.org` region that emitted code or data,
+    # sorted by address.  Gaps between regions are never materialized.
+    extents: List[Tuple[int, bytes]]
     symbols: Dict[str, int]
     emissions: List['LineEmission']
     sections: List['Section']
     source: str
     relocations: List['Relocation']
     bss_entries: List['BssAllocation']
+    # True when text was split per label and local references were recorded.
+    function_sections: bool = False
+    # (file, line) of every preprocessed line; emission line numbers index it.
+    line_origins: Sequence[Tuple[str, int]] = field(default_factory=list)
+    # Rewrites applied by `--optimize`, in the order they were made.
+    peephole: List[PeepholeRewrite] = field(default_factory=list)
+
+    def source_location(self, line_no: int) -> Tuple[str, int]:
+        """Map a preprocessed line number back to its original file and line."""
+        if 0 < line_no <= len(self.line_origins):
+            return self.line_origins[line_no - 1]
+        return self.source, line_no
+
+    @property
+    def machine_code(self) -> bytes:
+        """Flat image from `origin` to the end of the last extent, gaps zeroed."""
+        if len(self.extents) == 1:
+            return self.extents[0][1]
+        if not self.extents:
+            return b""
+        address, data = self.extents[-1]
+        image = bytearray(address + len(data) - self.origin)
+        for address, data in self.extents:
+            image[address - self.origin : address - self.origin + len(data)] = data
+        return bytes(image)
 
     def to_object_dict(self) -> Dict[str, object]:
         section_payloads = []
@@ -53,7 +88,7 @@ class AssemblyResult:
                 "name": section.name,
                 "kind": section.kind,
                 "address": section.address,
-                "size": len(section.data) if section.kind != "bss" else section.bss_size,
+                "size": len(section.data) if section.kind not in ("bss", "zp") else section.bss_size,
                 "content": ''.join(f"{byte:02X}" for byte in section.data) if section.data else "",
                 "bss_size": section.bss_size,
             }
@@ -73,7 +108,7 @@ class AssemblyResult:
             for relocation in self.relocations
         ]
 
-        return {
+        payload: Dict[str, object] = {
             "format": "jr100dev-object",
             "version": 1,
             "source": self.source,
@@ -83,25 +118,50 @@ class AssemblyResult:
             "symbols": symbol_entries,
             "relocations": relocation_entries,
         }
+        if self.function_sections:
+            payload["function_sections"] = True
+        return payload
+
+    def to_object_bytes(self) -> bytes:
+        """Encode the result as a compact version-2 binary object."""
+        return pack_object(
+            source=self.source,
+            flags=FLAG_FUNCTION_SECTIONS if self.function_sections else 0,
+            origin=self.origin,
+            entry_point=self.entry_point,
+            sections=[
+                (section.name, section.kind, section.address, bytes(section.data), section.bss_size)
+                for section in self.sections
+            ],
+            symbols=[(name, value, "global") for name, value in self.symbols.items()],
+            relocations=[
+                (relocation.section, relocation.offset, relocation.type, relocation.target, relocation.addend)
+                for relocation in self.relocations
+            ],
+        )
 
 
-@dataclass
+# Slotted, with `bytes` payloads: there is one per emitted operand or
+# instruction, and all of them live as long as the AssemblyResult.
+@dataclass(slots=True)
 class LineEmission:
     line: ParsedLine
     address: Optional[int]
-    data: List[int]
+    data: bytes
+    # Base execution time of an instruction line; None for directives.
+    cycles: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Section:
     name: str
     kind: str
     address: int
-    data: List[int]
+    data: bytes
     bss_size: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Relocation:
     section: str
     offset: int
@@ -110,7 +170,7 @@ class Relocation:
     addend: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class BssAllocation:
     name: str
     address: int
@@ -118,56 +178,93 @@ class BssAllocation:
 
 
 class Assembler:
-    def __init__(self, source: str, filename: str = "<stdin>") -> None:
+    def __init__(
+        self,
+        source: str,
+        filename: str = "<stdin>",
+        *,
+        function_sections: bool = False,
+        optimize: bool = False,
+        long_branches: bool = False,
+    ) -> None:
         self.source = source
         self.filename = filename
+        self.function_sections = function_sections
+        self.optimize = optimize
+        self.long_branches = long_branches
         self.opcode_table = _build_opcode_table()
-        include_dirs = _build_include_dirs(filename)
-        try:
-            self._processed_source = preprocess_source(
-                source,
-                filename=filename,
-                include_dirs=include_dirs,
-            )
-        except PreprocessError as err:
-            raise AssemblyError(str(err)) from err
+        self._expressions = ExpressionCache()
+        self.include_dirs = _build_include_dirs(filename)
+        # Filled while `assemble()` consumes the preprocessed lines.
+        self.included_files: List[Path] = []
+        self.include_lookups: List[IncludeLookup] = []
+        self.line_origins = LineOrigins()
+        # `.zp` variables: name -> size.  The linker assigns their addresses.
+        self._zp_variables: Dict[str, int] = {}
 
     def assemble(self) -> AssemblyResult:
+        self.included_files = []
+        self.include_lookups = []
+        self.line_origins = LineOrigins()
+        # The preprocessor yields lines as the parser asks for them, so
+        # expanded source is never joined into one text and split again.
+        records = preprocess_lines(
+            self.source,
+            filename=self.filename,
+            include_dirs=self.include_dirs,
+            included=self.included_files,
+            lookups=self.include_lookups,
+        )
         try:
-            parsed_lines = parse_source(self._processed_source)
-        except ParserError as err:
+            parsed_lines = parse_lines(records, origins=self.line_origins)
+        except (PreprocessError, ParserError) as err:
             raise AssemblyError(str(err)) from err
 
         symbols: Dict[str, int] = {}
+        labels: set[str] = set()
         states: List[LineState] = []
         origin: Optional[int] = None
+        # (state index, address) of every `.org`, in source order.
+        regions: List[Tuple[int, int]] = []
         pc = 0
+        self._zp_variables = {}
 
         current_section_kind = "text"
         for line in parsed_lines:
             state_bss_size = 0
             address = pc
             opcode_spec: Optional[OpcodeSpec] = None
-            normalized_operands, forced_mode = _normalize_operands(line.operands)
+            operands = line.operands
+            forced_mode = operands[0].hint if operands else None
             register_label = True
+            if current_section_kind == 'zp' and line.op not in _ZP_DIRECTIVES:
+                raise AssemblyError(_format_error(line, ".zp only accepts labelled .res variables"))
             if line.is_directive:
                 directive = line.op
                 if directive == '.org':
-                    if origin is not None or states:
-                        raise AssemblyError(_format_error(line, ".org may only appear once at the beginning"))
-                    if not normalized_operands:
+                    if origin is None and states:
+                        raise AssemblyError(_format_error(line, "The first .org must precede all other statements"))
+                    if not operands:
                         raise AssemblyError(_format_error(line, ".org requires an operand"))
-                    value = self._eval(normalized_operands[0], symbols, line)
-                    origin = value
+                    value = self._eval(operands[0], symbols, line)
+                    compiled = self._expressions.compile(
+                        operands[0].expression, f"{line.file}:{line.source_line}", operands[0].tokens
+                    )
+                    if not labels.isdisjoint(compiled.symbols):
+                        # Regions are fixed here, before relaxation moves labels.
+                        raise AssemblyError(_format_error(line, ".org address must not depend on labels"))
+                    if origin is None:
+                        origin = value
+                    regions.append((len(states), value))
                     pc = value
                     address = None
                     register_label = False
                 elif directive == '.equ':
                     if line.label is None:
                         raise AssemblyError(_format_error(line, ".equ requires a label"))
-                    if not normalized_operands:
+                    if not operands:
                         raise AssemblyError(_format_error(line, ".equ requires an operand"))
-                    value = self._eval(normalized_operands[0], symbols, line)
+                    value = self._eval(operands[0], symbols, line)
                     symbols[line.label] = value & 0xFFFF
                     address = None
                     register_label = False
@@ -180,24 +277,42 @@ class Assembler:
                 elif directive == '.bss':
                     current_section_kind = 'bss'
                     continue
+                elif directive == '.zp':
+                    current_section_kind = 'zp'
+                    continue
+                elif directive == '.res' and current_section_kind == 'zp':
+                    if line.label is None:
+                        raise AssemblyError(_format_error(line, ".res in .zp requires a label"))
+                    if not operands:
+                        raise AssemblyError(_format_error(line, '.res requires a size operand'))
+                    size = self._eval(operands[0], symbols, line)
+                    if not 0 < size <= 0x100:
+                        raise AssemblyError(_format_error(line, '.zp variable size must be 1-256 bytes'))
+                    if line.label in symbols or line.label in self._zp_variables:
+                        raise AssemblyError(_format_error(line, f"Duplicate symbol {line.label}"))
+                    self._zp_variables[line.label] = size
+                    address = None
+                    register_label = False
+                    operands = []
+                    state_bss_size = size
                 elif directive == '.res':
                     if origin is None:
                         raise AssemblyError(_format_error(line, ".org must appear before data"))
-                    if not normalized_operands:
+                    if not operands:
                         raise AssemblyError(_format_error(line, '.res requires a size operand'))
-                    size = self._eval(normalized_operands[0], symbols, line)
+                    size = self._eval(operands[0], symbols, line)
                     if size < 0:
                         raise AssemblyError(_format_error(line, '.res size must be non-negative'))
                     address = pc
                     pc += size
-                    normalized_operands = []
+                    operands = []
                     opcode_spec = None
                     state_bss_size = size
                 elif directive in ('.byte', '.word', '.ascii', '.fill', '.align'):
                     if origin is None:
                         raise AssemblyError(_format_error(line, ".org must appear before data"))
                     address = pc
-                    size = self._estimate_directive_size(directive, normalized_operands, symbols, line, pc)
+                    size = self._estimate_directive_size(directive, operands, symbols, line, pc)
                     pc += size
                 elif directive == '.label':
                     if origin is None:
@@ -209,23 +324,23 @@ class Assembler:
             else:
                 if origin is None:
                     raise AssemblyError(_format_error(line, ".org must appear before code"))
-                opcode_spec = self._match_opcode(line, normalized_operands, forced_mode, symbols)
+                opcode_spec = self._match_opcode(line, operands, forced_mode, symbols)
                 address = pc
                 pc += opcode_spec.size
             if line.label and register_label:
-                if line.label in symbols:
+                if line.label in symbols or line.label in self._zp_variables:
                     raise AssemblyError(_format_error(line, f"Duplicate symbol {line.label}"))
                 if address is None:
                     symbols[line.label] = pc
                 else:
                     symbols[line.label] = address & 0xFFFF
-            state_operands = list(normalized_operands)
+                labels.add(line.label)
             states.append(
                 LineState(
                     line=line,
                     address=address,
                     opcode=opcode_spec,
-                    operands=state_operands,
+                    operands=operands,
                     forced_mode=forced_mode if not line.is_directive else None,
                     bss_size=state_bss_size,
                     section_kind=current_section_kind,
@@ -235,34 +350,134 @@ class Assembler:
         if origin is None:
             raise AssemblyError("Missing .org directive")
 
-        self._refine_states(states, symbols, origin)
-        machine, emissions, relocations, bss_entries, section_chunks = self._second_pass(states, symbols, origin)
+        self._refine_states(states, symbols)
+        rewrites = self._optimize_states(states, symbols) if self.optimize else []
+        extents, emissions, relocations, bss_entries, section_chunks = self._second_pass(states, symbols, regions)
         entry = origin
         ordered_symbols = dict(sorted(symbols.items()))
-        sections = _build_sections(origin, machine, section_chunks, bss_entries)
+        sections = _build_sections(extents, section_chunks, bss_entries, self._zp_variables)
+        if self.function_sections:
+            sections, relocations = self._split_function_sections(states, symbols, labels, sections, relocations)
+        else:
+            _bind_relocations(sections, relocations)
         return AssemblyResult(
-            origin=origin,
+            origin=extents[0][0] if extents else origin,
             entry_point=entry,
-            machine_code=machine,
+            extents=extents,
             symbols=ordered_symbols,
             emissions=emissions,
             sections=sections,
             source=self.filename,
             relocations=relocations,
             bss_entries=bss_entries,
+            function_sections=self.function_sections,
+            line_origins=self.line_origins,
+            peephole=rewrites,
         )
 
-    def _eval(self, expr: str, symbols: Dict[str, int], line: ParsedLine) -> int:
-        location = f"{self.filename}:{line.line_no}"
+    def _split_function_sections(
+        self,
+        states: List[LineState],
+        symbols: Dict[str, int],
+        labels: set[str],
+        sections: List['Section'],
+        relocations: List['Relocation'],
+    ) -> tuple[List['Section'], List['Relocation']]:
+        """Split text at every label and record the references between the pieces.
+
+        Local label references become `reference` relocations so the linker
+        can compute reachability for `--gc-sections`; they patch nothing.  A
+        piece that does not end in RTS/RTI/JMP/BRA also references the piece
+        it falls through into.
+        """
+
+        split_labels: Dict[int, str] = {}
+        last_op_by_end: Dict[int, str] = {}
+        references: List[Relocation] = []
+        for state in states:
+            line = state.line
+            if state.address is None or state.section_kind == "bss":
+                continue
+            if state.section_kind == "text" and line.label in labels:
+                split_labels.setdefault(state.address, line.label)
+            if line.is_directive and line.op not in ('.byte', '.word', '.fill', '.ascii', '.align'):
+                continue
+            size = state.opcode.size if state.opcode else self._emitted_size(state, symbols)
+            if size and state.section_kind == "text":
+                last_op_by_end[state.address + size] = line.op
+            for name in self._operand_labels(state, labels):
+                references.append(
+                    Relocation(section=state.section_kind, offset=state.address, type="reference", target=name)
+                )
+
+        pieces: List[Section] = []
+        for section in sections:
+            if section.kind != "text":
+                pieces.append(section)
+                continue
+            cuts = sorted(
+                address
+                for address in split_labels
+                if section.address < address < section.address + len(section.data)
+            )
+            bounds = [section.address, *cuts, section.address + len(section.data)]
+            for start, end in zip(bounds, bounds[1:]):
+                label = split_labels.get(start)
+                name = f"text.{label}" if label else section.name
+                offset = start - section.address
+                pieces.append(
+                    Section(name=name, kind="text", address=start, data=section.data[offset : offset + end - start])
+                )
+                if end in split_labels and last_op_by_end.get(end) not in _TERMINAL_OPS:
+                    references.append(
+                        Relocation(section="text", offset=end - 1, type="reference", target=split_labels[end])
+                    )
+
+        owner = _section_owner(pieces)
+        assigned: List[Relocation] = []
+        for relocation in [*relocations, *references]:
+            piece = owner(relocation.section, relocation.offset)
+            if piece is None:
+                assigned.append(relocation)
+                continue
+            if relocation.type == "reference":
+                target = symbols[relocation.target]
+                if piece.address <= target < piece.address + len(piece.data):
+                    continue
+            relocation.section = piece.name
+            assigned.append(relocation)
+        return pieces, assigned
+
+    def _emitted_size(self, state: LineState, symbols: Dict[str, int]) -> int:
+        try:
+            return self._estimate_directive_size(state.line.op, state.operands, symbols, state.line, state.address)
+        except AssemblyError:
+            return 0
+
+    def _operand_labels(self, state: LineState, labels: set[str]) -> List[str]:
+        names: List[str] = []
+        location = f"{state.line.file}:{state.line.source_line}"
+        for index, operand in enumerate(state.operands):
+            if operand.is_string or (index > 0 and operand.is_index_register):
+                continue
+            try:
+                compiled = self._expressions.compile(operand.expression, location, operand.tokens)
+            except ExpressionError:
+                continue
+            names.extend(sorted(name for name in compiled.symbols if name in labels))
+        return names
+
+    def _eval(self, operand: Operand, symbols: Dict[str, int], line: ParsedLine) -> int:
+        location = f"{line.file}:{line.source_line}"
         try:
-            return evaluate(expr, symbols, location)
+            return self._expressions.evaluate(operand.expression, symbols, location, operand.tokens)
         except ExpressionError as err:
             raise AssemblyError(str(err)) from err
 
     def _estimate_directive_size(
         self,
         directive: str,
-        operands: List[str],
+        operands: List[Operand],
         symbols: Dict[str, int],
         line: ParsedLine,
         current_pc: int,
@@ -272,8 +487,8 @@ class Assembler:
         if directive == '.byte':
             size = 0
             for operand in operands:
-                if operand.startswith('"') and operand.endswith('"'):
-                    data = _parse_string(operand, line)
+                if operand.is_string:
+                    data = _parse_string(operand.text, line)
                     size += len(data)
                 else:
                     size += 1
@@ -283,7 +498,7 @@ class Assembler:
         if directive == '.ascii':
             if len(operands) != 1:
                 raise AssemblyError(_format_error(line, '.ascii requires a single string operand'))
-            data = _parse_string(operands[0], line)
+            data = _parse_string(operands[0].text, line)
             return len(data)
         if directive == '.fill':
             if len(operands) not in (1, 2):
@@ -306,7 +521,7 @@ class Assembler:
     def _match_opcode(
         self,
         line: ParsedLine,
-        operands: List[str],
+        operands: List[Operand],
         forced_mode: Optional[str],
         symbols: Dict[str, int],
     ) -> OpcodeSpec:
@@ -323,52 +538,24 @@ class Assembler:
             )
         return spec
 
-    def _refine_states(self, states: List[LineState], symbols: Dict[str, int], origin: int) -> None:
-        max_iterations = 8
-        for iteration in range(max_iterations):
-            pc = origin
-            changed = False
-            for state in states:
-                line = state.line
-                if line.is_directive:
-                    if line.op == '.org':
-                        target = self._eval(state.operands[0], symbols, line)
-                        if target != origin:
-                            raise AssemblyError(
-                                _format_error(
-                                    line,
-                                    ".org value must match initial origin in MVP",
-                                )
-                            )
-                        pc = target
-                        state.address = None
-                    elif line.op == '.equ':
-                        state.address = None
-                    elif line.op == '.res':
-                        state.address = pc
-                        pc += state.bss_size
-                    elif line.op == '.label':
-                        state.address = pc
-                    else:
-                        state.address = pc
-                        size = self._estimate_directive_size(line.op, state.operands, symbols, line, pc)
-                        pc += size
-                    continue
+    def _refine_states(self, states: List[LineState], symbols: Dict[str, int]) -> None:
+        _RelaxationEngine(self, states, symbols).run()
 
-                state.address = pc
-                new_spec = self._match_opcode(line, state.operands, state.forced_mode, symbols)
-                if state.opcode != new_spec:
-                    state.opcode = new_spec
-                    changed = True
-                pc += new_spec.size
-            if not changed:
-                return
-        raise AssemblyError("Addressing mode resolution did not converge")
+    def _optimize_states(self, states: List[LineState], symbols: Dict[str, int]) -> List[PeepholeRewrite]:
+        rewrites, resized = PeepholeOptimizer(self, states, symbols).run()
+        if resized:
+            # Addresses still describe the code before the rewrites; shift
+            # everything behind each resized line and let dependents settle.
+            engine = _RelaxationEngine(self, states, symbols)
+            for index, delta in resized:
+                engine.resize(index, delta)
+            engine.run()
+        return rewrites
 
     def _select_addressing_mode(
         self,
         line: ParsedLine,
-        operands: List[str],
+        operands: List[Operand],
         forced_mode: Optional[str],
         entries: Dict[str, OpcodeSpec],
         symbols: Dict[str, int],
@@ -392,6 +579,8 @@ class Assembler:
                 value = self._try_resolve_operand(operands[0], symbols, line)
                 if value is not None and 0 <= value <= 0xFF:
                     return 'DIR'
+                if value is None and self._references_zero_page(operands[0], line):
+                    return 'DIR'
             if 'EXT' in entries:
                 return 'EXT'
             if 'DIR' in entries:
@@ -402,25 +591,38 @@ class Assembler:
 
         return mode
 
-    def _try_resolve_operand(self, expr: str, symbols: Dict[str, int], line: ParsedLine) -> Optional[int]:
+    def _references_zero_page(self, operand: Operand, line: ParsedLine) -> bool:
+        """True when `operand` names a `.zp` variable, whose address the linker assigns below $100."""
+        if not self._zp_variables:
+            return False
+        try:
+            compiled = self._expressions.compile(operand.expression, f"{line.file}:{line.source_line}", operand.tokens)
+        except ExpressionError:
+            return False
+        return any(name in self._zp_variables for name in compiled.symbols)
+
+    def _try_resolve_operand(self, operand: Operand, symbols: Dict[str, int], line: ParsedLine) -> Optional[int]:
         try:
-            return evaluate(expr, symbols, f"{self.filename}:{line.line_no}")
+            return self._expressions.evaluate(
+                operand.expression, symbols, f"{line.file}:{line.source_line}", operand.tokens
+            )
         except ExpressionError:
             return None
 
     def _resolve_value(
         self,
-        expr: str,
+        operand: Operand,
         symbols: Dict[str, int],
         line: ParsedLine,
         *,
         allow_relocation: bool,
     ) -> tuple[int, Optional[str], int]:
         try:
-            return self._eval(expr, symbols, line), None, 0
+            return self._eval(operand, symbols, line), None, 0
         except AssemblyError:
             if allow_relocation:
-                extracted = _extract_symbol(expr, symbols, f"{self.filename}:{line.line_no}")
+                location = f"{line.file}:{line.source_line}"
+                extracted = _extract_symbol(operand, symbols, location, self._expressions)
                 if extracted is not None:
                     target, addend = extracted
                     return 0, target, addend
@@ -430,262 +632,598 @@ class Assembler:
         self,
         states: List[LineState],
         symbols: Dict[str, int],
-        origin: int,
-    ) -> tuple[bytes, List['LineEmission'], List['Relocation']]:
-        data = bytearray()
-        pc = origin
-        emissions: List[LineEmission] = []
-        relocations: List[Relocation] = []
-        bss_entries: List[BssAllocation] = []
-        section_chunks: Dict[str, List[Tuple[int, List[int]]]] = {}
+        regions: List[Tuple[int, int]],
+    ) -> tuple[
+        List[Tuple[int, bytes]],
+        List['LineEmission'],
+        List['Relocation'],
+        List['BssAllocation'],
+        Dict[str, List[List[int]]],
+    ]:
+        generator = _CodeGenerator(self, symbols, states, regions)
         for state in states:
             line = state.line
             if line.is_directive:
-                if line.op == '.org':
-                    target = self._eval(state.operands[0], symbols, line)
-                    if target != origin:
-                        raise AssemblyError(_format_error(line, '.org value must match initial origin in MVP'))
-                    pc = origin
-                    emissions.append(LineEmission(line=line, address=None, data=[]))
-                elif line.op == '.equ':
-                    emissions.append(LineEmission(line=line, address=None, data=[]))
-                    continue
-                elif line.op == '.res':
-                    if state.bss_size > 0:
-                        bss_entries.append(
-                            BssAllocation(
-                                name=line.label or f"BSS_{state.address:04X}",
-                                address=state.address if state.address is not None else pc,
-                                size=state.bss_size,
-                            )
-                        )
-                    emissions.append(LineEmission(line=line, address=state.address, data=[]))
-                    pc += state.bss_size
-                    continue
-                elif line.op == '.byte':
-                    for operand in state.operands:
-                        start = pc
-                        if operand.startswith('"') and operand.endswith('"'):
-                            bytes_ = _parse_string(operand, line)
-                            _append_bytes(data, origin, start, bytes_)
-                            _record_section_chunk(section_chunks, state.section_kind, start, bytes_)
-                            pc += len(bytes_)
-                            emissions.append(LineEmission(line=line, address=start, data=bytes_))
-                        else:
-                            value = self._eval(operand, symbols, line)
-                            if not 0 <= value <= 0xFF:
-                                raise AssemblyError(_format_error(line, f"Byte value out of range: {value}"))
-                            emitted = [value & 0xFF]
-                            _append_bytes(data, origin, start, emitted)
-                            _record_section_chunk(section_chunks, state.section_kind, start, emitted)
-                            pc += 1
-                            emissions.append(LineEmission(line=line, address=start, data=emitted))
-                elif line.op == '.word':
-                    for operand in state.operands:
-                        start = pc
-                        value, target, addend = self._resolve_value(operand, symbols, line, allow_relocation=True)
-                        if target is not None:
-                            emitted = [0x00, 0x00]
-                            relocations.append(
-                                Relocation(
-                                    section=state.section_kind,
-                                    offset=start,
-                                    type="absolute16",
-                                    target=target,
-                                    addend=addend,
-                                )
-                            )
-                        else:
-                            if not 0 <= value <= 0xFFFF:
-                                raise AssemblyError(_format_error(line, f"Word value out of range: {value}"))
-                            emitted = [(value >> 8) & 0xFF, value & 0xFF]
-                        _append_bytes(data, origin, start, emitted)
-                        _record_section_chunk(section_chunks, state.section_kind, start, emitted)
-                        pc += 2
-                        emissions.append(LineEmission(line=line, address=start, data=emitted))
-                elif line.op == '.ascii':
-                    start = pc
-                    string_bytes = _parse_string(state.operands[0], line)
-                    _append_bytes(data, origin, start, string_bytes)
-                    _record_section_chunk(section_chunks, state.section_kind, start, string_bytes)
-                    pc += len(string_bytes)
-                    emissions.append(LineEmission(line=line, address=start, data=string_bytes))
-                elif line.op == '.fill':
-                    count = self._eval(state.operands[0], symbols, line)
-                    value = 0
-                    if len(state.operands) == 2:
-                        value = self._eval(state.operands[1], symbols, line)
-                    value &= 0xFF
-                    payload = [value] * count
-                    start = pc
-                    _append_bytes(data, origin, start, payload)
-                    _record_section_chunk(section_chunks, state.section_kind, start, payload)
-                    pc += count
-                    emissions.append(LineEmission(line=line, address=start, data=payload))
-                elif line.op == '.align':
-                    boundary = self._eval(state.operands[0], symbols, line)
-                    if boundary <= 0:
-                        raise AssemblyError(_format_error(line, '.align argument must be positive'))
-                    try:
-                        padding = _alignment_padding(pc, boundary)
-                    except ValueError as err:
-                        raise AssemblyError(_format_error(line, str(err))) from err
-                    if padding:
-                        payload = [0] * padding
-                        start = pc
-                        _append_bytes(data, origin, start, payload)
-                        _record_section_chunk(section_chunks, state.section_kind, start, payload)
-                        pc += padding
-                        emissions.append(LineEmission(line=line, address=start, data=payload))
-                elif line.op == '.label':
-                    emissions.append(LineEmission(line=line, address=state.address, data=[]))
-                    continue
-                else:
+                emit = _DIRECTIVE_EMITTERS.get(line.op)
+                if emit is None:
                     raise AssemblyError(_format_error(line, f"Unsupported directive {line.op}"))
+                emit(generator, state)
                 continue
-            if state.opcode is None:
-                raise AssemblyError(_format_error(line, "Internal error: missing opcode"))
             spec = state.opcode
-            opcode_bytes = [spec.opcode]
-            operand_bytes: List[int] = []
-            start = pc
-            if spec.addressing == 'INH':
-                pass
-            elif spec.addressing == 'IMM':
-                operand = state.operands[0]
-                expr = operand[1:] if operand.startswith('#') else operand
-                value, target, addend = self._resolve_value(expr, symbols, line, allow_relocation=True)
-                operand_offset = start + len(opcode_bytes)
-                if spec.size == 2:
-                    if target is not None:
-                        operand_bytes.append(0x00)
-                        relocations.append(
-                            Relocation(
-                                section=state.section_kind,
-                                offset=operand_offset,
-                                type="absolute8",
-                                target=target,
-                                addend=addend,
-                            )
-                        )
-                    else:
-                        if not 0 <= value <= 0xFF:
-                            raise AssemblyError(_format_error(line, f"Immediate value out of range: {value}"))
-                        operand_bytes.append(value & 0xFF)
-                elif spec.size == 3:
-                    if target is not None:
-                        operand_bytes.extend([0x00, 0x00])
-                        relocations.append(
-                            Relocation(
-                                section=state.section_kind,
-                                offset=operand_offset,
-                                type="absolute16",
-                                target=target,
-                                addend=addend,
-                            )
-                        )
-                    else:
-                        if not 0 <= value <= 0xFFFF:
-                            raise AssemblyError(_format_error(line, f"Immediate value out of range: {value}"))
-                        operand_bytes.extend([(value >> 8) & 0xFF, value & 0xFF])
-                else:
-                    raise AssemblyError(_format_error(line, f"Unsupported immediate size {spec.size}"))
-            elif spec.addressing == 'EXT':
-                operand = state.operands[0]
-                value, target, addend = self._resolve_value(operand, symbols, line, allow_relocation=True)
-                operand_offset = start + len(opcode_bytes)
-                if target is not None:
-                    operand_bytes.extend([0x00, 0x00])
-                    relocations.append(
-                        Relocation(
-                            section=state.section_kind,
-                            offset=operand_offset,
-                            type="absolute16",
-                            target=target,
-                            addend=addend,
-                        )
-                    )
-                else:
-                    if not 0 <= value <= 0xFFFF:
-                        raise AssemblyError(_format_error(line, f"Absolute value out of range: {value}"))
-                    operand_bytes.extend([(value >> 8) & 0xFF, value & 0xFF])
-            elif spec.addressing == 'DIR':
-                operand = state.operands[0]
-                value, target, addend = self._resolve_value(operand, symbols, line, allow_relocation=True)
-                operand_offset = start + len(opcode_bytes)
-                if target is not None:
-                    operand_bytes.append(0x00)
-                    relocations.append(
-                        Relocation(
-                            section=state.section_kind,
-                            offset=operand_offset,
-                            type="absolute8",
-                            target=target,
-                            addend=addend,
-                        )
-                    )
-                else:
-                    if not 0 <= value <= 0xFF:
-                        raise AssemblyError(_format_error(line, f"Direct value out of range: {value}"))
-                    operand_bytes.append(value & 0xFF)
-            elif spec.addressing == 'REL':
-                operand = state.operands[0]
-                value, target, addend = self._resolve_value(operand, symbols, line, allow_relocation=True)
-                operand_offset = start + len(opcode_bytes)
-                if target is not None:
-                    relocations.append(
-                        Relocation(
-                            section="text",
-                            offset=operand_offset,
-                            type="relative8",
-                            target=target,
-                            addend=addend - (pc + spec.size),
-                        )
-                    )
-                    operand_bytes.append(0x00)
-                else:
-                    offset = value - (pc + spec.size)
-                    if offset < -128 or offset > 127:
-                        raise AssemblyError(_format_error(line, f"Branch target out of range ({offset})"))
-                    operand_bytes.append(offset & 0xFF)
-            elif spec.addressing == 'IDX':
-                if len(state.operands) == 1 and state.operands[0].upper() == 'X':
-                    operand_bytes.append(0)
-                elif len(state.operands) == 2 and state.operands[1].upper() == 'X':
-                    value = self._eval(state.operands[0], symbols, line)
-                    if not 0 <= value <= 0xFF:
-                        raise AssemblyError(_format_error(line, f"Indexed offset out of range: {value}"))
-                    operand_bytes.append(value & 0xFF)
-                else:
-                    raise AssemblyError(_format_error(line, "Invalid indexed operand"))
-            else:
+            if spec is None:
+                raise AssemblyError(_format_error(line, "Internal error: missing opcode"))
+            encode = _INSTRUCTION_ENCODERS.get(spec.addressing)
+            if encode is None:
                 raise AssemblyError(_format_error(line, f"Unsupported addressing mode {spec.addressing}"))
-            combined = opcode_bytes + operand_bytes
-            start = pc
-            _append_bytes(data, origin, start, combined)
-            _record_section_chunk(section_chunks, state.section_kind, start, combined)
-            pc += len(combined)
-            emissions.append(LineEmission(line=line, address=start, data=combined))
-        return bytes(data), emissions, relocations, bss_entries, section_chunks
+            generator.write(state, encode(generator, state, spec), spec.cycles)
+        extents = generator.finish()
+        return extents, generator.emissions, generator.relocations, generator.bss_entries, generator.chunks
+
+
+class _CodeGenerator:
+    """Second-pass state: the output extents and what has been emitted into them.
+
+    Every `.org` starts a new extent unless it continues at the current
+    address.  An extent's image is preallocated from the region's final
+    address and only grows if a line turns out larger than its first-pass
+    size; nothing is allocated for the address space between extents.  Each
+    instruction or data operand is packed once into a `bytes` payload, which
+    the image copies and its `LineEmission` keeps.  Section contents are
+    recorded as `[start, end]` address ranges, merged while contiguous within
+    one extent.
+    """
+
+    def __init__(
+        self,
+        assembler: Assembler,
+        symbols: Dict[str, int],
+        states: List[LineState],
+        regions: List[Tuple[int, int]],
+    ) -> None:
+        self.assembler = assembler
+        self.symbols = symbols
+        # (start, final address) of each `.org` region, consumed in order.
+        bounds = [index for index, _ in regions[1:]] + [len(states)]
+        self._regions = [
+            (address, self._final_address(states, index, stop, address))
+            for (index, address), stop in zip(regions, bounds)
+        ]
+        self._next_region = 0
+        self.extents: List[Tuple[int, bytes]] = []
+        self.base = self.pc = 0
+        self.image: Optional[bytearray] = None
+        # Offset just past the last byte written; the extent is cut there.
+        self.high = 0
+        self.emissions: List[LineEmission] = []
+        self.relocations: List[Relocation] = []
+        self.bss_entries: List[BssAllocation] = []
+        self.chunks: Dict[str, List[List[int]]] = {}
+        # The range the next contiguous write of the same kind extends.
+        self._current: Optional[List[int]] = None
+        self._current_kind = ""
+
+    def _final_address(self, states: List[LineState], start: int, stop: int, origin: int) -> int:
+        for index in range(stop - 1, start - 1, -1):
+            state = states[index]
+            if state.address is None or state.section_kind == 'zp':
+                continue
+            if state.opcode is not None:
+                size = state.opcode.size
+            else:
+                size = max(state.bss_size, self.assembler._emitted_size(state, self.symbols))
+            return max(state.address + size, origin)
+        return origin
+
+    def begin(self) -> None:
+        """Enter the next `.org` region."""
+        address, end = self._regions[self._next_region]
+        self._next_region += 1
+        if self.image is not None and address == self.pc:
+            return
+        self._close()
+        self.base = self.pc = address
+        self.image = bytearray(end - address)
+        self.high = 0
+        self._current = None
+
+    def _close(self) -> None:
+        if self.high:
+            self.extents.append((self.base, bytes(self.image[: self.high])))
+
+    def finish(self) -> List[Tuple[int, bytes]]:
+        """Return the extents sorted by address, rejecting overlapping regions."""
+        self._close()
+        extents = sorted(self.extents, key=lambda extent: extent[0])
+        for (start, data), (following, _) in zip(extents, extents[1:]):
+            if start + len(data) > following:
+                raise AssemblyError(
+                    f".org region at ${following:04X} overlaps ${start:04X}-${start + len(data) - 1:04X}"
+                )
+        return extents
+
+    def write(self, state: LineState, payload: bytes, cycles: Optional[int] = None) -> None:
+        start = self.pc
+        size = len(payload)
+        offset = start - self.base
+        end = offset + size
+        if offset < 0 or end > len(self.image):
+            if offset < 0:
+                raise AssemblyError(f"Program counter {start:#04x} lower than origin {self.base:#04x}")
+            self.image.extend(bytes(end - len(self.image)))
+        self.image[offset:end] = payload
+        if end > self.high:
+            self.high = end
+        self.pc = start + size
+        kind = state.section_kind
+        current = self._current
+        if current is not None and current[1] == start and self._current_kind == kind:
+            current[1] = self.pc
+        elif kind != "bss":
+            self._current = [start, self.pc]
+            self._current_kind = kind
+            self.chunks.setdefault(kind, []).append(self._current)
+        self.emissions.append(LineEmission(state.line, start, payload, cycles))
+
+    def mark(self, state: LineState, address: Optional[int]) -> None:
+        """Record a line that emits no bytes."""
+        self.emissions.append(LineEmission(line=state.line, address=address, data=b""))
+
+    def eval(self, state: LineState, index: int = 0) -> int:
+        return self.assembler._eval(state.operands[index], self.symbols, state.line)
+
+    def resolve(self, state: LineState, operand: Optional[Operand] = None) -> Tuple[int, Optional[str], int]:
+        operand = operand if operand is not None else state.operands[0]
+        return self.assembler._resolve_value(operand, self.symbols, state.line, allow_relocation=True)
+
+    def relocate(self, section: str, offset: int, kind: str, target: str, addend: int) -> None:
+        self.relocations.append(Relocation(section=section, offset=offset, type=kind, target=target, addend=addend))
+
+
+# One-byte payloads are shared rather than allocated per line.
+_BYTES = tuple(bytes((value,)) for value in range(256))
+_OPCODE_BYTE = Struct('>BB')
+_OPCODE_WORD = Struct('>BH')
+_LONG_BRANCH = Struct('>BBBH')
+_WORD = Struct('>H')
+
+
+def _encode_inherent(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec) -> bytes:
+    return _BYTES[spec.opcode]
+
+
+def _encode_byte_operand(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec, what: str) -> bytes:
+    value, target, addend = gen.resolve(state)
+    if target is not None:
+        gen.relocate(state.section_kind, gen.pc + 1, "absolute8", target, addend)
+        return _OPCODE_BYTE.pack(spec.opcode, 0)
+    if not 0 <= value <= 0xFF:
+        raise AssemblyError(_format_error(state.line, f"{what} value out of range: {value}"))
+    return _OPCODE_BYTE.pack(spec.opcode, value)
+
+
+def _encode_word_operand(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec, what: str) -> bytes:
+    value, target, addend = gen.resolve(state)
+    if target is not None:
+        gen.relocate(state.section_kind, gen.pc + 1, "absolute16", target, addend)
+        return _OPCODE_WORD.pack(spec.opcode, 0)
+    if not 0 <= value <= 0xFFFF:
+        raise AssemblyError(_format_error(state.line, f"{what} value out of range: {value}"))
+    return _OPCODE_WORD.pack(spec.opcode, value)
+
+
+def _encode_immediate(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec) -> bytes:
+    if spec.size == 2:
+        return _encode_byte_operand(gen, state, spec, "Immediate")
+    if spec.size == 3:
+        return _encode_word_operand(gen, state, spec, "Immediate")
+    raise AssemblyError(_format_error(state.line, f"Unsupported immediate size {spec.size}"))
+
+
+def _encode_direct(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec) -> bytes:
+    return _encode_byte_operand(gen, state, spec, "Direct")
+
+
+def _encode_extended(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec) -> bytes:
+    return _encode_word_operand(gen, state, spec, "Absolute")
+
+
+def _encode_relative(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec) -> bytes:
+    value, target, addend = gen.resolve(state)
+    next_pc = gen.pc + spec.size
+    if target is not None:
+        gen.relocate("text", gen.pc + 1, "relative8", target, addend - next_pc)
+        return _OPCODE_BYTE.pack(spec.opcode, 0)
+    offset = value - next_pc
+    if offset < -128 or offset > 127:
+        hint = "" if gen.assembler.long_branches else "; assemble with --long-branches to relax it"
+        raise AssemblyError(_format_error(state.line, f"Branch target out of range ({offset}){hint}"))
+    return _OPCODE_BYTE.pack(spec.opcode, offset & 0xFF)
+
+
+def _encode_long_branch(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec) -> bytes:
+    # Bcc -> inverted Bcc over JMP; BRA/BSR -> JMP/JSR.
+    value, target, addend = gen.resolve(state)
+    if target is not None:
+        gen.relocate(state.section_kind, gen.pc + spec.size - 2, "absolute16", target, addend)
+        value = 0
+    if spec.size == 5:
+        return _LONG_BRANCH.pack(spec.opcode, 0x03, gen.assembler.opcode_table['JMP']['EXT'].opcode, value & 0xFFFF)
+    return _OPCODE_WORD.pack(spec.opcode, value & 0xFFFF)
+
+
+def _encode_indexed(gen: _CodeGenerator, state: LineState, spec: OpcodeSpec) -> bytes:
+    operands = state.operands
+    if len(operands) == 1 and operands[0].is_index_register:
+        return _OPCODE_BYTE.pack(spec.opcode, 0)
+    if len(operands) == 2 and operands[1].is_index_register:
+        value = gen.eval(state)
+        if not 0 <= value <= 0xFF:
+            raise AssemblyError(_format_error(state.line, f"Indexed offset out of range: {value}"))
+        return _OPCODE_BYTE.pack(spec.opcode, value)
+    raise AssemblyError(_format_error(state.line, "Invalid indexed operand"))
+
+
+_INSTRUCTION_ENCODERS = {
+    'INH': _encode_inherent,
+    'IMM': _encode_immediate,
+    'DIR': _encode_direct,
+    'EXT': _encode_extended,
+    'REL': _encode_relative,
+    'LONG': _encode_long_branch,
+    'IDX': _encode_indexed,
+}
+
+
+def _emit_org(gen: _CodeGenerator, state: LineState) -> None:
+    gen.begin()
+    gen.mark(state, None)
+
 
+def _emit_equ(gen: _CodeGenerator, state: LineState) -> None:
+    gen.mark(state, None)
 
-def _record_section_chunk(section_chunks: Dict[str, List[Tuple[int, List[int]]]], kind: str, address: int, payload: List[int]) -> None:
-    if kind == "bss":
+
+def _emit_res(gen: _CodeGenerator, state: LineState) -> None:
+    if state.section_kind == 'zp':
+        gen.mark(state, None)
         return
-    section_chunks.setdefault(kind, []).append((address, list(payload)))
+    if state.bss_size > 0:
+        gen.bss_entries.append(
+            BssAllocation(
+                name=state.line.label or f"BSS_{state.address:04X}",
+                address=state.address if state.address is not None else gen.pc,
+                size=state.bss_size,
+            )
+        )
+    gen.mark(state, state.address)
+    gen.pc += state.bss_size
+
 
+def _emit_byte(gen: _CodeGenerator, state: LineState) -> None:
+    for operand in state.operands:
+        if operand.is_string:
+            gen.write(state, bytes(_parse_string(operand.text, state.line)))
+            continue
+        value = gen.assembler._eval(operand, gen.symbols, state.line)
+        if not 0 <= value <= 0xFF:
+            raise AssemblyError(_format_error(state.line, f"Byte value out of range: {value}"))
+        gen.write(state, _BYTES[value])
+
+
+def _emit_word(gen: _CodeGenerator, state: LineState) -> None:
+    for operand in state.operands:
+        value, target, addend = gen.resolve(state, operand)
+        if target is not None:
+            gen.relocate(state.section_kind, gen.pc, "absolute16", target, addend)
+            value = 0
+        elif not 0 <= value <= 0xFFFF:
+            raise AssemblyError(_format_error(state.line, f"Word value out of range: {value}"))
+        gen.write(state, _WORD.pack(value))
+
+
+def _emit_ascii(gen: _CodeGenerator, state: LineState) -> None:
+    gen.write(state, bytes(_parse_string(state.operands[0].text, state.line)))
+
+
+def _emit_fill(gen: _CodeGenerator, state: LineState) -> None:
+    count = gen.eval(state)
+    value = gen.eval(state, 1) if len(state.operands) == 2 else 0
+    gen.write(state, _BYTES[value & 0xFF] * count)
+    if count < 0:
+        # The first pass moved the address back by a negative count too.
+        gen.pc += count
+
+
+def _emit_align(gen: _CodeGenerator, state: LineState) -> None:
+    boundary = gen.eval(state)
+    if boundary <= 0:
+        raise AssemblyError(_format_error(state.line, '.align argument must be positive'))
+    try:
+        padding = _alignment_padding(gen.pc, boundary)
+    except ValueError as err:
+        raise AssemblyError(_format_error(state.line, str(err))) from err
+    if padding:
+        gen.write(state, bytes(padding))
+
+
+def _emit_label(gen: _CodeGenerator, state: LineState) -> None:
+    gen.mark(state, state.address)
+
+
+_DIRECTIVE_EMITTERS = {
+    '.org': _emit_org,
+    '.equ': _emit_equ,
+    '.res': _emit_res,
+    '.byte': _emit_byte,
+    '.word': _emit_word,
+    '.ascii': _emit_ascii,
+    '.fill': _emit_fill,
+    '.align': _emit_align,
+    '.label': _emit_label,
+}
+
+
+class _RelaxationEngine:
+    """Resolve DIR/EXT operand sizes by re-examining only lines whose inputs moved.
+
+    Each ambiguous instruction, symbolic `.fill` and `.equ` registers the
+    symbols its expression reads.  When a line changes size, the labels
+    after it up to the next `.org` are shifted and only the lines that read
+    those labels (plus any `.align` further down) are queued again.  Addresses live in an offset
+    table and are written back to the states once the worklist drains.
+
+    With `long_branches`, relative branches take part as well: they start
+    short, widen to the `LONG` form when the target is out of reach and may
+    shrink back once DIR/EXT shrinking brings it closer.  Besides their
+    target symbols they are re-queued whenever code between a backward target
+    and the branch moves.
+
+    An instruction that has to grow back to EXT after being shrunk stays EXT,
+    and a branch that widens a second time stays long.  This bounds the
+    number of changes per line and guarantees termination.
+    """
+
+    def __init__(self, assembler: Assembler, states: List[LineState], symbols: Dict[str, int]) -> None:
+        self.assembler = assembler
+        self.states = states
+        self.symbols = symbols
+        self.base = [state.address for state in states]
+        self.offsets = _OffsetTable(len(states) + 1)
+        self.sizes: Dict[int, int] = {}
+        self.dependents: Dict[str, List[int]] = {}
+        self.label_indices: List[int] = []
+        self.label_names: List[str] = []
+        self.label_addresses: Dict[str, int] = {}
+        self.align_indices: List[int] = []
+        # `.org` lines; a size change never moves anything past the next one.
+        self.org_indices: List[int] = []
+        # Relaxable branches and the first label index their target reads.
+        self.branch_indices: List[int] = []
+        self.branch_reach: Dict[int, int] = {}
+        self.widened: set[int] = set()
+        self.locked: set[int] = set()
+        self.fill_history: Dict[int, set[int]] = {}
+        self._queue: List[int] = []
+        self._queued: set[int] = set()
+        self._build()
+
+    def _build(self) -> None:
+        assembler = self.assembler
+        branch_targets: Dict[int, Iterable[str]] = {}
+        for index, state in enumerate(self.states):
+            line = state.line
+            if line.label and state.address is not None:
+                self.label_indices.append(index)
+                self.label_names.append(line.label)
+                self.label_addresses[line.label] = state.address
+            if not line.is_directive:
+                branch = self._is_branch(state)
+                if branch or self._is_ambiguous(state):
+                    compiled = self._compile(state.operands[0], line)
+                    if compiled is not None:
+                        self.sizes[index] = state.opcode.size
+                        self._depend(index, compiled.symbols)
+                        self._enqueue(index)
+                        if branch:
+                            self.branch_indices.append(index)
+                            branch_targets[index] = compiled.symbols
+                continue
+            if line.op == '.org':
+                self.org_indices.append(index)
+            elif line.op == '.equ':
+                compiled = self._compile(state.operands[0], line)
+                if compiled is not None:
+                    self._depend(index, compiled.symbols)
+            elif line.op == '.fill':
+                compiled = self._compile(state.operands[0], line)
+                if compiled is not None and compiled.symbols:
+                    size = assembler._eval(state.operands[0], self.symbols, line)
+                    self.sizes[index] = size
+                    self.fill_history[index] = {size}
+                    self._depend(index, compiled.symbols)
+            elif line.op == '.align':
+                boundary = assembler._eval(state.operands[0], self.symbols, line)
+                self.sizes[index] = _alignment_padding(state.address, boundary)
+                self.align_indices.append(index)
+        if self.branch_indices:
+            label_index = dict(zip(self.label_names, self.label_indices))
+            for index, names in branch_targets.items():
+                # Targets that are not labels here (.equ, externals) never
+                # move with the code, so any earlier shift may matter.
+                reach = min((label_index.get(name, -1) for name in names), default=-1)
+                if reach > index and self._region_end(index) < reach:
+                    # A target behind a later `.org` does not move with the branch either.
+                    reach = -1
+                self.branch_reach[index] = reach
+
+    def _is_ambiguous(self, state: LineState) -> bool:
+        if state.forced_mode or not state.operands:
+            return False
+        entries = self.assembler.opcode_table.get(state.line.op, {})
+        if 'DIR' not in entries or 'EXT' not in entries:
+            return False
+        return _basic_addressing_mode(state.line.op, state.operands) == 'EXT'
+
+    def _is_branch(self, state: LineState) -> bool:
+        return self.assembler.long_branches and _is_relaxable_branch(state.opcode, state.operands, state.forced_mode)
+
+    def _branch_spec(self, index: int) -> OpcodeSpec:
+        state = self.states[index]
+        short = self.assembler.opcode_table[state.line.op]['REL']
+        target = self.assembler._try_resolve_operand(state.operands[0], self.symbols, state.line)
+        if target is None:
+            # External target: the linker patches a relative8 and range-checks it.
+            return short
+        if self.branch_reach[index] > index:
+            # The target labels follow this branch and move with its size.
+            target -= state.opcode.size - short.size
+        offset = target - (self._address(index) + short.size)
+        if -128 <= offset <= 127:
+            return short
+        return _long_branch_spec(short, self.assembler.opcode_table)
+
+    def _compile(self, operand: Operand, line: ParsedLine) -> Optional[CompiledExpression]:
+        try:
+            return self.assembler._expressions.compile(
+                operand.expression, f"{line.file}:{line.source_line}", operand.tokens
+            )
+        except ExpressionError:
+            return None
 
-def _append_bytes(buffer: bytearray, origin: int, pc: int, values: List[int]) -> None:
-    offset = pc - origin
-    if offset < 0:
-        raise AssemblyError(f"Program counter {pc:#04x} lower than origin {origin:#04x}")
-    if len(buffer) < offset:
-        buffer.extend([0] * (offset - len(buffer)))
-    buffer.extend(values)
+    def _depend(self, index: int, names: Iterable[str]) -> None:
+        for name in names:
+            self.dependents.setdefault(name, []).append(index)
+
+    def _enqueue(self, index: int) -> None:
+        if index in self._queued or index in self.locked:
+            return
+        self._queued.add(index)
+        heapq.heappush(self._queue, index)
+
+    def run(self) -> None:
+        while self._queue:
+            index = heapq.heappop(self._queue)
+            self._queued.discard(index)
+            self._examine(index)
+        self._finalize()
+
+    def _examine(self, index: int) -> None:
+        assembler = self.assembler
+        state = self.states[index]
+        line = state.line
+        if not line.is_directive:
+            if index in self.branch_reach:
+                spec = self._branch_spec(index)
+            else:
+                spec = assembler._match_opcode(line, state.operands, state.forced_mode, self.symbols)
+            if spec.size > state.opcode.size:
+                if index in self.branch_reach and index not in self.widened:
+                    self.widened.add(index)
+                else:
+                    self.locked.add(index)
+            state.opcode = spec
+            new_size = spec.size
+        elif line.op == '.equ':
+            value = assembler._eval(state.operands[0], self.symbols, line) & 0xFFFF
+            if self.symbols.get(line.label) != value:
+                self.symbols[line.label] = value
+                self._touch(line.label)
+            return
+        elif line.op == '.fill':
+            new_size = assembler._eval(state.operands[0], self.symbols, line)
+            history = self.fill_history[index]
+            if new_size != self.sizes[index] and new_size in history:
+                raise AssemblyError(_format_error(line, ".fill size does not converge"))
+            history.add(new_size)
+        else:
+            boundary = assembler._eval(state.operands[0], self.symbols, line)
+            new_size = _alignment_padding(self._address(index), boundary)
+        delta = new_size - self.sizes[index]
+        if delta:
+            self.sizes[index] = new_size
+            self._shift(index, delta)
+
+    def _address(self, index: int) -> int:
+        return self.base[index] + self.offsets.prefix(index)
+
+    def resize(self, index: int, delta: int) -> None:
+        """Account for a line whose size changed outside the engine.
+
+        `_build` already recorded the new size, so only the addresses behind
+        the line move.
+        """
+        self._shift(index, delta)
+
+    def _region_end(self, index: int) -> int:
+        """Index of the `.org` that ends the region holding `index`."""
+        position = bisect_right(self.org_indices, index)
+        return self.org_indices[position] if position < len(self.org_indices) else len(self.states)
+
+    def _shift(self, index: int, delta: int) -> None:
+        stop = self._region_end(index)
+        self.offsets.add(index + 1, delta)
+        if stop < len(self.states):
+            self.offsets.add(stop, -delta)
+        for position in range(bisect_right(self.label_indices, index), bisect_left(self.label_indices, stop)):
+            name = self.label_names[position]
+            self.label_addresses[name] += delta
+            self.symbols[name] = self.label_addresses[name] & 0xFFFF
+            self._touch(name)
+        aligns = self.align_indices
+        for align_index in aligns[bisect_right(aligns, index) : bisect_left(aligns, stop)]:
+            self._enqueue(align_index)
+        branches = self.branch_indices
+        for branch_index in branches[bisect_right(branches, index) : bisect_left(branches, stop)]:
+            if self.branch_reach[branch_index] <= index:
+                self._enqueue(branch_index)
+
+    def _touch(self, name: str) -> None:
+        for dependent in self.dependents.get(name, ()):
+            self._enqueue(dependent)
+
+    def _finalize(self) -> None:
+        shift = 0
+        deltas = self.offsets.deltas
+        for index, state in enumerate(self.states):
+            shift += deltas[index]
+            if state.address is not None:
+                state.address = self.base[index] + shift
+
+
+class _OffsetTable:
+    """Fenwick tree of address deltas; `prefix(i)` is the shift applied at index i."""
+
+    def __init__(self, size: int) -> None:
+        self.deltas = [0] * size
+        self._tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int) -> None:
+        self.deltas[index] += delta
+        position = index + 1
+        while position < len(self._tree):
+            self._tree[position] += delta
+            position += position & -position
+
+    def prefix(self, index: int) -> int:
+        total = 0
+        position = index + 1
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
 
 
 def _format_error(line: ParsedLine, message: str) -> str:
-    return f"Line {line.line_no}: {message} | {line.text.strip()}"
+    return f"{line.location}: {message} | {line.text.strip()}"
+
+
+# Instructions after which execution never falls through to the next byte.
+_TERMINAL_OPS = frozenset({'RTS', 'RTI', 'JMP', 'BRA'})
+
+_ZP_DIRECTIVES = frozenset({'.res', '.equ', '.code', '.data', '.bss', '.zp'})
+
+# Long forms of the unconditional relative branches.
+_LONG_BRANCHES = {'BRA': 'JMP', 'BSR': 'JSR'}
 
 
 def _build_opcode_table() -> Dict[str, Dict[str, OpcodeSpec]]:
@@ -696,6 +1234,7 @@ def _build_opcode_table() -> Dict[str, Dict[str, OpcodeSpec]]:
             addressing=item['addressing'],
             opcode=item['opcode'],
             size=item['size'],
+            cycles=item['cycles'],
         )
         table.setdefault(spec.mnemonic, {})[spec.addressing] = spec
     return table
@@ -712,65 +1251,54 @@ def _build_include_dirs(filename: str) -> List[Path]:
     return dirs
 
 
-def _build_sections(origin: int, machine: bytes, section_chunks: Dict[str, List[Tuple[int, List[int]]]], bss_entries: List[BssAllocation]) -> List[Section]:
+def _build_sections(
+    extents: List[Tuple[int, bytes]],
+    section_chunks: Dict[str, List[List[int]]],
+    bss_entries: List[BssAllocation],
+    zp_variables: Dict[str, int],
+) -> List[Section]:
     sections: List[Section] = []
-    for kind, chunks in section_chunks.items():
-        if not chunks:
-            continue
-        sorted_chunks = sorted(chunks, key=lambda item: item[0])
-        base_names = {'code': 'text', 'data': 'data'}
-        base_address = min(addr for addr, _ in sorted_chunks)
-        end_address = max(addr + len(bytes_) for addr, bytes_ in sorted_chunks)
-        buffer = bytearray(end_address - base_address)
-        for address, data_bytes in sorted_chunks:
-            offset = address - base_address
-            buffer[offset:offset + len(data_bytes)] = bytearray(data_bytes)
+    starts = [address for address, _ in extents]
+    base_names = {'code': 'text', 'data': 'data'}
+    for kind, ranges in section_chunks.items():
+        # One section per kind and extent; the lowest keeps the plain name.
+        groups: Dict[int, List[List[int]]] = {}
+        for chunk in ranges:
+            groups.setdefault(bisect_right(starts, chunk[0]) - 1, []).append(chunk)
         base = base_names.get(kind, kind)
-        sections.append(
-            Section(name=base, kind=kind, address=base_address, data=list(buffer), bss_size=0)
-        )
+        for position, extent_index in enumerate(sorted(groups)):
+            extent_address, extent = extents[extent_index]
+            group = groups[extent_index]
+            base_address = min(start for start, _ in group)
+            end_address = max(end for _, end in group)
+            # Bytes of other sections between this one's ranges stay zero.
+            buffer = bytearray(end_address - base_address)
+            for start, end in group:
+                offset = start - extent_address
+                buffer[start - base_address : end - base_address] = extent[offset : offset + end - start]
+            name = base if position == 0 else f"{base}@{base_address:04X}"
+            sections.append(
+                Section(name=name, kind=kind, address=base_address, data=bytes(buffer), bss_size=0)
+            )
     for index, entry in enumerate(bss_entries):
         name = entry.name or f"bss_{index}"
         sections.append(
-            Section(name=name, kind="bss", address=entry.address, data=[], bss_size=entry.size)
+            Section(name=name, kind="bss", address=entry.address, data=b"", bss_size=entry.size)
         )
+    # One section per `.zp` variable; the linker places each in the direct page.
+    for name, size in zp_variables.items():
+        sections.append(Section(name=f"zp.{name}", kind="zp", address=0, data=b"", bss_size=size))
     return sections
 
 
-def _normalize_operands(raw_operands: List[str]) -> Tuple[List[str], Optional[str]]:
-    if not raw_operands:
-        return [], None
-    operands: List[str] = []
-    forced_mode: Optional[str] = None
-    for index, operand in enumerate(raw_operands):
-        text = operand.strip()
-        if index == 0:
-            forced_mode, text = _extract_address_hint(text)
-        operands.append(text)
-    return operands, forced_mode
-
-
-def _extract_address_hint(operand: str) -> Tuple[Optional[str], str]:
-    if not operand:
-        return None, operand
-    if operand.startswith('#'):
-        return None, operand
-    if operand.startswith('<'):
-        return 'DIR', operand[1:].lstrip()
-    if operand.startswith('>'):
-        return 'EXT', operand[1:].lstrip()
-    return None, operand
-
-
-def _basic_addressing_mode(mnemonic: str, operands: List[str]) -> str:
+def _basic_addressing_mode(mnemonic: str, operands: List[Operand]) -> str:
     if not operands:
         return 'INH'
-    first = operands[0]
-    if first.startswith('#'):
+    if operands[0].immediate:
         return 'IMM'
-    if len(operands) == 1 and operands[0].upper() == 'X':
+    if len(operands) == 1 and operands[0].is_index_register:
         return 'IDX'
-    if len(operands) == 2 and operands[1].upper() == 'X':
+    if len(operands) == 2 and operands[1].is_index_register:
         return 'IDX'
     if mnemonic in _RELATIVE_MNEMONICS and len(operands) == 1:
         return 'REL'
@@ -780,6 +1308,26 @@ def _basic_addressing_mode(mnemonic: str, operands: List[str]) -> str:
 _RELATIVE_MNEMONICS = {spec['mnemonic'] for spec in opcodes_mb8861h.OPCODES if spec['addressing'] == 'REL'}
 
 
+def _is_relaxable_branch(spec: Optional[OpcodeSpec], operands: List[Operand], forced_mode: Optional[str]) -> bool:
+    return (
+        spec is not None
+        and spec.addressing in ('REL', 'LONG')
+        and forced_mode is None
+        and len(operands) == 1
+    )
+
+
+def _long_branch_spec(short: OpcodeSpec, table: Dict[str, Dict[str, OpcodeSpec]]) -> OpcodeSpec:
+    """`LONG` form of a REL branch: JMP/JSR for BRA/BSR, else inverted Bcc *+5 / JMP."""
+
+    jump = table[_LONG_BRANCHES.get(short.mnemonic, 'JMP')]['EXT']
+    if short.mnemonic in _LONG_BRANCHES:
+        return OpcodeSpec(short.mnemonic, 'LONG', jump.opcode, jump.size, jump.cycles)
+    # Condition codes come in pairs that differ only in bit 0.  Cycles are
+    # those of the taken path (branch falls through, then JMP).
+    return OpcodeSpec(short.mnemonic, 'LONG', short.opcode ^ 0x01, short.size + jump.size, short.cycles + jump.cycles)
+
+
 def _parse_string(value: str, line: ParsedLine) -> List[int]:
     if not value.startswith('"') or not value.endswith('"'):
         raise AssemblyError(_format_error(line, f"Expected string literal, got {value}"))
@@ -823,33 +1371,55 @@ def _alignment_padding(current: int, boundary: int) -> int:
     return boundary - remainder
 
 
-def _extract_symbol(expr: str, symbols: Dict[str, int], location: str) -> Optional[tuple[str, int]]:
-    token = expr.strip()
-    if not token:
+def _extract_symbol(
+    operand: Operand,
+    symbols: Dict[str, int],
+    location: str,
+    expressions: ExpressionCache,
+) -> Optional[tuple[str, int]]:
+    tokens = operand.tokens
+    start = 0
+    while tokens[start].kind in (TokenKind.HASH, TokenKind.LT, TokenKind.GT):
+        start += 1
+    head, rest = tokens[start], tokens[start + 1 :]
+    if head.kind is not TokenKind.IDENT:
         return None
-    while token and token[0] in ('#', '<', '>'):
-        token = token[1:].strip()
-    if not token:
+
+    symbol_name = head.value or ''
+    addend = 0
+    if rest[0].kind is TokenKind.PLUS or rest[0].kind is TokenKind.MINUS:
+        addend_expr = operand.expression[rest[0].column - tokens[0].column :]
+        addend = expressions.evaluate(addend_expr, symbols, location, rest)
+    elif rest[0].kind is not TokenKind.EOF:
         return None
+    return symbol_name, addend
 
-    symbol_part = token
-    addend_expr = ''
-    depth = 0
-    for idx, ch in enumerate(token):
-        if ch == '(':
-            depth += 1
-        elif ch == ')':
-            depth = max(depth - 1, 0)
-        elif depth == 0 and ch in '+-' and idx > 0:
-            symbol_part = token[:idx].strip()
-            addend_expr = token[idx:].strip()
-            break
-
-    if not symbol_part or not symbol_part.isidentifier():
+
+def _section_owner(sections: Iterable[Section]) -> Callable[[str, int], Optional[Section]]:
+    """Return a lookup of the section of a kind whose bytes cover an address."""
+    starts: Dict[str, List[Section]] = {}
+    for piece in sorted(sections, key=lambda item: item.address):
+        if piece.kind != "bss":
+            starts.setdefault(piece.kind, []).append(piece)
+    addresses = {kind: [piece.address for piece in pieces] for kind, pieces in starts.items()}
+
+    def owner(kind: str, address: int) -> Optional[Section]:
+        candidates = starts.get(kind, [])
+        index = bisect_right(addresses.get(kind, []), address) - 1
+        if index >= 0 and address < candidates[index].address + len(candidates[index].data):
+            return candidates[index]
         return None
 
-    symbol_name = symbol_part.upper()
-    addend = 0
-    if addend_expr:
-        addend = evaluate(addend_expr, symbols, location)
-    return symbol_name, addend
+    return owner
+
+
+def _bind_relocations(sections: List[Section], relocations: List[Relocation]) -> None:
+    """Point relocations at the section that holds them when a kind spans several extents."""
+    kinds = [section.kind for section in sections if section.kind not in ("bss", "zp")]
+    if len(kinds) == len(set(kinds)):
+        return
+    owner = _section_owner(sections)
+    for relocation in relocations:
+        piece = owner(relocation.section, relocation.offset)
+        if piece is not None:
+            relocation.section = piece.name
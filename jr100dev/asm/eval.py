@@ -1,8 +1,10 @@
 """Expression evaluation for the JR-100 assembler DSL."""
 from __future__ import annotations
 
-import math
-from typing import Dict
+import operator
+from typing import Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from .lexer import Lexer, LexerError, Token, TokenKind
 
 
 class ExpressionError(RuntimeError):
@@ -20,73 +22,205 @@ _ESCAPE_MAP = {
 }
 
 
+Evaluator = Callable[[Mapping[str, int]], int]
+# A compiled sub-expression: folded constant (if symbol-free) and its evaluator.
+_Node = Tuple[Optional[int], Evaluator]
+
+
+class CompiledExpression:
+    """Expression parsed once into a closure tree and evaluated many times."""
+
+    __slots__ = ("text", "symbols", "constant", "_func")
+
+    def __init__(self, text: str, symbols: FrozenSet[str], constant: Optional[int], func: Evaluator) -> None:
+        self.text = text
+        self.symbols = symbols
+        self.constant = constant
+        self._func = func
+
+    def evaluate(self, symbols: Mapping[str, int], location: str) -> int:
+        if self.constant is not None:
+            return self.constant & 0xFFFF
+        try:
+            value = self._func(symbols)
+        except KeyError as err:
+            raise ExpressionError(f"Undefined symbol {err.args[0]} at {location}") from err
+        except ZeroDivisionError as err:
+            raise ExpressionError(f"Division by zero at {location}") from err
+        except ValueError as err:
+            raise ExpressionError(f"Invalid expression '{self.text}' at {location}: {err}") from err
+        return value & 0xFFFF
+
+
+class ExpressionCache:
+    """Per-assembly cache of compiled expressions keyed by expression text."""
+
+    def __init__(self) -> None:
+        self._compiled: Dict[str, CompiledExpression] = {}
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    def compile(self, expr: str, location: str, tokens: Optional[Sequence[Token]] = None) -> CompiledExpression:
+        compiled = self._compiled.get(expr)
+        if compiled is None:
+            compiled = compile_expression(expr, location, tokens)
+            self._compiled[expr] = compiled
+        return compiled
+
+    def evaluate(
+        self, expr: str, symbols: Mapping[str, int], location: str, tokens: Optional[Sequence[Token]] = None
+    ) -> int:
+        return self.compile(expr, location, tokens).evaluate(symbols, location)
+
+
 def evaluate(expr: str, symbols: Dict[str, int], location: str) -> int:
-    translated = _translate(expr, location)
+    return compile_expression(expr, location).evaluate(symbols, location)
+
+
+def compile_expression(expr: str, location: str, tokens: Optional[Sequence[Token]] = None) -> CompiledExpression:
+    """Compile `expr`; pass `tokens` (ending in EOF) when the parser already scanned it."""
+    if tokens is None:
+        try:
+            tokens = Lexer(expr, filename="<expr>").tokenize()
+        except LexerError as err:
+            raise ExpressionError(f"Invalid expression '{expr}' at {location}: {err}") from err
+    parser = _ExpressionParser(expr, tokens, location)
+    constant, func = parser.parse()
+    return CompiledExpression(expr, frozenset(parser.names), constant, func)
+
+
+_BINARY_LEVELS: List[Dict[TokenKind, Callable[[int, int], int]]] = [
+    {TokenKind.PIPE: operator.or_},
+    {TokenKind.CARET: operator.xor},
+    {TokenKind.AMP: operator.and_},
+    {TokenKind.LSHIFT: operator.lshift, TokenKind.RSHIFT: operator.rshift},
+    {TokenKind.PLUS: operator.add, TokenKind.MINUS: operator.sub},
+    {TokenKind.STAR: operator.mul, TokenKind.SLASH: operator.floordiv},
+]
+
+_UNARY_OPERATORS: Dict[TokenKind, Callable[[int], int]] = {
+    TokenKind.MINUS: operator.neg,
+    TokenKind.PLUS: operator.pos,
+    TokenKind.TILDE: operator.invert,
+    TokenKind.LT: lambda value: value & 0xFF,
+    TokenKind.GT: lambda value: (value >> 8) & 0xFF,
+}
+
+
+class _ExpressionParser:
+    """Recursive-descent parser producing constant-folded closures."""
+
+    def __init__(self, text: str, tokens: Sequence[Token], location: str) -> None:
+        self.text = text
+        self.tokens = tokens
+        self.location = location
+        self.names: set[str] = set()
+        self._index = 0
+
+    def parse(self) -> _Node:
+        node = self._parse_binary(0)
+        token = self.tokens[self._index]
+        if token.kind != TokenKind.EOF:
+            raise self._error(f"unexpected token {_describe(token)}")
+        return node
+
+    def _parse_binary(self, level: int) -> _Node:
+        if level == len(_BINARY_LEVELS):
+            return self._parse_unary()
+        operators = _BINARY_LEVELS[level]
+        left = self._parse_binary(level + 1)
+        while self.tokens[self._index].kind in operators:
+            op = operators[self.tokens[self._index].kind]
+            self._index += 1
+            right = self._parse_binary(level + 1)
+            left = _combine(op, left, right)
+        return left
+
+    def _parse_unary(self) -> _Node:
+        token = self.tokens[self._index]
+        op = _UNARY_OPERATORS.get(token.kind)
+        if op is None:
+            return self._parse_primary()
+        self._index += 1
+        constant, func = self._parse_unary()
+        if constant is not None:
+            value = op(constant)
+            return value, lambda _symbols: value
+        return None, lambda symbols: op(func(symbols))
+
+    def _parse_primary(self) -> _Node:
+        token = self.tokens[self._index]
+        self._index += 1
+        if token.kind == TokenKind.NUMBER:
+            value = _parse_number(token.value or "", self.location)
+            return value, lambda _symbols: value
+        if token.kind == TokenKind.CHAR:
+            value = _parse_char(token.value or "", self.location)
+            return value, lambda _symbols: value
+        if token.kind == TokenKind.IDENT:
+            name = token.value or ""
+            self.names.add(name)
+            return None, lambda symbols: symbols[name]
+        if token.kind == TokenKind.LPAREN:
+            node = self._parse_binary(0)
+            closing = self.tokens[self._index]
+            if closing.kind != TokenKind.RPAREN:
+                raise self._error(f"expected ')' but found {_describe(closing)}")
+            self._index += 1
+            return node
+        raise self._error(f"unexpected token {_describe(token)}")
+
+    def _error(self, message: str) -> ExpressionError:
+        return ExpressionError(f"Invalid expression '{self.text}' at {self.location}: {message}")
+
+
+def _combine(op: Callable[[int, int], int], left: _Node, right: _Node) -> _Node:
+    left_const, left_func = left
+    right_const, right_func = right
+    if left_const is not None and right_const is not None:
+        try:
+            value = op(left_const, right_const)
+        except (ZeroDivisionError, ValueError):
+            # Defer the failure to evaluation so the error carries its location.
+            return None, lambda _symbols: op(left_const, right_const)
+        return value, lambda _symbols: value
+    if right_const is not None:
+        return None, lambda symbols: op(left_func(symbols), right_const)
+    if left_const is not None:
+        return None, lambda symbols: op(left_const, right_func(symbols))
+    return None, lambda symbols: op(left_func(symbols), right_func(symbols))
+
+
+def _describe(token: Token) -> str:
+    if token.kind == TokenKind.EOF:
+        return "end of expression"
+    if token.value is not None:
+        return repr(token.value)
+    return token.kind.name
+
+
+def _parse_number(text: str, location: str) -> int:
+    if text.startswith('$'):
+        digits, base, kind = text[1:], 16, "hex"
+    elif text.startswith('%'):
+        digits, base, kind = text[1:], 2, "binary"
+    else:
+        digits, base, kind = text, 10, "decimal"
+    if not digits:
+        raise ExpressionError(f"Invalid {kind} literal at {location}")
     try:
-        value = eval(translated, {"__builtins__": {}}, symbols)
-    except NameError as err:
-        raise ExpressionError(f"Undefined symbol {err} at {location}") from err
-    except ZeroDivisionError as err:
-        raise ExpressionError(f"Division by zero at {location}") from err
-    except Exception as err:
-        raise ExpressionError(f"Invalid expression '{expr}' at {location}: {err}") from err
-    if not isinstance(value, int):
-        raise ExpressionError(f"Expression '{expr}' at {location} did not evaluate to integer")
-    return value & 0xFFFF
-
-
-def _translate(expr: str, location: str) -> str:
-    result: list[str] = []
-    i = 0
-    while i < len(expr):
-        ch = expr[i]
-        if ch in ' \t':
-            result.append(ch)
-            i += 1
-            continue
-        if ch == '$':
-            j = i + 1
-            while j < len(expr) and expr[j].isalnum():
-                j += 1
-            if j == i + 1:
-                raise ExpressionError(f"Invalid hex literal at {location}")
-            digits = expr[i + 1:j]
-            result.append(f"0x{digits}")
-            i = j
-            continue
-        if ch == '%':
-            j = i + 1
-            while j < len(expr) and expr[j] in '01':
-                j += 1
-            if j == i + 1:
-                raise ExpressionError(f"Invalid binary literal at {location}")
-            digits = expr[i + 1:j]
-            result.append(f"0b{digits}")
-            i = j
-            continue
-        if ch == "'":
-            literal, length = _parse_char(expr[i:], location)
-            result.append(str(literal))
-            i += length
-            continue
-        result.append(ch)
-        i += 1
-    return ''.join(result)
-
-
-def _parse_char(fragment: str, location: str) -> tuple[int, int]:
-    if len(fragment) < 2 or fragment[0] != "'":
-        raise ExpressionError(f"Invalid char literal at {location}")
-    if len(fragment) >= 4 and fragment[1] == '\\':
-        escape = fragment[2]
+        return int(digits, base)
+    except ValueError as err:
+        raise ExpressionError(f"Invalid {kind} literal '{text}' at {location}") from err
+
+
+def _parse_char(literal: str, location: str) -> int:
+    if len(literal) == 2 and literal[0] == '\\':
+        escape = literal[1]
         if escape not in _ESCAPE_MAP:
             raise ExpressionError(f"Unsupported escape '\\{escape}' at {location}")
-        closing = fragment[3] if len(fragment) > 3 else ''
-        if closing != "'":
-            raise ExpressionError(f"Unterminated char literal at {location}")
-        value = ord(_ESCAPE_MAP[escape])
-        return value, 4
-    if len(fragment) < 3 or fragment[2] != "'":
-        raise ExpressionError(f"Unterminated char literal at {location}")
-    value = ord(fragment[1])
-    return value, 3
+        return ord(_ESCAPE_MAP[escape])
+    if len(literal) != 1:
+        raise ExpressionError(f"Invalid char literal at {location}")
+    return ord(literal)
@@ -1,12 +1,16 @@
 """Tokenizer for the JR-100 DSL."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import re
 from enum import Enum, auto
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Sequence, Tuple
 
 
 class TokenKind(Enum):
+    # Members are singletons compared by identity, so the C identity hash is
+    # equivalent to Enum.__hash__, which is Python code run on every dict lookup.
+    __hash__ = object.__hash__
+
     IDENT = auto()
     DIRECTIVE = auto()
     NUMBER = auto()
@@ -25,18 +29,23 @@ class TokenKind(Enum):
     TILDE = auto()
     LSHIFT = auto()
     RSHIFT = auto()
+    LT = auto()
+    GT = auto()
     LPAREN = auto()
     RPAREN = auto()
     NEWLINE = auto()
     EOF = auto()
 
 
-@dataclass(frozen=True)
-class Token:
+# A NamedTuple: the parser creates one per token of every source line, and
+# tuples are several times cheaper to build than dataclass instances.
+class Token(NamedTuple):
     kind: TokenKind
     value: Optional[str]
     line: int
     column: int
+    # Column just past the token, so the source text can be sliced back out.
+    end: int
 
 
 class LexerError(RuntimeError):
@@ -47,208 +56,160 @@ class Lexer:
     def __init__(self, source: str, filename: str = "<stdin>") -> None:
         self.source = source
         self.filename = filename
-        self._index = 0
-        self._line = 1
-        self._column = 1
 
     def tokenize(self) -> List[Token]:
-        tokens: List[Token] = []
-        while True:
-            token = self._next_token()
-            tokens.append(token)
-            if token.kind == TokenKind.EOF:
-                break
-        return tokens
-
-    def _next_token(self) -> Token:
-        self._skip_whitespace()
-        if self._index >= len(self.source):
-            return Token(TokenKind.EOF, None, self._line, self._column)
-
-        ch = self.source[self._index]
-        if ch == '\n':
-            token = Token(TokenKind.NEWLINE, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == ',':
-            token = Token(TokenKind.COMMA, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == ':':
-            token = Token(TokenKind.COLON, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '#':
-            token = Token(TokenKind.HASH, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '+':
-            token = Token(TokenKind.PLUS, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '-':
-            token = Token(TokenKind.MINUS, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '*':
-            token = Token(TokenKind.STAR, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '/':
-            token = Token(TokenKind.SLASH, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '&':
-            token = Token(TokenKind.AMP, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '|':
-            token = Token(TokenKind.PIPE, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '^':
-            token = Token(TokenKind.CARET, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '~':
-            token = Token(TokenKind.TILDE, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '(':
-            token = Token(TokenKind.LPAREN, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == ')':
-            token = Token(TokenKind.RPAREN, None, self._line, self._column)
-            self._advance()
-            return token
-        if ch == '<' and self._peek() == '<':
-            token = Token(TokenKind.LSHIFT, None, self._line, self._column)
-            self._advance(2)
-            return token
-        if ch == '>' and self._peek() == '>':
-            token = Token(TokenKind.RSHIFT, None, self._line, self._column)
-            self._advance(2)
-            return token
-        if ch == '"':
-            return self._lex_string()
-        if ch == '\'':
-            return self._lex_char()
-        if ch.isdigit() or ch in '$%':
-            return self._lex_number()
-        if ch == '.':
-            return self._lex_directive()
-        if ch.isalpha() or ch == '_':
-            return self._lex_identifier()
-
-        raise LexerError(f"Unexpected character {ch!r} at {self.filename}:{self._line}:{self._column}")
-
-    def _skip_whitespace(self) -> None:
-        while self._index < len(self.source):
-            ch = self.source[self._index]
-            if ch in ' \t\r':
-                self._advance()
-                continue
-            if ch == ';':
-                self._consume_comment()
-                continue
-            break
-
-    def _consume_comment(self) -> None:
-        while self._index < len(self.source) and self.source[self._index] != '\n':
-            self._advance()
-
-    def _lex_identifier(self) -> Token:
-        start = self._index
-        while self._index < len(self.source) and (self.source[self._index].isalnum() or self.source[self._index] == '_'):
-            self._advance()
-        value = self.source[start:self._index]
-        return Token(TokenKind.IDENT, value.upper(), self._line, self._column - (self._index - start))
-
-    def _lex_directive(self) -> Token:
-        start = self._index
-        self._advance()
-        while self._index < len(self.source) and self.source[self._index].isalpha():
-            self._advance()
-        value = self.source[start:self._index]
-        return Token(TokenKind.DIRECTIVE, value.lower(), self._line, self._column - (self._index - start))
-
-    def _lex_number(self) -> Token:
-        start = self._index
-        prefix = self.source[self._index]
-        if prefix == '$':
-            self._advance()
-            while self._index < len(self.source) and self.source[self._index].isalnum():
-                self._advance()
-        elif prefix == '%':
-            self._advance()
-            while self._index < len(self.source) and self.source[self._index] in '01':
-                self._advance()
+        return scan(self.source, self.filename)
+
+
+# One alternative per token kind, tried in this order, each with the blanks
+# before it so whitespace never costs a loop iteration of its own.  `error`
+# catches anything else, including the opening quote of an unterminated
+# string or char literal.
+_TOKEN_PATTERN = re.compile(
+    r"""
+    [ \t\r]*
+    (?:
+      (?P<IDENT>[^\W\d]\w*)
+    | (?P<NUMBER>\$[^\W_]*|%[01]*|\d+)
+    | (?P<PUNCT>[,:\#+\-*/&|^~()])
+    | (?P<comment>;[^\n]*)
+    | (?P<DIRECTIVE>\.[^\W\d_]*)
+    | (?P<STRING>"(?:[^"\\]|\\.)*")
+    | (?P<CHAR>'(?:\\.|[^\\])')
+    | (?P<SHIFT><<|>>)
+    | (?P<PUNCT2>[<>])
+    | (?P<NEWLINE>\n)
+    | (?P<error>[^ \t\r])
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_PUNCTUATION = {
+    ',': TokenKind.COMMA,
+    ':': TokenKind.COLON,
+    '#': TokenKind.HASH,
+    '+': TokenKind.PLUS,
+    '-': TokenKind.MINUS,
+    '*': TokenKind.STAR,
+    '/': TokenKind.SLASH,
+    '&': TokenKind.AMP,
+    '|': TokenKind.PIPE,
+    '^': TokenKind.CARET,
+    '~': TokenKind.TILDE,
+    '(': TokenKind.LPAREN,
+    ')': TokenKind.RPAREN,
+    '<': TokenKind.LT,
+    '>': TokenKind.GT,
+    '<<': TokenKind.LSHIFT,
+    '>>': TokenKind.RSHIFT,
+}
+
+
+def scan(source: str, filename: str = "<stdin>", line: int = 1) -> List[Token]:
+    """Tokenize `source` in one regex pass; the list always ends with EOF.
+
+    `line` numbers the first line, so a single preprocessed line can be
+    scanned with its own line number.
+    """
+
+    tokens: List[Token] = []
+    append = tokens.append
+    # Token(...) goes through a Python-level __new__; build the tuple directly.
+    new = tuple.__new__
+    line_start = 0
+    for match in _TOKEN_PATTERN.finditer(source):
+        kind = match.lastgroup
+        if kind == 'comment':
+            continue
+        start, end = match.span(kind)
+        column = start - line_start + 1
+        if kind == 'IDENT':
+            append(new(Token, (TokenKind.IDENT, match.group(kind).upper(), line, column, end - line_start + 1)))
+        elif kind == 'NUMBER':
+            append(new(Token, (TokenKind.NUMBER, match.group(kind), line, column, end - line_start + 1)))
+        elif kind == 'PUNCT' or kind == 'PUNCT2' or kind == 'SHIFT':
+            append(new(Token, (_PUNCTUATION[match.group(kind)], None, line, column, end - line_start + 1)))
+        elif kind == 'DIRECTIVE':
+            append(new(Token, (TokenKind.DIRECTIVE, match.group(kind).lower(), line, column, end - line_start + 1)))
+        elif kind == 'STRING' or kind == 'CHAR':
+            text = match.group(kind)
+            if kind == 'STRING':
+                append(new(Token, (TokenKind.STRING, text, line, column, end - line_start + 1)))
+            else:
+                append(new(Token, (TokenKind.CHAR, text[1:-1], line, column, end - line_start + 1)))
+            if '\n' in text:
+                line += text.count('\n')
+                line_start = start + text.rindex('\n') + 1
+        elif kind == 'NEWLINE':
+            append(new(Token, (TokenKind.NEWLINE, None, line, column, column + 1)))
+            line += 1
+            line_start = end
         else:
-            while self._index < len(self.source) and self.source[self._index].isdigit():
-                self._advance()
-        value = self.source[start:self._index]
-        return Token(TokenKind.NUMBER, value, self._line, self._column - (self._index - start))
-
-    def _lex_string(self) -> Token:
-        line = self._line
-        column = self._column
-        self._advance()  # opening quote
-        chars: List[str] = []
-        while self._index < len(self.source):
-            ch = self.source[self._index]
-            if ch == '"':
-                self._advance()
+            raise _scan_error(source, start, filename, line, column)
+    column = len(source) - line_start + 1
+    append(new(Token, (TokenKind.EOF, None, line, column, column)))
+    return tokens
+
+
+def split_operands(source: str, tokens: Sequence[Token]) -> List[Tuple[str, List[Token]]]:
+    """Split `tokens` (up to EOF) at commas into `(text, tokens)` per operand.
+
+    `text` is the operand as written in `source`, which must be the line the
+    tokens were scanned from.  Empty operands are dropped, so `,X` is `X`.
+    """
+
+    operands: List[Tuple[str, List[Token]]] = []
+    current: List[Token] = []
+    for token in tokens:
+        if token.kind is TokenKind.COMMA or token.kind is TokenKind.EOF:
+            if current:
+                operands.append((source[current[0].column - 1 : current[-1].end - 1], current))
+                current = []
+            if token.kind is TokenKind.EOF:
                 break
-            if ch == '\\':
-                self._advance()
-                if self._index >= len(self.source):
-                    raise LexerError(f"Unterminated escape sequence at {self.filename}:{line}:{column}")
-                escape = self.source[self._index]
-                self._advance()
-                chars.append(f"\\{escape}")
-                continue
-            chars.append(ch)
-            self._advance()
-        else:
-            raise LexerError(f"Unterminated string at {self.filename}:{line}:{column}")
-        value = '"' + ''.join(chars) + '"'
-        return Token(TokenKind.STRING, value, line, column)
-
-    def _lex_char(self) -> Token:
-        line = self._line
-        column = self._column
-        self._advance()  # opening quote
-        if self._index >= len(self.source):
-            raise LexerError(f"Unterminated char literal at {self.filename}:{line}:{column}")
-        ch = self.source[self._index]
-        if ch == '\\':
-            self._advance()
-            if self._index >= len(self.source):
-                raise LexerError(f"Unterminated escape sequence at {self.filename}:{line}:{column}")
-            escape = self.source[self._index]
-            self._advance()
-            literal = f"\\{escape}"
-        else:
-            self._advance()
-            literal = ch
-        if self._index >= len(self.source) or self.source[self._index] != '\'':
-            raise LexerError(f"Unterminated char literal at {self.filename}:{line}:{column}")
-        self._advance()  # closing quote
-        return Token(TokenKind.CHAR, literal, line, column)
-
-    def _peek(self) -> Optional[str]:
-        if self._index + 1 >= len(self.source):
-            return None
-        return self.source[self._index + 1]
-
-    def _advance(self, count: int = 1) -> None:
-        for _ in range(count):
-            if self._index >= len(self.source):
-                return
-            if self.source[self._index] == '\n':
-                self._line += 1
-                self._column = 1
-            else:
-                self._column += 1
-            self._index += 1
+            continue
+        current.append(token)
+    else:
+        if current:
+            operands.append((source[current[0].column - 1 : current[-1].end - 1], current))
+    return operands
+
+
+def find_markers(source: str) -> Tuple[int, int]:
+    """Return the index of the first `:` and of the `;` that starts the comment, -1 if absent.
+
+    The line is walked with the same token rules as `scan`, so `:` and `;`
+    inside string and char literals are not markers.  Unlike `scan` this
+    never raises, because macro bodies still hold `\\NAME` references: a
+    stray character is skipped, and an unterminated literal runs to the end
+    of the line, where the parser reports it.
+    """
+
+    colon = -1
+    for match in _TOKEN_PATTERN.finditer(source):
+        kind = match.lastgroup
+        if kind == 'comment':
+            return colon, match.start(kind)
+        if kind == 'PUNCT':
+            if colon < 0 and match.group(kind) == ':':
+                colon = match.start(kind)
+        elif kind == 'error' and match.group(kind) in '"\'':
+            break
+    return colon, -1
+
+
+def _scan_error(source: str, index: int, filename: str, line: int, column: int) -> LexerError:
+    where = f"{filename}:{line}:{column}"
+    ch = source[index]
+    if ch == '"':
+        # The pattern found no closing quote; only a trailing backslash matters.
+        escaped = len(source) - len(source.rstrip('\\'))
+        if escaped % 2 and escaped < len(source) - index:
+            return LexerError(f"Unterminated escape sequence at {where}")
+        return LexerError(f"Unterminated string at {where}")
+    if ch == "'":
+        if source[index + 1 :] == '\\':
+            return LexerError(f"Unterminated escape sequence at {where}")
+        return LexerError(f"Unterminated char literal at {where}")
+    return LexerError(f"Unexpected character {ch!r} at {where}")
@@ -2,207 +2,207 @@
 from __future__ import annotations
 
 OPCODES = [
-    {'mnemonic': 'NOP', 'addressing': 'INH', 'opcode': 0x01, 'size': 1},
-    {'mnemonic': 'TAP', 'addressing': 'INH', 'opcode': 0x06, 'size': 1},
-    {'mnemonic': 'TPA', 'addressing': 'INH', 'opcode': 0x07, 'size': 1},
-    {'mnemonic': 'INX', 'addressing': 'INH', 'opcode': 0x08, 'size': 1},
-    {'mnemonic': 'DEX', 'addressing': 'INH', 'opcode': 0x09, 'size': 1},
-    {'mnemonic': 'CLV', 'addressing': 'INH', 'opcode': 0x0A, 'size': 1},
-    {'mnemonic': 'SEV', 'addressing': 'INH', 'opcode': 0x0B, 'size': 1},
-    {'mnemonic': 'CLC', 'addressing': 'INH', 'opcode': 0x0C, 'size': 1},
-    {'mnemonic': 'SEC', 'addressing': 'INH', 'opcode': 0x0D, 'size': 1},
-    {'mnemonic': 'CLI', 'addressing': 'INH', 'opcode': 0x0E, 'size': 1},
-    {'mnemonic': 'SEI', 'addressing': 'INH', 'opcode': 0x0F, 'size': 1},
-    {'mnemonic': 'SBA', 'addressing': 'INH', 'opcode': 0x10, 'size': 1},
-    {'mnemonic': 'CBA', 'addressing': 'INH', 'opcode': 0x11, 'size': 1},
-    {'mnemonic': 'TAB', 'addressing': 'INH', 'opcode': 0x16, 'size': 1},
-    {'mnemonic': 'TBA', 'addressing': 'INH', 'opcode': 0x17, 'size': 1},
-    {'mnemonic': 'DAA', 'addressing': 'INH', 'opcode': 0x19, 'size': 1},
-    {'mnemonic': 'ABA', 'addressing': 'INH', 'opcode': 0x1B, 'size': 1},
-    {'mnemonic': 'BRA', 'addressing': 'REL', 'opcode': 0x20, 'size': 2},
-    {'mnemonic': 'BHI', 'addressing': 'REL', 'opcode': 0x22, 'size': 2},
-    {'mnemonic': 'BLS', 'addressing': 'REL', 'opcode': 0x23, 'size': 2},
-    {'mnemonic': 'BCC', 'addressing': 'REL', 'opcode': 0x24, 'size': 2},
-    {'mnemonic': 'BCS', 'addressing': 'REL', 'opcode': 0x25, 'size': 2},
-    {'mnemonic': 'BNE', 'addressing': 'REL', 'opcode': 0x26, 'size': 2},
-    {'mnemonic': 'BEQ', 'addressing': 'REL', 'opcode': 0x27, 'size': 2},
-    {'mnemonic': 'BVC', 'addressing': 'REL', 'opcode': 0x28, 'size': 2},
-    {'mnemonic': 'BVS', 'addressing': 'REL', 'opcode': 0x29, 'size': 2},
-    {'mnemonic': 'BPL', 'addressing': 'REL', 'opcode': 0x2A, 'size': 2},
-    {'mnemonic': 'BMI', 'addressing': 'REL', 'opcode': 0x2B, 'size': 2},
-    {'mnemonic': 'BGE', 'addressing': 'REL', 'opcode': 0x2C, 'size': 2},
-    {'mnemonic': 'BLT', 'addressing': 'REL', 'opcode': 0x2D, 'size': 2},
-    {'mnemonic': 'BGT', 'addressing': 'REL', 'opcode': 0x2E, 'size': 2},
-    {'mnemonic': 'BLE', 'addressing': 'REL', 'opcode': 0x2F, 'size': 2},
-    {'mnemonic': 'TSX', 'addressing': 'INH', 'opcode': 0x30, 'size': 1},
-    {'mnemonic': 'INS', 'addressing': 'INH', 'opcode': 0x31, 'size': 1},
-    {'mnemonic': 'PULA', 'addressing': 'INH', 'opcode': 0x32, 'size': 1},
-    {'mnemonic': 'PULB', 'addressing': 'INH', 'opcode': 0x33, 'size': 1},
-    {'mnemonic': 'DES', 'addressing': 'INH', 'opcode': 0x34, 'size': 1},
-    {'mnemonic': 'TXS', 'addressing': 'INH', 'opcode': 0x35, 'size': 1},
-    {'mnemonic': 'PSHA', 'addressing': 'INH', 'opcode': 0x36, 'size': 1},
-    {'mnemonic': 'PSHB', 'addressing': 'INH', 'opcode': 0x37, 'size': 1},
-    {'mnemonic': 'RTS', 'addressing': 'INH', 'opcode': 0x39, 'size': 1},
-    {'mnemonic': 'RTI', 'addressing': 'INH', 'opcode': 0x3B, 'size': 1},
-    {'mnemonic': 'WAI', 'addressing': 'INH', 'opcode': 0x3E, 'size': 1},
-    {'mnemonic': 'SWI', 'addressing': 'INH', 'opcode': 0x3F, 'size': 1},
-    {'mnemonic': 'NEGA', 'addressing': 'INH', 'opcode': 0x40, 'size': 1},
-    {'mnemonic': 'COMA', 'addressing': 'INH', 'opcode': 0x43, 'size': 1},
-    {'mnemonic': 'LSRA', 'addressing': 'INH', 'opcode': 0x44, 'size': 1},
-    {'mnemonic': 'RORA', 'addressing': 'INH', 'opcode': 0x46, 'size': 1},
-    {'mnemonic': 'ASRA', 'addressing': 'INH', 'opcode': 0x47, 'size': 1},
-    {'mnemonic': 'ASLA', 'addressing': 'INH', 'opcode': 0x48, 'size': 1},
-    {'mnemonic': 'ROLA', 'addressing': 'INH', 'opcode': 0x49, 'size': 1},
-    {'mnemonic': 'DECA', 'addressing': 'INH', 'opcode': 0x4A, 'size': 1},
-    {'mnemonic': 'INCA', 'addressing': 'INH', 'opcode': 0x4C, 'size': 1},
-    {'mnemonic': 'TSTA', 'addressing': 'INH', 'opcode': 0x4D, 'size': 1},
-    {'mnemonic': 'CLRA', 'addressing': 'INH', 'opcode': 0x4F, 'size': 1},
-    {'mnemonic': 'NEGB', 'addressing': 'INH', 'opcode': 0x50, 'size': 1},
-    {'mnemonic': 'COMB', 'addressing': 'INH', 'opcode': 0x53, 'size': 1},
-    {'mnemonic': 'LSRB', 'addressing': 'INH', 'opcode': 0x54, 'size': 1},
-    {'mnemonic': 'RORB', 'addressing': 'INH', 'opcode': 0x56, 'size': 1},
-    {'mnemonic': 'ASRB', 'addressing': 'INH', 'opcode': 0x57, 'size': 1},
-    {'mnemonic': 'ASLB', 'addressing': 'INH', 'opcode': 0x58, 'size': 1},
-    {'mnemonic': 'ROLB', 'addressing': 'INH', 'opcode': 0x59, 'size': 1},
-    {'mnemonic': 'DECB', 'addressing': 'INH', 'opcode': 0x5A, 'size': 1},
-    {'mnemonic': 'INCB', 'addressing': 'INH', 'opcode': 0x5C, 'size': 1},
-    {'mnemonic': 'TSTB', 'addressing': 'INH', 'opcode': 0x5D, 'size': 1},
-    {'mnemonic': 'CLRB', 'addressing': 'INH', 'opcode': 0x5F, 'size': 1},
-    {'mnemonic': 'NEG', 'addressing': 'IDX', 'opcode': 0x60, 'size': 2},
-    {'mnemonic': 'COM', 'addressing': 'IDX', 'opcode': 0x63, 'size': 2},
-    {'mnemonic': 'LSR', 'addressing': 'IDX', 'opcode': 0x64, 'size': 2},
-    {'mnemonic': 'ROR', 'addressing': 'IDX', 'opcode': 0x66, 'size': 2},
-    {'mnemonic': 'ASR', 'addressing': 'IDX', 'opcode': 0x67, 'size': 2},
-    {'mnemonic': 'ASL', 'addressing': 'IDX', 'opcode': 0x68, 'size': 2},
-    {'mnemonic': 'ROL', 'addressing': 'IDX', 'opcode': 0x69, 'size': 2},
-    {'mnemonic': 'DEC', 'addressing': 'IDX', 'opcode': 0x6A, 'size': 2},
-    {'mnemonic': 'INC', 'addressing': 'IDX', 'opcode': 0x6C, 'size': 2},
-    {'mnemonic': 'TST', 'addressing': 'IDX', 'opcode': 0x6D, 'size': 2},
-    {'mnemonic': 'JMP', 'addressing': 'IDX', 'opcode': 0x6E, 'size': 2},
-    {'mnemonic': 'CLR', 'addressing': 'IDX', 'opcode': 0x6F, 'size': 2},
-    {'mnemonic': 'NEG', 'addressing': 'EXT', 'opcode': 0x70, 'size': 3},
-    {'mnemonic': 'NIM', 'addressing': 'IDX', 'opcode': 0x71, 'size': 3},
-    {'mnemonic': 'OIM', 'addressing': 'IDX', 'opcode': 0x72, 'size': 3},
-    {'mnemonic': 'COM', 'addressing': 'EXT', 'opcode': 0x73, 'size': 3},
-    {'mnemonic': 'LSR', 'addressing': 'EXT', 'opcode': 0x74, 'size': 3},
-    {'mnemonic': 'XIM', 'addressing': 'IDX', 'opcode': 0x75, 'size': 3},
-    {'mnemonic': 'ROR', 'addressing': 'EXT', 'opcode': 0x76, 'size': 3},
-    {'mnemonic': 'ASR', 'addressing': 'EXT', 'opcode': 0x77, 'size': 3},
-    {'mnemonic': 'ASL', 'addressing': 'EXT', 'opcode': 0x78, 'size': 3},
-    {'mnemonic': 'ROL', 'addressing': 'EXT', 'opcode': 0x79, 'size': 3},
-    {'mnemonic': 'DEC', 'addressing': 'EXT', 'opcode': 0x7A, 'size': 3},
-    {'mnemonic': 'TMM', 'addressing': 'IDX', 'opcode': 0x7B, 'size': 3},
-    {'mnemonic': 'INC', 'addressing': 'EXT', 'opcode': 0x7C, 'size': 3},
-    {'mnemonic': 'TST', 'addressing': 'EXT', 'opcode': 0x7D, 'size': 3},
-    {'mnemonic': 'JMP', 'addressing': 'EXT', 'opcode': 0x7E, 'size': 3},
-    {'mnemonic': 'CLR', 'addressing': 'EXT', 'opcode': 0x7F, 'size': 3},
-    {'mnemonic': 'SUBA', 'addressing': 'IMM', 'opcode': 0x80, 'size': 2},
-    {'mnemonic': 'CMPA', 'addressing': 'IMM', 'opcode': 0x81, 'size': 2},
-    {'mnemonic': 'SBCA', 'addressing': 'IMM', 'opcode': 0x82, 'size': 2},
-    {'mnemonic': 'ANDA', 'addressing': 'IMM', 'opcode': 0x84, 'size': 2},
-    {'mnemonic': 'BITA', 'addressing': 'IMM', 'opcode': 0x85, 'size': 2},
-    {'mnemonic': 'LDAA', 'addressing': 'IMM', 'opcode': 0x86, 'size': 2},
-    {'mnemonic': 'EORA', 'addressing': 'IMM', 'opcode': 0x88, 'size': 2},
-    {'mnemonic': 'ADCA', 'addressing': 'IMM', 'opcode': 0x89, 'size': 2},
-    {'mnemonic': 'ORAA', 'addressing': 'IMM', 'opcode': 0x8A, 'size': 2},
-    {'mnemonic': 'ADDA', 'addressing': 'IMM', 'opcode': 0x8B, 'size': 2},
-    {'mnemonic': 'CPX', 'addressing': 'IMM', 'opcode': 0x8C, 'size': 3},
-    {'mnemonic': 'BSR', 'addressing': 'REL', 'opcode': 0x8D, 'size': 2},
-    {'mnemonic': 'LDS', 'addressing': 'IMM', 'opcode': 0x8E, 'size': 3},
-    {'mnemonic': 'SUBA', 'addressing': 'DIR', 'opcode': 0x90, 'size': 2},
-    {'mnemonic': 'CMPA', 'addressing': 'DIR', 'opcode': 0x91, 'size': 2},
-    {'mnemonic': 'SBCA', 'addressing': 'DIR', 'opcode': 0x92, 'size': 2},
-    {'mnemonic': 'ANDA', 'addressing': 'DIR', 'opcode': 0x94, 'size': 2},
-    {'mnemonic': 'BITA', 'addressing': 'DIR', 'opcode': 0x95, 'size': 2},
-    {'mnemonic': 'LDAA', 'addressing': 'DIR', 'opcode': 0x96, 'size': 2},
-    {'mnemonic': 'STAA', 'addressing': 'DIR', 'opcode': 0x97, 'size': 2},
-    {'mnemonic': 'EORA', 'addressing': 'DIR', 'opcode': 0x98, 'size': 2},
-    {'mnemonic': 'ADCA', 'addressing': 'DIR', 'opcode': 0x99, 'size': 2},
-    {'mnemonic': 'ORAA', 'addressing': 'DIR', 'opcode': 0x9A, 'size': 2},
-    {'mnemonic': 'ADDA', 'addressing': 'DIR', 'opcode': 0x9B, 'size': 2},
-    {'mnemonic': 'CPX', 'addressing': 'DIR', 'opcode': 0x9C, 'size': 2},
-    {'mnemonic': 'LDS', 'addressing': 'DIR', 'opcode': 0x9E, 'size': 2},
-    {'mnemonic': 'STS', 'addressing': 'DIR', 'opcode': 0x9F, 'size': 2},
-    {'mnemonic': 'SUBA', 'addressing': 'IDX', 'opcode': 0xA0, 'size': 2},
-    {'mnemonic': 'CMPA', 'addressing': 'IDX', 'opcode': 0xA1, 'size': 2},
-    {'mnemonic': 'SBCA', 'addressing': 'IDX', 'opcode': 0xA2, 'size': 2},
-    {'mnemonic': 'ANDA', 'addressing': 'IDX', 'opcode': 0xA4, 'size': 2},
-    {'mnemonic': 'BITA', 'addressing': 'IDX', 'opcode': 0xA5, 'size': 2},
-    {'mnemonic': 'LDAA', 'addressing': 'IDX', 'opcode': 0xA6, 'size': 2},
-    {'mnemonic': 'STAA', 'addressing': 'IDX', 'opcode': 0xA7, 'size': 2},
-    {'mnemonic': 'EORA', 'addressing': 'IDX', 'opcode': 0xA8, 'size': 2},
-    {'mnemonic': 'ADCA', 'addressing': 'IDX', 'opcode': 0xA9, 'size': 2},
-    {'mnemonic': 'ORAA', 'addressing': 'IDX', 'opcode': 0xAA, 'size': 2},
-    {'mnemonic': 'ADDA', 'addressing': 'IDX', 'opcode': 0xAB, 'size': 2},
-    {'mnemonic': 'CPX', 'addressing': 'IDX', 'opcode': 0xAC, 'size': 2},
-    {'mnemonic': 'JSR', 'addressing': 'IDX', 'opcode': 0xAD, 'size': 2},
-    {'mnemonic': 'LDS', 'addressing': 'IDX', 'opcode': 0xAE, 'size': 2},
-    {'mnemonic': 'STS', 'addressing': 'IDX', 'opcode': 0xAF, 'size': 2},
-    {'mnemonic': 'SUBA', 'addressing': 'EXT', 'opcode': 0xB0, 'size': 3},
-    {'mnemonic': 'CMPA', 'addressing': 'EXT', 'opcode': 0xB1, 'size': 3},
-    {'mnemonic': 'SBCA', 'addressing': 'EXT', 'opcode': 0xB2, 'size': 3},
-    {'mnemonic': 'ANDA', 'addressing': 'EXT', 'opcode': 0xB4, 'size': 3},
-    {'mnemonic': 'BITA', 'addressing': 'EXT', 'opcode': 0xB5, 'size': 3},
-    {'mnemonic': 'LDAA', 'addressing': 'EXT', 'opcode': 0xB6, 'size': 3},
-    {'mnemonic': 'STAA', 'addressing': 'EXT', 'opcode': 0xB7, 'size': 3},
-    {'mnemonic': 'EORA', 'addressing': 'EXT', 'opcode': 0xB8, 'size': 3},
-    {'mnemonic': 'ADCA', 'addressing': 'EXT', 'opcode': 0xB9, 'size': 3},
-    {'mnemonic': 'ORAA', 'addressing': 'EXT', 'opcode': 0xBA, 'size': 3},
-    {'mnemonic': 'ADDA', 'addressing': 'EXT', 'opcode': 0xBB, 'size': 3},
-    {'mnemonic': 'CPX', 'addressing': 'EXT', 'opcode': 0xBC, 'size': 3},
-    {'mnemonic': 'JSR', 'addressing': 'EXT', 'opcode': 0xBD, 'size': 3},
-    {'mnemonic': 'LDS', 'addressing': 'EXT', 'opcode': 0xBE, 'size': 3},
-    {'mnemonic': 'STS', 'addressing': 'EXT', 'opcode': 0xBF, 'size': 3},
-    {'mnemonic': 'SUBB', 'addressing': 'IMM', 'opcode': 0xC0, 'size': 2},
-    {'mnemonic': 'CMPB', 'addressing': 'IMM', 'opcode': 0xC1, 'size': 2},
-    {'mnemonic': 'SBCB', 'addressing': 'IMM', 'opcode': 0xC2, 'size': 2},
-    {'mnemonic': 'ANDB', 'addressing': 'IMM', 'opcode': 0xC4, 'size': 2},
-    {'mnemonic': 'BITB', 'addressing': 'IMM', 'opcode': 0xC5, 'size': 2},
-    {'mnemonic': 'LDAB', 'addressing': 'IMM', 'opcode': 0xC6, 'size': 2},
-    {'mnemonic': 'EORB', 'addressing': 'IMM', 'opcode': 0xC8, 'size': 2},
-    {'mnemonic': 'ADCB', 'addressing': 'IMM', 'opcode': 0xC9, 'size': 2},
-    {'mnemonic': 'ORAB', 'addressing': 'IMM', 'opcode': 0xCA, 'size': 2},
-    {'mnemonic': 'ADDB', 'addressing': 'IMM', 'opcode': 0xCB, 'size': 2},
-    {'mnemonic': 'LDX', 'addressing': 'IMM', 'opcode': 0xCE, 'size': 3},
-    {'mnemonic': 'SUBB', 'addressing': 'DIR', 'opcode': 0xD0, 'size': 2},
-    {'mnemonic': 'CMPB', 'addressing': 'DIR', 'opcode': 0xD1, 'size': 2},
-    {'mnemonic': 'SBCB', 'addressing': 'DIR', 'opcode': 0xD2, 'size': 2},
-    {'mnemonic': 'ANDB', 'addressing': 'DIR', 'opcode': 0xD4, 'size': 2},
-    {'mnemonic': 'BITB', 'addressing': 'DIR', 'opcode': 0xD5, 'size': 2},
-    {'mnemonic': 'LDAB', 'addressing': 'DIR', 'opcode': 0xD6, 'size': 2},
-    {'mnemonic': 'STAB', 'addressing': 'DIR', 'opcode': 0xD7, 'size': 2},
-    {'mnemonic': 'EORB', 'addressing': 'DIR', 'opcode': 0xD8, 'size': 2},
-    {'mnemonic': 'ADCB', 'addressing': 'DIR', 'opcode': 0xD9, 'size': 2},
-    {'mnemonic': 'ORAB', 'addressing': 'DIR', 'opcode': 0xDA, 'size': 2},
-    {'mnemonic': 'ADDB', 'addressing': 'DIR', 'opcode': 0xDB, 'size': 2},
-    {'mnemonic': 'LDX', 'addressing': 'DIR', 'opcode': 0xDE, 'size': 2},
-    {'mnemonic': 'STX', 'addressing': 'DIR', 'opcode': 0xDF, 'size': 2},
-    {'mnemonic': 'SUBB', 'addressing': 'IDX', 'opcode': 0xE0, 'size': 2},
-    {'mnemonic': 'CMPB', 'addressing': 'IDX', 'opcode': 0xE1, 'size': 2},
-    {'mnemonic': 'SBCB', 'addressing': 'IDX', 'opcode': 0xE2, 'size': 2},
-    {'mnemonic': 'ANDB', 'addressing': 'IDX', 'opcode': 0xE4, 'size': 2},
-    {'mnemonic': 'BITB', 'addressing': 'IDX', 'opcode': 0xE5, 'size': 2},
-    {'mnemonic': 'LDAB', 'addressing': 'IDX', 'opcode': 0xE6, 'size': 2},
-    {'mnemonic': 'STAB', 'addressing': 'IDX', 'opcode': 0xE7, 'size': 2},
-    {'mnemonic': 'EORB', 'addressing': 'IDX', 'opcode': 0xE8, 'size': 2},
-    {'mnemonic': 'ADCB', 'addressing': 'IDX', 'opcode': 0xE9, 'size': 2},
-    {'mnemonic': 'ORAB', 'addressing': 'IDX', 'opcode': 0xEA, 'size': 2},
-    {'mnemonic': 'ADDB', 'addressing': 'IDX', 'opcode': 0xEB, 'size': 2},
-    {'mnemonic': 'ADX', 'addressing': 'IMM', 'opcode': 0xEC, 'size': 2},
-    {'mnemonic': 'LDX', 'addressing': 'IDX', 'opcode': 0xEE, 'size': 2},
-    {'mnemonic': 'STX', 'addressing': 'IDX', 'opcode': 0xEF, 'size': 2},
-    {'mnemonic': 'SUBB', 'addressing': 'EXT', 'opcode': 0xF0, 'size': 3},
-    {'mnemonic': 'CMPB', 'addressing': 'EXT', 'opcode': 0xF1, 'size': 3},
-    {'mnemonic': 'SBCB', 'addressing': 'EXT', 'opcode': 0xF2, 'size': 3},
-    {'mnemonic': 'ANDB', 'addressing': 'EXT', 'opcode': 0xF4, 'size': 3},
-    {'mnemonic': 'BITB', 'addressing': 'EXT', 'opcode': 0xF5, 'size': 3},
-    {'mnemonic': 'LDAB', 'addressing': 'EXT', 'opcode': 0xF6, 'size': 3},
-    {'mnemonic': 'STAB', 'addressing': 'EXT', 'opcode': 0xF7, 'size': 3},
-    {'mnemonic': 'EORB', 'addressing': 'EXT', 'opcode': 0xF8, 'size': 3},
-    {'mnemonic': 'ADCB', 'addressing': 'EXT', 'opcode': 0xF9, 'size': 3},
-    {'mnemonic': 'ORAB', 'addressing': 'EXT', 'opcode': 0xFA, 'size': 3},
-    {'mnemonic': 'ADDB', 'addressing': 'EXT', 'opcode': 0xFB, 'size': 3},
-    {'mnemonic': 'ADX', 'addressing': 'EXT', 'opcode': 0xFC, 'size': 3},
-    {'mnemonic': 'LDX', 'addressing': 'EXT', 'opcode': 0xFE, 'size': 3},
-    {'mnemonic': 'STX', 'addressing': 'EXT', 'opcode': 0xFF, 'size': 3},
+    {'mnemonic': 'NOP', 'addressing': 'INH', 'opcode': 0x01, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'TAP', 'addressing': 'INH', 'opcode': 0x06, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'TPA', 'addressing': 'INH', 'opcode': 0x07, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'INX', 'addressing': 'INH', 'opcode': 0x08, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'DEX', 'addressing': 'INH', 'opcode': 0x09, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'CLV', 'addressing': 'INH', 'opcode': 0x0A, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'SEV', 'addressing': 'INH', 'opcode': 0x0B, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'CLC', 'addressing': 'INH', 'opcode': 0x0C, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'SEC', 'addressing': 'INH', 'opcode': 0x0D, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'CLI', 'addressing': 'INH', 'opcode': 0x0E, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'SEI', 'addressing': 'INH', 'opcode': 0x0F, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'SBA', 'addressing': 'INH', 'opcode': 0x10, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'CBA', 'addressing': 'INH', 'opcode': 0x11, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'TAB', 'addressing': 'INH', 'opcode': 0x16, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'TBA', 'addressing': 'INH', 'opcode': 0x17, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'DAA', 'addressing': 'INH', 'opcode': 0x19, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'ABA', 'addressing': 'INH', 'opcode': 0x1B, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'BRA', 'addressing': 'REL', 'opcode': 0x20, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BHI', 'addressing': 'REL', 'opcode': 0x22, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BLS', 'addressing': 'REL', 'opcode': 0x23, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BCC', 'addressing': 'REL', 'opcode': 0x24, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BCS', 'addressing': 'REL', 'opcode': 0x25, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BNE', 'addressing': 'REL', 'opcode': 0x26, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BEQ', 'addressing': 'REL', 'opcode': 0x27, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BVC', 'addressing': 'REL', 'opcode': 0x28, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BVS', 'addressing': 'REL', 'opcode': 0x29, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BPL', 'addressing': 'REL', 'opcode': 0x2A, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BMI', 'addressing': 'REL', 'opcode': 0x2B, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BGE', 'addressing': 'REL', 'opcode': 0x2C, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BLT', 'addressing': 'REL', 'opcode': 0x2D, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BGT', 'addressing': 'REL', 'opcode': 0x2E, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'BLE', 'addressing': 'REL', 'opcode': 0x2F, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'TSX', 'addressing': 'INH', 'opcode': 0x30, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'INS', 'addressing': 'INH', 'opcode': 0x31, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'PULA', 'addressing': 'INH', 'opcode': 0x32, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'PULB', 'addressing': 'INH', 'opcode': 0x33, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'DES', 'addressing': 'INH', 'opcode': 0x34, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'TXS', 'addressing': 'INH', 'opcode': 0x35, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'PSHA', 'addressing': 'INH', 'opcode': 0x36, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'PSHB', 'addressing': 'INH', 'opcode': 0x37, 'size': 1, 'cycles': 4},
+    {'mnemonic': 'RTS', 'addressing': 'INH', 'opcode': 0x39, 'size': 1, 'cycles': 5},
+    {'mnemonic': 'RTI', 'addressing': 'INH', 'opcode': 0x3B, 'size': 1, 'cycles': 10},
+    {'mnemonic': 'WAI', 'addressing': 'INH', 'opcode': 0x3E, 'size': 1, 'cycles': 9},
+    {'mnemonic': 'SWI', 'addressing': 'INH', 'opcode': 0x3F, 'size': 1, 'cycles': 12},
+    {'mnemonic': 'NEGA', 'addressing': 'INH', 'opcode': 0x40, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'COMA', 'addressing': 'INH', 'opcode': 0x43, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'LSRA', 'addressing': 'INH', 'opcode': 0x44, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'RORA', 'addressing': 'INH', 'opcode': 0x46, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'ASRA', 'addressing': 'INH', 'opcode': 0x47, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'ASLA', 'addressing': 'INH', 'opcode': 0x48, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'ROLA', 'addressing': 'INH', 'opcode': 0x49, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'DECA', 'addressing': 'INH', 'opcode': 0x4A, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'INCA', 'addressing': 'INH', 'opcode': 0x4C, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'TSTA', 'addressing': 'INH', 'opcode': 0x4D, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'CLRA', 'addressing': 'INH', 'opcode': 0x4F, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'NEGB', 'addressing': 'INH', 'opcode': 0x50, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'COMB', 'addressing': 'INH', 'opcode': 0x53, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'LSRB', 'addressing': 'INH', 'opcode': 0x54, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'RORB', 'addressing': 'INH', 'opcode': 0x56, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'ASRB', 'addressing': 'INH', 'opcode': 0x57, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'ASLB', 'addressing': 'INH', 'opcode': 0x58, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'ROLB', 'addressing': 'INH', 'opcode': 0x59, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'DECB', 'addressing': 'INH', 'opcode': 0x5A, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'INCB', 'addressing': 'INH', 'opcode': 0x5C, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'TSTB', 'addressing': 'INH', 'opcode': 0x5D, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'CLRB', 'addressing': 'INH', 'opcode': 0x5F, 'size': 1, 'cycles': 2},
+    {'mnemonic': 'NEG', 'addressing': 'IDX', 'opcode': 0x60, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'COM', 'addressing': 'IDX', 'opcode': 0x63, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'LSR', 'addressing': 'IDX', 'opcode': 0x64, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'ROR', 'addressing': 'IDX', 'opcode': 0x66, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'ASR', 'addressing': 'IDX', 'opcode': 0x67, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'ASL', 'addressing': 'IDX', 'opcode': 0x68, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'ROL', 'addressing': 'IDX', 'opcode': 0x69, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'DEC', 'addressing': 'IDX', 'opcode': 0x6A, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'INC', 'addressing': 'IDX', 'opcode': 0x6C, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'TST', 'addressing': 'IDX', 'opcode': 0x6D, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'JMP', 'addressing': 'IDX', 'opcode': 0x6E, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'CLR', 'addressing': 'IDX', 'opcode': 0x6F, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'NEG', 'addressing': 'EXT', 'opcode': 0x70, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'NIM', 'addressing': 'IDX', 'opcode': 0x71, 'size': 3, 'cycles': 8},
+    {'mnemonic': 'OIM', 'addressing': 'IDX', 'opcode': 0x72, 'size': 3, 'cycles': 8},
+    {'mnemonic': 'COM', 'addressing': 'EXT', 'opcode': 0x73, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'LSR', 'addressing': 'EXT', 'opcode': 0x74, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'XIM', 'addressing': 'IDX', 'opcode': 0x75, 'size': 3, 'cycles': 8},
+    {'mnemonic': 'ROR', 'addressing': 'EXT', 'opcode': 0x76, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'ASR', 'addressing': 'EXT', 'opcode': 0x77, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'ASL', 'addressing': 'EXT', 'opcode': 0x78, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'ROL', 'addressing': 'EXT', 'opcode': 0x79, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'DEC', 'addressing': 'EXT', 'opcode': 0x7A, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'TMM', 'addressing': 'IDX', 'opcode': 0x7B, 'size': 3, 'cycles': 7},
+    {'mnemonic': 'INC', 'addressing': 'EXT', 'opcode': 0x7C, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'TST', 'addressing': 'EXT', 'opcode': 0x7D, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'JMP', 'addressing': 'EXT', 'opcode': 0x7E, 'size': 3, 'cycles': 3},
+    {'mnemonic': 'CLR', 'addressing': 'EXT', 'opcode': 0x7F, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'SUBA', 'addressing': 'IMM', 'opcode': 0x80, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'CMPA', 'addressing': 'IMM', 'opcode': 0x81, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'SBCA', 'addressing': 'IMM', 'opcode': 0x82, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'ANDA', 'addressing': 'IMM', 'opcode': 0x84, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'BITA', 'addressing': 'IMM', 'opcode': 0x85, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'LDAA', 'addressing': 'IMM', 'opcode': 0x86, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'EORA', 'addressing': 'IMM', 'opcode': 0x88, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'ADCA', 'addressing': 'IMM', 'opcode': 0x89, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'ORAA', 'addressing': 'IMM', 'opcode': 0x8A, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'ADDA', 'addressing': 'IMM', 'opcode': 0x8B, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'CPX', 'addressing': 'IMM', 'opcode': 0x8C, 'size': 3, 'cycles': 3},
+    {'mnemonic': 'BSR', 'addressing': 'REL', 'opcode': 0x8D, 'size': 2, 'cycles': 8},
+    {'mnemonic': 'LDS', 'addressing': 'IMM', 'opcode': 0x8E, 'size': 3, 'cycles': 3},
+    {'mnemonic': 'SUBA', 'addressing': 'DIR', 'opcode': 0x90, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'CMPA', 'addressing': 'DIR', 'opcode': 0x91, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'SBCA', 'addressing': 'DIR', 'opcode': 0x92, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'ANDA', 'addressing': 'DIR', 'opcode': 0x94, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'BITA', 'addressing': 'DIR', 'opcode': 0x95, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'LDAA', 'addressing': 'DIR', 'opcode': 0x96, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'STAA', 'addressing': 'DIR', 'opcode': 0x97, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'EORA', 'addressing': 'DIR', 'opcode': 0x98, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'ADCA', 'addressing': 'DIR', 'opcode': 0x99, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'ORAA', 'addressing': 'DIR', 'opcode': 0x9A, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'ADDA', 'addressing': 'DIR', 'opcode': 0x9B, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'CPX', 'addressing': 'DIR', 'opcode': 0x9C, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'LDS', 'addressing': 'DIR', 'opcode': 0x9E, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'STS', 'addressing': 'DIR', 'opcode': 0x9F, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'SUBA', 'addressing': 'IDX', 'opcode': 0xA0, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'CMPA', 'addressing': 'IDX', 'opcode': 0xA1, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'SBCA', 'addressing': 'IDX', 'opcode': 0xA2, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ANDA', 'addressing': 'IDX', 'opcode': 0xA4, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'BITA', 'addressing': 'IDX', 'opcode': 0xA5, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'LDAA', 'addressing': 'IDX', 'opcode': 0xA6, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'STAA', 'addressing': 'IDX', 'opcode': 0xA7, 'size': 2, 'cycles': 6},
+    {'mnemonic': 'EORA', 'addressing': 'IDX', 'opcode': 0xA8, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ADCA', 'addressing': 'IDX', 'opcode': 0xA9, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ORAA', 'addressing': 'IDX', 'opcode': 0xAA, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ADDA', 'addressing': 'IDX', 'opcode': 0xAB, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'CPX', 'addressing': 'IDX', 'opcode': 0xAC, 'size': 2, 'cycles': 6},
+    {'mnemonic': 'JSR', 'addressing': 'IDX', 'opcode': 0xAD, 'size': 2, 'cycles': 8},
+    {'mnemonic': 'LDS', 'addressing': 'IDX', 'opcode': 0xAE, 'size': 2, 'cycles': 6},
+    {'mnemonic': 'STS', 'addressing': 'IDX', 'opcode': 0xAF, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'SUBA', 'addressing': 'EXT', 'opcode': 0xB0, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'CMPA', 'addressing': 'EXT', 'opcode': 0xB1, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'SBCA', 'addressing': 'EXT', 'opcode': 0xB2, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ANDA', 'addressing': 'EXT', 'opcode': 0xB4, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'BITA', 'addressing': 'EXT', 'opcode': 0xB5, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'LDAA', 'addressing': 'EXT', 'opcode': 0xB6, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'STAA', 'addressing': 'EXT', 'opcode': 0xB7, 'size': 3, 'cycles': 5},
+    {'mnemonic': 'EORA', 'addressing': 'EXT', 'opcode': 0xB8, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ADCA', 'addressing': 'EXT', 'opcode': 0xB9, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ORAA', 'addressing': 'EXT', 'opcode': 0xBA, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ADDA', 'addressing': 'EXT', 'opcode': 0xBB, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'CPX', 'addressing': 'EXT', 'opcode': 0xBC, 'size': 3, 'cycles': 5},
+    {'mnemonic': 'JSR', 'addressing': 'EXT', 'opcode': 0xBD, 'size': 3, 'cycles': 9},
+    {'mnemonic': 'LDS', 'addressing': 'EXT', 'opcode': 0xBE, 'size': 3, 'cycles': 5},
+    {'mnemonic': 'STS', 'addressing': 'EXT', 'opcode': 0xBF, 'size': 3, 'cycles': 6},
+    {'mnemonic': 'SUBB', 'addressing': 'IMM', 'opcode': 0xC0, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'CMPB', 'addressing': 'IMM', 'opcode': 0xC1, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'SBCB', 'addressing': 'IMM', 'opcode': 0xC2, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'ANDB', 'addressing': 'IMM', 'opcode': 0xC4, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'BITB', 'addressing': 'IMM', 'opcode': 0xC5, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'LDAB', 'addressing': 'IMM', 'opcode': 0xC6, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'EORB', 'addressing': 'IMM', 'opcode': 0xC8, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'ADCB', 'addressing': 'IMM', 'opcode': 0xC9, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'ORAB', 'addressing': 'IMM', 'opcode': 0xCA, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'ADDB', 'addressing': 'IMM', 'opcode': 0xCB, 'size': 2, 'cycles': 2},
+    {'mnemonic': 'LDX', 'addressing': 'IMM', 'opcode': 0xCE, 'size': 3, 'cycles': 3},
+    {'mnemonic': 'SUBB', 'addressing': 'DIR', 'opcode': 0xD0, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'CMPB', 'addressing': 'DIR', 'opcode': 0xD1, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'SBCB', 'addressing': 'DIR', 'opcode': 0xD2, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'ANDB', 'addressing': 'DIR', 'opcode': 0xD4, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'BITB', 'addressing': 'DIR', 'opcode': 0xD5, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'LDAB', 'addressing': 'DIR', 'opcode': 0xD6, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'STAB', 'addressing': 'DIR', 'opcode': 0xD7, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'EORB', 'addressing': 'DIR', 'opcode': 0xD8, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'ADCB', 'addressing': 'DIR', 'opcode': 0xD9, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'ORAB', 'addressing': 'DIR', 'opcode': 0xDA, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'ADDB', 'addressing': 'DIR', 'opcode': 0xDB, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'LDX', 'addressing': 'DIR', 'opcode': 0xDE, 'size': 2, 'cycles': 4},
+    {'mnemonic': 'STX', 'addressing': 'DIR', 'opcode': 0xDF, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'SUBB', 'addressing': 'IDX', 'opcode': 0xE0, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'CMPB', 'addressing': 'IDX', 'opcode': 0xE1, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'SBCB', 'addressing': 'IDX', 'opcode': 0xE2, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ANDB', 'addressing': 'IDX', 'opcode': 0xE4, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'BITB', 'addressing': 'IDX', 'opcode': 0xE5, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'LDAB', 'addressing': 'IDX', 'opcode': 0xE6, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'STAB', 'addressing': 'IDX', 'opcode': 0xE7, 'size': 2, 'cycles': 6},
+    {'mnemonic': 'EORB', 'addressing': 'IDX', 'opcode': 0xE8, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ADCB', 'addressing': 'IDX', 'opcode': 0xE9, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ORAB', 'addressing': 'IDX', 'opcode': 0xEA, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ADDB', 'addressing': 'IDX', 'opcode': 0xEB, 'size': 2, 'cycles': 5},
+    {'mnemonic': 'ADX', 'addressing': 'IMM', 'opcode': 0xEC, 'size': 2, 'cycles': 3},
+    {'mnemonic': 'LDX', 'addressing': 'IDX', 'opcode': 0xEE, 'size': 2, 'cycles': 6},
+    {'mnemonic': 'STX', 'addressing': 'IDX', 'opcode': 0xEF, 'size': 2, 'cycles': 7},
+    {'mnemonic': 'SUBB', 'addressing': 'EXT', 'opcode': 0xF0, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'CMPB', 'addressing': 'EXT', 'opcode': 0xF1, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'SBCB', 'addressing': 'EXT', 'opcode': 0xF2, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ANDB', 'addressing': 'EXT', 'opcode': 0xF4, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'BITB', 'addressing': 'EXT', 'opcode': 0xF5, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'LDAB', 'addressing': 'EXT', 'opcode': 0xF6, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'STAB', 'addressing': 'EXT', 'opcode': 0xF7, 'size': 3, 'cycles': 5},
+    {'mnemonic': 'EORB', 'addressing': 'EXT', 'opcode': 0xF8, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ADCB', 'addressing': 'EXT', 'opcode': 0xF9, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ORAB', 'addressing': 'EXT', 'opcode': 0xFA, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ADDB', 'addressing': 'EXT', 'opcode': 0xFB, 'size': 3, 'cycles': 4},
+    {'mnemonic': 'ADX', 'addressing': 'EXT', 'opcode': 0xFC, 'size': 3, 'cycles': 7},
+    {'mnemonic': 'LDX', 'addressing': 'EXT', 'opcode': 0xFE, 'size': 3, 'cycles': 5},
+    {'mnemonic': 'STX', 'addressing': 'EXT', 'opcode': 0xFF, 'size': 3, 'cycles': 6},
 ]
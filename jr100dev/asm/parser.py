@@ -1,135 +1,215 @@
 """Lightweight line parser for the JR-100 assembler DSL."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .lexer import LexerError, Token, TokenKind, scan, split_operands
+from .preprocessor import Expansion, SourceLine
 
 
 class ParserError(RuntimeError):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
+class Operand:
+    """One comma-separated operand, tokenized once when its line is parsed.
+
+    `text` is the operand as written, minus a leading `<`/`>` addressing hint.
+    `expression` and `tokens` are the value alone (no `#`, no hint); `tokens`
+    ends with EOF so the expression evaluator can consume it directly.
+    Operands are shared between identical source lines; treat them as read-only.
+    """
+
+    text: str
+    expression: str
+    tokens: Tuple[Token, ...] = field(compare=False, repr=False)
+    immediate: bool = False
+    # 'DIR' for `<expr`, 'EXT' for `>expr`; only on an instruction's first operand.
+    hint: Optional[str] = None
+
+    @property
+    def is_index_register(self) -> bool:
+        return (
+            not self.immediate
+            and len(self.tokens) == 2
+            and self.tokens[0].kind is TokenKind.IDENT
+            and self.tokens[0].value == 'X'
+        )
+
+    @property
+    def is_string(self) -> bool:
+        return len(self.tokens) == 2 and self.tokens[0].kind is TokenKind.STRING
+
+
+@dataclass(slots=True)
 class ParsedLine:
     line_no: int
     text: str
     label: Optional[str]
     op: str
-    operands: List[str]
+    operands: List[Operand]
     is_directive: bool
+    # Where the line came from; see `SourceLine`.
+    file: str = "<input>"
+    source_line: int = 0
+    expansion: Tuple[Expansion, ...] = ()
+
+    @property
+    def location(self) -> str:
+        return format_location(self.file, self.source_line, self.expansion)
+
+
+def format_location(file: str, line: int, expansion: Sequence[Expansion] = ()) -> str:
+    """`file:line`, followed by the macro body lines it was expanded from."""
+    return f"{file}:{line}{_expansion_suffix(expansion)}"
+
+
+def _expansion_suffix(expansion: Sequence[Expansion]) -> str:
+    return "".join(f" (macro {frame.macro} at {frame.file}:{frame.line})" for frame in expansion)
+
+
+_HINTS = {TokenKind.LT: 'DIR', TokenKind.GT: 'EXT'}
+
+
+# label, op, operands, is_directive
+_Statement = Tuple[Optional[str], str, List[Operand], bool]
+
+
+class LineOrigins(Sequence[Tuple[str, int]]):
+    """`(file, line)` per preprocessed line, kept as a file table and two arrays.
+
+    A list of tuples costs about a hundred bytes a line; this costs six.
+    """
+
+    __slots__ = ("files", "_file_ids", "_lines", "_ids")
 
+    def __init__(self) -> None:
+        self.files: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._file_ids = array('H')
+        self._lines = array('I')
+
+    def append(self, origin: Tuple[str, int]) -> None:
+        file, line = origin
+        file_id = self._ids.get(file)
+        if file_id is None:
+            file_id = self._ids[file] = len(self.files)
+            self.files.append(file)
+        self._file_ids.append(file_id)
+        self._lines.append(line)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.files[self._file_ids[index]], self._lines[index]
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        files = self.files
+        return zip(map(files.__getitem__, self._file_ids), self._lines)
+
+
+def parse_source(source: str, filename: str = "<input>") -> List[ParsedLine]:
+    return parse_lines(
+        SourceLine(raw, filename, idx) for idx, raw in enumerate(source.splitlines(), start=1)
+    )
+
+
+def parse_lines(
+    records: Iterable[SourceLine],
+    *,
+    origins: Optional[LineOrigins] = None,
+) -> List[ParsedLine]:
+    """Parse preprocessed lines as they are produced, numbering them from 1.
+
+    `origins`, when given, receives `(file, line)` for every record, blank
+    ones included, so it can be indexed by `line_no`.
+    """
 
-def parse_source(source: str) -> List[ParsedLine]:
     lines: List[ParsedLine] = []
-    for idx, raw in enumerate(source.splitlines(), start=1):
-        text = raw.split(';', 1)[0].strip()
-        if not text:
-            continue
-        label: Optional[str] = None
-        rest = text
-        if ':' in text:
-            label_part, rest_part = text.split(':', 1)
-            if not label_part.strip():
-                raise ParserError(f"Empty label at line {idx}")
-            label = label_part.strip().upper()
-            rest = rest_part.strip()
-            if not rest:
-                lines.append(
-                    ParsedLine(
-                        line_no=idx,
-                        text=raw.rstrip(),
-                        label=label,
-                        op='.label',
-                        operands=[],
-                        is_directive=True,
-                    )
-                )
-                continue
-        if not rest:
-            raise ParserError(f"Missing statement after label at line {idx}")
-        if rest.startswith('.'):
-            op, operand_str = _split_op_operands(rest)
-            directive = op.lower()
-            operands = _split_operands(operand_str) if operand_str is not None else []
-            lines.append(
-                ParsedLine(
-                    line_no=idx,
-                    text=raw.rstrip(),
-                    label=label,
-                    op=directive,
-                    operands=operands,
-                    is_directive=True,
-                )
-            )
+    # Macro expansions repeat lines verbatim, so each distinct text is
+    # scanned once; its tokens keep the line number of the first occurrence.
+    statements: Dict[str, Optional[_Statement]] = {}
+    for idx, record in enumerate(records, start=1):
+        raw = record.text
+        if origins is not None:
+            origins.append((record.file, record.line))
+        if raw in statements:
+            statement = statements[raw]
+        else:
+            statement = statements[raw] = _parse_statement(raw, record)
+        if statement is None:
             continue
-        op, operand_str = _split_op_operands(rest)
-        mnemonic = op.upper()
-        operands = _split_operands(operand_str) if operand_str is not None else []
+        label, op, operands, is_directive = statement
         lines.append(
             ParsedLine(
                 line_no=idx,
                 text=raw.rstrip(),
                 label=label,
-                op=mnemonic,
+                op=op,
+                # Shared with every identical line; nothing mutates it in place.
                 operands=operands,
-                is_directive=False,
+                is_directive=is_directive,
+                file=record.file,
+                source_line=record.line,
+                expansion=record.expansion,
             )
         )
     return lines
 
 
-def _split_op_operands(statement: str) -> tuple[str, Optional[str]]:
-    parts = statement.strip().split(None, 1)
-    if not parts:
-        raise ParserError("Empty statement")
-    if len(parts) == 1:
-        return parts[0], None
-    return parts[0], parts[1].strip()
-
-
-def _split_operands(operand_str: str) -> List[str]:
-    values: List[str] = []
-    current: List[str] = []
-    in_string = False
-    in_char = False
-    escaped = False
-    for ch in operand_str:
-        if in_string:
-            current.append(ch)
-            if escaped:
-                escaped = False
-                continue
-            if ch == '\\':
-                escaped = True
-                continue
-            if ch == '"':
-                in_string = False
-            continue
-        if in_char:
-            current.append(ch)
-            if escaped:
-                escaped = False
-                continue
-            if ch == '\\':
-                escaped = True
-                continue
-            if ch == '\'':
-                in_char = False
-            continue
-        if ch == '"':
-            in_string = True
-            current.append(ch)
-            continue
-        if ch == '\'':
-            in_char = True
-            current.append(ch)
-            continue
-        if ch == ',':
-            values.append(''.join(current).strip())
-            current = []
-            continue
-        current.append(ch)
-    if current:
-        values.append(''.join(current).strip())
-    cleaned = [value for value in values if value]
-    return cleaned
+def _parse_statement(raw: str, record: SourceLine) -> Optional[_Statement]:
+    try:
+        tokens = scan(raw, record.file, record.line)
+    except LexerError as err:
+        raise ParserError(f"Invalid syntax: {err}{_expansion_suffix(record.expansion)}") from err
+    first = 0
+    label: Optional[str] = None
+    if ':' in raw:
+        for index, token in enumerate(tokens):
+            if token.kind is TokenKind.COLON:
+                label_part = raw[: token.column - 1].strip()
+                if not label_part:
+                    raise ParserError(f"Empty label at {format_location(record.file, record.line, record.expansion)}")
+                label = sys.intern(label_part.upper())
+                first = index + 1
+                break
+    head = tokens[first]
+    if head.kind is TokenKind.EOF:
+        return None if label is None else (label, '.label', [], True)
+    if head.kind is not TokenKind.IDENT and head.kind is not TokenKind.DIRECTIVE:
+        raise ParserError(
+            f"Expected a mnemonic or directive at {format_location(record.file, record.line, record.expansion)}"
+        )
+    is_directive = head.kind is TokenKind.DIRECTIVE
+    # Interned so the many lines that share a mnemonic share one string.
+    return label, sys.intern(head.value or ''), _operands(raw, tokens[first + 1 :], hints=not is_directive), is_directive
+
+
+def _operands(raw: str, tokens: Sequence[Token], *, hints: bool) -> List[Operand]:
+    # Every operand's tokens end with the line's EOF, which is all the
+    # evaluator needs; one scan of the line serves all of its operands.
+    eof = tokens[-1]
+    operands: List[Operand] = []
+    for text, group in split_operands(raw, tokens):
+        head = group[0].kind
+        immediate = head is TokenKind.HASH
+        hint = _HINTS.get(head) if hints and not operands else None
+        value = group[1:] if immediate or hint else group
+        expression = raw[value[0].column - 1 : value[-1].end - 1] if value else ''
+        operands.append(
+            Operand(
+                text=expression if hint else text,
+                expression=expression,
+                tokens=(*value, eof),
+                immediate=immediate,
+                hint=hint,
+            )
+        )
+    return operands
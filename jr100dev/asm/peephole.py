@@ -0,0 +1,285 @@
+"""Peephole optimizer for refined `LineState` lists (`assemble --optimize`).
+
+The optimizer runs after addressing modes have been relaxed and before the
+second pass.  It only rewrites instructions in place: an instruction it
+drops becomes a `.label` line (keeping any label it carried), so the
+relaxation engine can shift the addresses that follow.  Because every rule
+shrinks or keeps the code size, distances between two points never grow
+and branch ranges checked against the pre-rewrite addresses stay valid.
+
+Rules (each only fires when the behaviour is unchanged):
+
+* ``redundant-load``  ``STAA x``/``LDAA x`` or ``LDAA x``/``LDAA x`` -- the
+  second instruction is dropped.  Loads set N/Z and clear V exactly like
+  the preceding store, so the flags are identical.  Indexed operands and
+  the VIA I/O page are never touched.
+* ``tail-call``  ``JSR f``/``RTS`` becomes ``JMP f`` (``BSR`` becomes
+  ``BRA``); the ``RTS`` is dropped unless a label still reaches it.
+* ``branch-chain``  a branch or ``JMP`` whose target starts with ``BRA``
+  (or ``JMP`` for a ``JMP`` source) is retargeted to the final destination.
+* ``clear-register``  ``LDAA #0`` becomes ``CLRA`` when the carry it would
+  clear is overwritten before anything can read it.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .parser import Operand
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle with encoder
+    from .encoder import Assembler, LineState
+
+# VIA registers live here; reads and writes have side effects.
+_IO_PAGE = range(0xC800, 0xC900)
+
+_LOAD_FOR = {
+    'STAA': 'LDAA', 'STAB': 'LDAB', 'STX': 'LDX', 'STS': 'LDS',
+    'LDAA': 'LDAA', 'LDAB': 'LDAB', 'LDX': 'LDX', 'LDS': 'LDS',
+}
+_TAIL_CALLS = {'JSR': 'JMP', 'BSR': 'BRA'}
+_CLEARS = {'LDAA': 'CLRA', 'LDAB': 'CLRB'}
+
+_READS_CARRY = frozenset({
+    'ADCA', 'ADCB', 'SBCA', 'SBCB', 'ROL', 'ROLA', 'ROLB', 'ROR', 'RORA', 'RORB',
+    'BCC', 'BCS', 'BHI', 'BLS', 'TPA', 'DAA',
+})
+_WRITES_CARRY = frozenset({
+    'ADDA', 'ADDB', 'ABA', 'SUBA', 'SUBB', 'SBA', 'CMPA', 'CMPB', 'CBA', 'CLC', 'SEC', 'TAP',
+    'ASL', 'ASLA', 'ASLB', 'ASR', 'ASRA', 'ASRB', 'LSR', 'LSRA', 'LSRB',
+    'NEG', 'NEGA', 'NEGB', 'COM', 'COMA', 'COMB', 'CLR', 'CLRA', 'CLRB', 'TST', 'TSTA', 'TSTB',
+})
+_TRANSFERS = frozenset({'JMP', 'JSR', 'BSR', 'RTS', 'RTI', 'SWI', 'WAI'})
+
+_MAX_ROUNDS = 8
+_MAX_HOPS = 8
+
+
+@dataclass
+class PeepholeRewrite:
+    line_no: int
+    text: str
+    rule: str
+    bytes_saved: int
+    # Saved each time the rewritten code runs (taken path for branches).
+    cycles_saved: int
+
+
+class PeepholeOptimizer:
+    def __init__(self, assembler: 'Assembler', states: List['LineState'], symbols: Dict[str, int]) -> None:
+        self.assembler = assembler
+        self.states = states
+        self.symbols = symbols
+        self.rewrites: List[PeepholeRewrite] = []
+        # (state index, size delta) for the relaxation engine.
+        self.resized: List[Tuple[int, int]] = []
+        self.label_states = {
+            state.line.label: index
+            for index, state in enumerate(states)
+            if state.line.label and state.address is not None
+        }
+
+    def run(self) -> Tuple[List[PeepholeRewrite], List[Tuple[int, int]]]:
+        for _ in range(_MAX_ROUNDS):
+            before = len(self.rewrites)
+            for index, state in enumerate(self.states):
+                if state.opcode is None or state.line.is_directive or state.section_kind != 'text':
+                    continue
+                (
+                    self._redundant_load(index)
+                    or self._tail_call(index)
+                    or self._branch_chain(index)
+                    or self._clear_register(index)
+                )
+            if len(self.rewrites) == before:
+                break
+        return self.rewrites, self.resized
+
+    # -- rules -----------------------------------------------------------
+
+    def _redundant_load(self, index: int) -> bool:
+        state = self.states[index]
+        load = _LOAD_FOR.get(state.line.op)
+        if load is None or state.opcode.addressing not in ('DIR', 'EXT'):
+            return False
+        following, labeled = self._next_instruction(index)
+        if following is None or labeled:
+            return False
+        other = self.states[following]
+        if (
+            other.line.op != load
+            or other.opcode.addressing != state.opcode.addressing
+            or other.operands != state.operands
+        ):
+            return False
+        address = self.assembler._try_resolve_operand(state.operands[0], self.symbols, state.line)
+        if address is None or address in _IO_PAGE:
+            return False
+        self._record(other, 'redundant-load', other.opcode.size, other.opcode.cycles)
+        self._remove(following)
+        return True
+
+    def _tail_call(self, index: int) -> bool:
+        state = self.states[index]
+        jump = _TAIL_CALLS.get(state.line.op)
+        if jump is None:
+            return False
+        following, labeled = self._next_instruction(index)
+        if following is None or self.states[following].line.op != 'RTS':
+            return False
+        spec = self.assembler.opcode_table[jump].get(state.opcode.addressing)
+        if spec is None:  # a BSR already widened to JSR by --long-branches
+            return False
+        ret = self.states[following].opcode
+        saved_bytes = 0 if labeled else ret.size
+        self._record(state, 'tail-call', saved_bytes, state.opcode.cycles + ret.cycles - spec.cycles)
+        self._rewrite(index, jump, spec, state.operands)
+        if not labeled:
+            self._remove(following)
+        return True
+
+    def _branch_chain(self, index: int) -> bool:
+        state = self.states[index]
+        relative = state.opcode.addressing == 'REL'
+        if not relative and not (state.line.op == 'JMP' and state.opcode.addressing == 'EXT'):
+            return False
+        if state.line.op == 'BSR' or len(state.operands) != 1:
+            return False
+        operand = state.operands[0]
+        target = operand.text.upper()
+        saved = 0
+        seen = {target}
+        for _ in range(_MAX_HOPS):
+            hop = self._first_instruction(target)
+            if hop is None:
+                break
+            hop_state = self.states[hop]
+            if hop_state.line.op == 'BRA':
+                cost = hop_state.opcode.cycles
+            elif hop_state.line.op == 'JMP' and not relative and hop_state.opcode.addressing == 'EXT':
+                cost = hop_state.opcode.cycles
+            else:
+                break
+            if len(hop_state.operands) != 1:
+                break
+            destination = hop_state.operands[0].text.upper()
+            if destination in seen or destination not in self.label_states:
+                break
+            if relative:
+                offset = self.symbols[destination] - (state.address + state.opcode.size)
+                if not -128 <= offset <= 127:
+                    break
+            seen.add(destination)
+            target = destination
+            operand = hop_state.operands[0]
+            saved += cost
+        if not saved:
+            return False
+        self._record(state, 'branch-chain', 0, saved)
+        self._rewrite(index, state.line.op, state.opcode, [operand])
+        return True
+
+    def _clear_register(self, index: int) -> bool:
+        state = self.states[index]
+        clear = _CLEARS.get(state.line.op)
+        if clear is None or state.opcode.addressing != 'IMM':
+            return False
+        value = self.assembler._try_resolve_operand(state.operands[0], self.symbols, state.line)
+        if value != 0 or self._carry_live_after(index):
+            return False
+        spec = self.assembler.opcode_table[clear]['INH']
+        self._record(state, 'clear-register', state.opcode.size - spec.size, state.opcode.cycles - spec.cycles)
+        self._rewrite(index, clear, spec, [])
+        return True
+
+    # -- helpers ---------------------------------------------------------
+
+    def _next_instruction(self, index: int) -> Tuple[Optional[int], bool]:
+        """Next instruction after `index` and whether a label may enter before it."""
+        labeled = False
+        for position in range(index + 1, len(self.states)):
+            state = self.states[position]
+            if state.address is None:
+                if state.line.op == '.org':
+                    # Execution does not fall through into another region.
+                    return None, labeled
+                continue
+            if state.line.label:
+                labeled = True
+            if not state.line.is_directive:
+                return position, labeled
+            if state.line.op != '.label':
+                return None, labeled
+        return None, labeled
+
+    def _first_instruction(self, label: str) -> Optional[int]:
+        index = self.label_states.get(label)
+        if index is None:
+            return None
+        state = self.states[index]
+        if not state.line.is_directive:
+            return index
+        if state.line.op != '.label':
+            return None
+        position, _ = self._next_instruction(index)
+        return position
+
+    def _carry_live_after(self, index: int) -> bool:
+        # Follow the fall-through path only; anything that may leave it counts as a read.
+        position = index
+        while True:
+            position, _ = self._next_instruction(position)
+            if position is None:
+                return True
+            op = self.states[position].line.op
+            if op in _READS_CARRY:
+                return True
+            if op in _WRITES_CARRY:
+                return False
+            if op in _TRANSFERS or self.states[position].opcode.addressing in ('REL', 'LONG'):
+                return True
+
+    def _record(self, state: 'LineState', rule: str, saved_bytes: int, saved_cycles: int) -> None:
+        self.rewrites.append(
+            PeepholeRewrite(
+                line_no=state.line.line_no,
+                text=state.line.text.strip(),
+                rule=rule,
+                bytes_saved=saved_bytes,
+                cycles_saved=saved_cycles,
+            )
+        )
+
+    def _rewrite(self, index: int, mnemonic: str, spec, operands: List[Operand]) -> None:
+        state = self.states[index]
+        delta = spec.size - state.opcode.size
+        state.line = replace(
+            state.line,
+            op=mnemonic,
+            operands=list(operands),
+            text=_annotate(state.line.text, f"{mnemonic} {', '.join(operand.text for operand in operands)}".strip()),
+        )
+        state.opcode = spec
+        state.operands = list(operands)
+        state.forced_mode = None
+        if delta:
+            self.resized.append((index, delta))
+
+    def _remove(self, index: int) -> None:
+        state = self.states[index]
+        self.resized.append((index, -state.opcode.size))
+        state.line = replace(
+            state.line,
+            op='.label',
+            operands=[],
+            is_directive=True,
+            text=_annotate(state.line.text, "removed"),
+        )
+        state.opcode = None
+        state.operands = []
+        state.forced_mode = None
+
+
+def _annotate(text: str, note: str) -> str:
+    code = text.split(';', 1)[0].rstrip()
+    return f"{code}  ; --optimize: {note}"
@@ -3,78 +3,248 @@ from __future__ import annotations
 
 import pathlib
 import re
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Sequence
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple, Union
+
+from .lexer import LexerError, find_markers, scan, split_operands
 
 
 class PreprocessError(RuntimeError):
     pass
 
 
+# A compiled macro body line: literal text, or an index into the invocation
+# arguments, where -1 stands for the unique `__NAME_NNNN` id (`\@`).
+Segment = Union[str, int]
+_UNIQUE = -1
+
+
 @dataclass
 class MacroDefinition:
     name: str
     params: List[str]
     lines: List[str]
     defined_at: str
+    # (file, line) of the MACRO line; body line i sits on line + 1 + i.
+    location: Tuple[str, int] = ("<input>", 0)
+    template: List[List[Segment]] = field(init=False, repr=False)
+    # `SourceLine.expansion` per body line, shared by every invocation.
+    frames: List[Tuple[Expansion, ...]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.template = [_compile_line(raw_line, self.params) for raw_line in self.lines]
+        file, line = self.location
+        self.frames = [(Expansion(self.name, file, line + 1 + index),) for index in range(len(self.lines))]
 
 
 _ARG_PATTERN = re.compile(r"\\([0-9@])")
 
 
+class Expansion(NamedTuple):
+    """The macro body line an output line was expanded from."""
+
+    macro: str
+    file: str
+    line: int
+
+
+class IncludeLookup(NamedTuple):
+    """An `.include` as written, the directories searched for it and the file it resolved to."""
+
+    name: str
+    search: Tuple[pathlib.Path, ...]
+    path: pathlib.Path
+
+
+@dataclass(slots=True)
+class SourceLine:
+    """One preprocessed line and where it came from.
+
+    `file`/`line` is the line in the user's source: the invocation line for
+    macro expansions.  `expansion` lists the macro body lines it was expanded
+    from, outermost first.
+    """
+
+    text: str
+    file: str
+    line: int
+    expansion: Tuple[Expansion, ...] = ()
+
+
+@dataclass
+class InputLine:
+    """One input line, split and classified once so cached files skip re-parsing."""
+
+    line_no: int
+    # `raw_line.rstrip()`; emitted as is for blank, comment-only and label-only lines.
+    text: str
+    label: str | None = None
+    statement: str = ""
+    op: str = ""
+    operand: str | None = None
+    comment: str = ""
+    # Set on a MACRO line, whose body lines are folded into the definition.
+    macro: MacroDefinition | None = None
+    # Raised when the line is reached, so errors keep their original order.
+    error: str | None = None
+
+
+@dataclass
+class CachedInclude:
+    path: pathlib.Path
+    mtime_ns: int
+    size: int
+    lines: List[InputLine]
+
+    @property
+    def macros(self) -> List[MacroDefinition]:
+        return [line.macro for line in self.lines if line.macro is not None]
+
+
+@dataclass
+class IncludeCache:
+    """Classified `.include` files keyed by resolved path, reused while mtime and size match.
+
+    Macro definitions are parsed together with their file, so every unit
+    that includes `macro.inc` shares the same `MacroDefinition` objects.
+    """
+
+    entries: Dict[pathlib.Path, CachedInclude] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+    def load(self, path: pathlib.Path) -> List[InputLine]:
+        stat = path.stat()
+        entry = self.entries.get(path)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            self.hits += 1
+            return entry.lines
+        self.misses += 1
+        lines = classify_lines(path.read_text(encoding="utf-8").splitlines(), path)
+        self.entries[path] = CachedInclude(path=path, mtime_ns=stat.st_mtime_ns, size=stat.st_size, lines=lines)
+        return lines
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared by every assembly in the process (including each build worker).
+INCLUDE_CACHE = IncludeCache()
+
+
 def preprocess_source(
     source: str,
     *,
     filename: str,
     include_dirs: Sequence[pathlib.Path],
+    included: List[pathlib.Path] | None = None,
+    origins: List[Tuple[str, int]] | None = None,
+    cache: IncludeCache | None = None,
 ) -> str:
+    """Expand includes and macros.
+
+    `included` が指定された場合は解決したインクルードファイルのパスを順に追加する。
+    `origins` が指定された場合は出力の各行に対応する元のファイル名と行番号を追加する
+    （マクロ展開行は呼び出し行を指す）。
+    インクルードファイルは `cache`（省略時は `INCLUDE_CACHE`）経由で読み込む。
+    """
+    lines: List[str] = []
+    for record in preprocess_lines(
+        source, filename=filename, include_dirs=include_dirs, included=included, cache=cache
+    ):
+        lines.append(record.text)
+        if origins is not None:
+            origins.append((record.file, record.line))
+    return "\n".join(lines) + ("\n" if lines and lines[-1] else "")
+
+
+def preprocess_lines(
+    source: str,
+    *,
+    filename: str,
+    include_dirs: Sequence[pathlib.Path],
+    included: List[pathlib.Path] | None = None,
+    lookups: List[IncludeLookup] | None = None,
+    cache: IncludeCache | None = None,
+) -> Iterator[SourceLine]:
+    """Expand includes and macros lazily, yielding one `SourceLine` per output line.
+
+    インクルードとマクロは行が要求された時点で展開されるため、
+    エラーや `included` への追加も消費した位置までで発生する。
+    `lookups` が指定された場合は `.include` ごとに記述されたパス・探索ディレクトリ・
+    解決先を追加する（キャッシュが解決先の変化を検出するために使う）。
+    """
     path = pathlib.Path(filename) if filename else None
-    macros: Dict[str, MacroDefinition] = {}
-    counters: Dict[str, int] = {}
-    include_stack: List[pathlib.Path] = []
-    lines = _process_lines(
-        source.splitlines(),
+    return _process_lines(
+        classify_lines(source.splitlines(), path),
         current_file=path,
-        macros=macros,
-        counters=counters,
+        macros={},
+        counters={},
         include_dirs=include_dirs,
-        include_stack=include_stack,
+        include_stack=[],
+        included=included if included is not None else [],
+        lookups=lookups if lookups is not None else [],
+        cache=cache if cache is not None else INCLUDE_CACHE,
     )
-    return "\n".join(lines) + ("\n" if lines and lines[-1] else "")
+
+
+def classify_lines(lines: Iterable[str], current_file: pathlib.Path | None) -> List[InputLine]:
+    """Split every line into label/op/operand/comment and fold MACRO bodies into definitions."""
+
+    records: List[InputLine] = []
+    iterator = iter(enumerate(lines, start=1))
+    for line_no, raw_line in iterator:
+        record = InputLine(line_no=line_no, text=raw_line.rstrip())
+        records.append(record)
+        label, statement, comment = _split_line(raw_line)
+        if not statement:
+            continue
+        op, operand = _split_op(statement)
+        record.label, record.statement, record.op, record.operand, record.comment = label, statement, op, operand, comment
+        if op.upper() == "MACRO":
+            if label:
+                record.error = _format_location(current_file, line_no, "MACRO 行にラベルは使用できません")
+                break
+            try:
+                record.macro = _consume_macro(
+                    op_line=(line_no, operand or ""),
+                    iterator=iterator,
+                    current_file=current_file,
+                )
+            except PreprocessError as err:
+                record.error = str(err)
+                break
+    return records
 
 
 def _process_lines(
-    lines: Iterable[str],
+    records: Sequence[InputLine],
     *,
     current_file: pathlib.Path | None,
     macros: Dict[str, MacroDefinition],
     counters: Dict[str, int],
     include_dirs: Sequence[pathlib.Path],
     include_stack: List[pathlib.Path],
-) -> List[str]:
-    output: List[str] = []
-    iterator = iter(enumerate(lines, start=1))
-    for line_no, raw_line in iterator:
-        code, comment = _split_comment(raw_line)
-        if not code.strip():
-            output.append(raw_line.rstrip())
+    included: List[pathlib.Path],
+    lookups: List[IncludeLookup],
+    cache: IncludeCache,
+) -> Iterator[SourceLine]:
+    name = str(current_file) if current_file is not None else "<input>"
+
+    for record in records:
+        line_no = record.line_no
+        if record.error is not None:
+            raise PreprocessError(record.error)
+        if not record.statement:
+            yield SourceLine(record.text, name, line_no)
             continue
 
-        label, statement = _split_label(code)
-        if not statement:
-            output.append(raw_line.rstrip())
-            continue
+        label, statement, op, operand, comment = record.label, record.statement, record.op, record.operand, record.comment
 
-        op, operand = _split_op(statement)
-
-        if op.upper() == "MACRO":
-            if label:
-                raise PreprocessError(_format_location(current_file, line_no, "MACRO 行にラベルは使用できません"))
-            definition = _consume_macro(
-                op_line=(line_no, operand or ""),
-                iterator=iterator,
-                current_file=current_file,
-            )
+        if record.macro is not None:
+            definition = record.macro
             if definition.name in macros:
                 raise PreprocessError(
                     _format_location(current_file, line_no, f"マクロ {definition.name} は既に定義されています")
@@ -88,32 +258,43 @@ def _process_lines(
                 if operand is None:
                     raise PreprocessError(_format_location(current_file, line_no, ".include にはパスが必要です"))
                 include_path = _parse_include_path(operand)
-                resolved = _resolve_include(include_path, current_file, include_dirs)
+                search = include_search_paths(current_file, include_dirs)
+                resolved = find_include(include_path, search)
+                if resolved is None:
+                    raise PreprocessError(f"Include ファイルが見つかりません: {include_path}")
                 if resolved in include_stack:
                     chain = " -> ".join(str(item) for item in include_stack + [resolved])
                     raise PreprocessError(_format_location(current_file, line_no, f".include の再帰参照: {chain}"))
                 include_stack.append(resolved)
-                included_source = resolved.read_text(encoding="utf-8")
-                included_lines = _process_lines(
-                    included_source.splitlines(),
+                included.append(resolved)
+                lookups.append(IncludeLookup(include_path, search, resolved))
+                yield from _process_lines(
+                    cache.load(resolved),
                     current_file=resolved,
                     macros=macros,
                     counters=counters,
                     include_dirs=include_dirs,
                     include_stack=include_stack,
+                    included=included,
+                    lookups=lookups,
+                    cache=cache,
                 )
-                output.extend(included_lines)
                 include_stack.pop()
                 if comment:
-                    output.append(f";{comment}")
+                    yield SourceLine(f";{comment}", name, line_no)
                 continue
 
-            output.append(_recompose_line(label, statement, comment))
+            yield SourceLine(_recompose_line(label, statement, comment), name, line_no)
             continue
 
         macro = macros.get(op.upper())
         if macro:
-            args = _split_operands(operand) if operand is not None else []
+            try:
+                args = [text for text, _ in split_operands(operand, scan(operand))] if operand is not None else []
+            except LexerError as err:
+                raise PreprocessError(
+                    _format_location(current_file, line_no, f"マクロ {macro.name} の引数を解析できません ({err})")
+                ) from err
             if len(args) != len(macro.params):
                 expected = len(macro.params)
                 raise PreprocessError(
@@ -125,15 +306,16 @@ def _process_lines(
                 )
             counters[macro.name] = counters.get(macro.name, 0) + 1
             unique = f"__{macro.name}_{counters[macro.name]:04d}"
-            expanded = _expand_macro(macro, args, unique)
-            expanded = _apply_invocation_label(label, expanded)
-            output.extend(expanded)
+            expanded = _apply_invocation_label(label, _expand_macro(macro, args, unique))
+            frames = macro.frames
+            for index, text in enumerate(expanded):
+                # A label-only line appended after the body has no body line.
+                yield SourceLine(text, name, line_no, frames[index] if index < len(frames) else ())
             if comment:
-                output.append(f";{comment}")
+                yield SourceLine(f";{comment}", name, line_no)
             continue
 
-        output.append(_recompose_line(label, statement, comment))
-    return output
+        yield SourceLine(_recompose_line(label, statement, comment), name, line_no)
 
 
 def _consume_macro(op_line: tuple[int, str], iterator, current_file: pathlib.Path | None) -> MacroDefinition:
@@ -159,21 +341,69 @@ def _consume_macro(op_line: tuple[int, str], iterator, current_file: pathlib.Pat
         body.append(raw_line.rstrip())
     else:
         raise PreprocessError(_format_location(current_file, line_no, f"マクロ {name} は ENDM で閉じられていません"))
-    return MacroDefinition(name=name, params=params, lines=body, defined_at=_format_file(current_file, line_no))
+    return MacroDefinition(
+        name=name,
+        params=params,
+        lines=body,
+        defined_at=_format_file(current_file, line_no),
+        location=(str(current_file) if current_file is not None else "<input>", line_no),
+    )
 
 
 def _expand_macro(definition: MacroDefinition, args: Sequence[str], unique: str) -> List[str]:
-    expanded: List[str] = []
-    for raw_line in definition.lines:
-        if not raw_line:
-            expanded.append(raw_line)
+    # `values[-1]` is the unique id, matching `_UNIQUE`.
+    values = [*args, unique]
+    return [
+        "".join(segment if segment.__class__ is str else values[segment] for segment in line)
+        for line in definition.template
+    ]
+
+
+def _compile_line(raw_line: str, params: List[str]) -> List[Segment]:
+    """Split a body line into segments once, with the layout `_expand_macro` used to build per call.
+
+    `\\N` and `\\@` are resolved first, then each named parameter in order,
+    but only inside the literal text: argument values are never rescanned.
+    Stripping and the trailing comment only touch literal edges, because
+    arguments never start or end with whitespace.
+    """
+
+    if not raw_line:
+        return [raw_line]
+    code, comment = _split_comment(raw_line)
+    segments: List[Segment] = []
+    position = 0
+    for match in _ARG_PATTERN.finditer(code):
+        token = match.group(1)
+        if token == "@":
+            slot = _UNIQUE
+        elif 1 <= int(token) <= len(params):
+            slot = int(token) - 1
+        else:
             continue
-        code, comment = _split_comment(raw_line)
-        replaced = _replace_arguments(code, definition.params, args, unique)
-        if comment:
-            replaced = _recompose_line(None, replaced, comment)
-        expanded.append(replaced.rstrip())
-    return expanded
+        segments.extend((code[position : match.start()], slot))
+        position = match.end()
+    segments.append(code[position:])
+
+    for index, name in enumerate(params):
+        marker = f"\\{name}"
+        split: List[Segment] = []
+        for segment in segments:
+            if segment.__class__ is not str or marker not in segment:
+                split.append(segment)
+                continue
+            pieces = segment.split(marker)
+            for piece in pieces[:-1]:
+                split.extend((piece, index))
+            split.append(pieces[-1])
+        segments = split
+
+    if comment:
+        segments[0] = segments[0].lstrip()
+        segments.append(f" ;{comment}")
+    else:
+        segments[-1] = segments[-1].rstrip()
+    return [segment for segment in segments if segment != ""] or [""]
 
 
 def _apply_invocation_label(label: str | None, lines: List[str]) -> List[str]:
@@ -190,37 +420,24 @@ def _apply_invocation_label(label: str | None, lines: List[str]) -> List[str]:
     return lines
 
 
-def _replace_arguments(code: str, params: List[str], args: Sequence[str], unique: str) -> str:
-    def _substitute(match: re.Match[str]) -> str:
-        token = match.group(1)
-        if token == "@":
-            return unique
-        if token.isdigit():
-            index = int(token) - 1
-            if index < 0 or index >= len(args):
-                return match.group(0)
-            return args[index]
-        return match.group(0)
-
-    replaced = _ARG_PATTERN.sub(_substitute, code)
-    for name, value in zip(params, args):
-        replaced = replaced.replace(f"\\{name}", value)
-    return replaced
-
-
 def _split_comment(line: str) -> tuple[str, str]:
     if ";" not in line:
         return line, ""
-    code, comment = line.split(";", 1)
-    return code.rstrip(), comment.strip()
+    _, start = find_markers(line)
+    if start < 0:
+        return line, ""
+    return line[:start].rstrip(), line[start + 1 :].strip()
 
 
-def _split_label(code: str) -> tuple[str | None, str]:
-    if ":" not in code:
-        return None, code.strip()
-    label_part, rest = code.split(":", 1)
-    label = label_part.strip()
-    return (label.upper(), rest.strip())
+def _split_line(line: str) -> tuple[str | None, str, str]:
+    """Split a line into label, statement and comment, ignoring `:` and `;` inside literals."""
+    if ";" not in line and ":" not in line:
+        return None, line.strip(), ""
+    colon, start = find_markers(line)
+    code, comment = (line[:start], line[start + 1 :].strip()) if start >= 0 else (line, "")
+    if colon < 0:
+        return None, code.strip(), comment
+    return code[:colon].strip().upper(), code[colon + 1 :].strip(), comment
 
 
 def _split_op(statement: str) -> tuple[str, str | None]:
@@ -232,56 +449,6 @@ def _split_op(statement: str) -> tuple[str, str | None]:
     return parts[0], parts[1]
 
 
-def _split_operands(operand: str) -> List[str]:
-    values: List[str] = []
-    current: List[str] = []
-    in_string = False
-    in_char = False
-    escaped = False
-    for ch in operand:
-        if in_string:
-            current.append(ch)
-            if escaped:
-                escaped = False
-                continue
-            if ch == "\\":
-                escaped = True
-                continue
-            if ch == '"':
-                in_string = False
-            continue
-        if in_char:
-            current.append(ch)
-            if escaped:
-                escaped = False
-                continue
-            if ch == "\\":
-                escaped = True
-                continue
-            if ch == "'":
-                in_char = False
-            continue
-        if ch == '"':
-            in_string = True
-            current.append(ch)
-            continue
-        if ch == "'":
-            in_char = True
-            current.append(ch)
-            continue
-        if ch == ",":
-            value = "".join(current).strip()
-            if value:
-                values.append(value)
-            current = []
-            continue
-        current.append(ch)
-    value = "".join(current).strip()
-    if value:
-        values.append(value)
-    return values
-
-
 def _recompose_line(label: str | None, statement: str, comment: str) -> str:
     prefix = f"{label}: " if label else ""
     suffix = f" ;{comment}" if comment else ""
@@ -297,19 +464,27 @@ def _parse_include_path(token: str) -> str:
     return token
 
 
-def _resolve_include(path_str: str, current_file: pathlib.Path | None, include_dirs: Sequence[pathlib.Path]) -> pathlib.Path:
-    candidate = pathlib.Path(path_str)
+def include_search_paths(
+    current_file: pathlib.Path | None, include_dirs: Sequence[pathlib.Path]
+) -> Tuple[pathlib.Path, ...]:
+    """Directories searched for an `.include` in `current_file`, in order."""
     search_paths: List[pathlib.Path] = []
     if current_file is not None and current_file.parent:
-        search_paths.append(current_file.parent)
-    search_paths.extend(include_dirs)
+        search_paths.append(current_file.parent.resolve())
+    search_paths.extend(path.resolve() for path in include_dirs)
+    return tuple(search_paths)
+
+
+def find_include(path_str: str, search_paths: Sequence[pathlib.Path]) -> pathlib.Path | None:
+    """Resolve an `.include` path against `search_paths`; the first existing file wins."""
+    candidate = pathlib.Path(path_str)
     if candidate.is_absolute():
         return candidate
     for base in search_paths:
         resolved = (base / candidate).resolve()
         if resolved.exists():
             return resolved
-    raise PreprocessError(f"Include ファイルが見つかりません: {path_str}")
+    return None
 
 
 def _format_location(current_file: pathlib.Path | None, line_no: int, message: str) -> str:
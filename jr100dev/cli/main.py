@@ -5,13 +5,61 @@ import argparse
 import json
 import pathlib
 import sys
-from typing import Iterable
-
-
-from ..asm.encoder import Assembler, AssemblyError
+from typing import Iterable, Sequence
+
+
+from ..analysis import (
+    StackReport,
+    analyze_stack,
+    analyze_wcet,
+    loop_bounds,
+    memory_image,
+    write_stack_report,
+    write_wcet_report,
+)
+from ..asm.cache import BuildCache
+from ..asm.encoder import Assembler, AssemblyError, AssemblyResult
 from ..asm.encoder import LineEmission
-from ..link import LinkError, ObjectFormatError, link_objects, load_object, pack_prg
-from ..proj import ProjectGenerationError, create_project
+from ..link import (
+    LibraryArchive,
+    LinkError,
+    LinkResult,
+    ObjectFormatError,
+    link_objects,
+    load_archive,
+    load_object,
+    pack_archive,
+    pack_prg,
+    unpack_prg,
+)
+from ..link.archive import is_archive
+from ..link.zeropage import parse_zp_range, read_zp_hints
+from ..sim import (
+    MB8861,
+    Profile,
+    RoutineIndex,
+    load_prg,
+    profile_call,
+    profile_run,
+    read_map,
+    source_lines,
+    variable_accesses,
+    write_access_counts,
+    write_collapsed,
+    write_report,
+)
+from ..proj import (
+    DEFAULT_CLOCK_HZ,
+    BuildConfigError,
+    BuildError,
+    ProjectGenerationError,
+    build_project,
+    create_project,
+    find_clock_hz,
+    find_frame_budget,
+    load_build_config,
+    object_from_assembly,
+)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -22,15 +70,45 @@ def build_parser() -> argparse.ArgumentParser:
     assemble.add_argument("source", type=pathlib.Path, help="Path to the source file")
     assemble.add_argument("-o", "--output", type=pathlib.Path, required=True, help="PRG output path")
     assemble.add_argument("--bin", type=pathlib.Path, help="Raw binary output path")
-    assemble.add_argument("--obj", type=pathlib.Path, help="Intermediate object (JSON) output path")
+    assemble.add_argument("--obj", type=pathlib.Path, help="Intermediate object output path")
+    assemble.add_argument(
+        "--obj-format",
+        choices=("auto", "json", "binary"),
+        default="auto",
+        help="Object encoding: JSON (v1) or compact binary (v2); auto picks JSON for .json paths",
+    )
     assemble.add_argument("--map", type=pathlib.Path, help="Symbol map output path")
     assemble.add_argument("--lst", type=pathlib.Path, help="Listing file output path")
+    assemble.add_argument(
+        "--clock-hz",
+        type=int,
+        help="CPU clock for listing timings (default: [cpu] clock_hz of the nearest jr100.toml, else 894000)",
+    )
     assemble.add_argument("--entry", type=lambda v: int(v, 0), help="Entry address override")
     assemble.add_argument("--name", type=str, help="Program name stored in the PROG header")
     assemble.add_argument("--comment", type=str, help="Optional program comment")
+    assemble.add_argument(
+        "--function-sections",
+        action="store_true",
+        help="Emit one text section per label so the linker can strip unused routines",
+    )
+    assemble.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Apply peephole rewrites (redundant loads, tail calls, branch chains, CLRA/CLRB)",
+    )
+    assemble.add_argument(
+        "--long-branches",
+        action="store_true",
+        help="Rewrite out-of-range branches as an inverted branch over JMP (BRA/BSR become JMP/JSR)",
+    )
+    _add_zero_page_arguments(assemble)
+    _add_stack_arguments(assemble)
+    assemble.add_argument("--cache-dir", type=pathlib.Path, help="Build cache directory (default: <output dir>/.cache)")
+    assemble.add_argument("--no-cache", action="store_true", help="Always assemble without consulting the build cache")
 
-    link_cmd = sub.add_parser("link", help="Link JSON objects into a JR-100 binary")
-    link_cmd.add_argument("objects", type=pathlib.Path, nargs="+", help="Object files to link")
+    link_cmd = sub.add_parser("link", help="Link objects (JSON or binary) into a JR-100 binary")
+    link_cmd.add_argument("objects", type=pathlib.Path, nargs="+", help="Object files or library archives to link")
     link_cmd.add_argument("-o", "--output", type=pathlib.Path, required=True, help="PRG output path")
     link_cmd.add_argument("--bin", type=pathlib.Path, help="Raw binary output path")
     link_cmd.add_argument("--map", type=pathlib.Path, help="Symbol map output path")
@@ -40,6 +118,92 @@ def build_parser() -> argparse.ArgumentParser:
     link_cmd.add_argument("--text-base", type=lambda v: int(v, 0), help="Override code section base address")
     link_cmd.add_argument("--data-base", type=lambda v: int(v, 0), help="Override data section base address")
     link_cmd.add_argument("--bss-base", type=lambda v: int(v, 0), help="Override bss section base address")
+    link_cmd.add_argument("--gc-sections", action="store_true", help="Drop sections unreachable from the entry point")
+    link_cmd.add_argument(
+        "--export",
+        action="append",
+        default=[],
+        metavar="SYMBOL",
+        help="Keep the section defining SYMBOL with --gc-sections (repeatable)",
+    )
+    _add_zero_page_arguments(link_cmd)
+    _add_stack_arguments(link_cmd)
+
+    ar_cmd = sub.add_parser("ar", help="Pack objects into a static library archive")
+    ar_cmd.add_argument("archive", type=pathlib.Path, help="Archive path to create (or read with --list)")
+    ar_cmd.add_argument("objects", type=pathlib.Path, nargs="*", help="Object files to store")
+    ar_cmd.add_argument("-t", "--list", action="store_true", help="List members and the symbol index of an archive")
+
+    profile_cmd = sub.add_parser("profile", help="Run a .prg in the simulator and report where cycles are spent")
+    profile_cmd.add_argument("program", type=pathlib.Path, help="PRG file to run")
+    profile_cmd.add_argument("--map", type=pathlib.Path, help="Symbol map of the program (default: <program>.map)")
+    profile_cmd.add_argument(
+        "--source",
+        type=pathlib.Path,
+        action="append",
+        default=[],
+        help="Source file the program was built from, for file:line attribution (repeatable)",
+    )
+    profile_cmd.add_argument(
+        "--call",
+        action="append",
+        default=[],
+        metavar="LABEL",
+        help="Call these routines in order instead of running from the entry point (repeatable)",
+    )
+    profile_cmd.add_argument(
+        "--poke",
+        action="append",
+        default=[],
+        metavar="ADDR=VALUE",
+        help="Store a byte before running; ADDR may be a label (repeatable)",
+    )
+    profile_cmd.add_argument(
+        "--reg",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Set register A, B or X before running (repeatable)",
+    )
+    profile_cmd.add_argument("--max-cycles", type=int, default=10 * 894_000, help="Cycle budget per run or call")
+    profile_cmd.add_argument("--clock-hz", type=int, help="CPU clock for reported times (default: from jr100.toml)")
+    profile_cmd.add_argument("--limit", type=int, default=40, help="Rows per table in the report (0 = all)")
+    profile_cmd.add_argument("-o", "--output", type=pathlib.Path, help="Report path (default: stdout)")
+    profile_cmd.add_argument("--collapsed", type=pathlib.Path, help="Write folded stacks for flamegraph tools")
+    profile_cmd.add_argument(
+        "--zp-hints",
+        type=pathlib.Path,
+        help="Write per-variable access counts for the direct-page allocator",
+    )
+
+    analyze_cmd = sub.add_parser("analyze", help="Static timing analysis of a .prg")
+    analyze_cmd.add_argument("program", type=pathlib.Path, help="PRG file to analyze")
+    analyze_cmd.add_argument("--map", type=pathlib.Path, help="Symbol map of the program (default: <program>.map)")
+    analyze_cmd.add_argument(
+        "--source",
+        type=pathlib.Path,
+        action="append",
+        default=[],
+        help="Source file the program was built from, for loop bounds and file:line (repeatable)",
+    )
+    analyze_cmd.add_argument(
+        "--wcet",
+        action="append",
+        required=True,
+        metavar="LABEL",
+        help="Report the worst-case cycles of this routine (repeatable)",
+    )
+    analyze_cmd.add_argument(
+        "--budget",
+        type=int,
+        help="Frame budget in cycles (default: [analyze] frame_budget in jr100.toml)",
+    )
+    analyze_cmd.add_argument("--clock-hz", type=int, help="CPU clock for reported times (default: from jr100.toml)")
+
+    build_cmd = sub.add_parser("build", help="Assemble and link a project described by jr100.toml")
+    build_cmd.add_argument("project", type=pathlib.Path, nargs="?", default=pathlib.Path("."), help="Project directory or jr100.toml path")
+    build_cmd.add_argument("-j", "--jobs", type=int, help="Number of parallel assembler processes")
+    build_cmd.add_argument("--no-cache", action="store_true", help="Always assemble without consulting the build cache")
 
     new_cmd = sub.add_parser("new", help="Create a new JR-100 project skeleton")
     new_cmd.add_argument("path", type=pathlib.Path, help="Directory to create the project in")
@@ -48,6 +212,44 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _add_zero_page_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--zp-range",
+        type=_zp_range,
+        action="append",
+        default=[],
+        metavar="START-END",
+        help="Free direct-page bytes for .zp variables, e.g. $C0-$FF (repeatable)",
+    )
+    parser.add_argument(
+        "--zp-hints",
+        type=pathlib.Path,
+        help="Access counts from `profile --zp-hints`; hotter variables are placed first",
+    )
+
+
+def _add_stack_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--stack-usage",
+        action="store_true",
+        help="Append the call graph and worst-case hardware stack depth to the map",
+    )
+    parser.add_argument(
+        "--stack-entry",
+        action="append",
+        default=[],
+        metavar="LABEL",
+        help="Extra root for --stack-usage, e.g. an interrupt handler (repeatable)",
+    )
+
+
+def _zp_range(text: str) -> tuple[int, int]:
+    try:
+        return parse_zp_range(text)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
@@ -58,8 +260,16 @@ def main(argv: list[str] | None = None) -> int:
         return run_assemble(args)
     if args.command == "link":
         return run_link(args)
+    if args.command == "build":
+        return run_build(args)
+    if args.command == "ar":
+        return run_ar(args)
     if args.command == "new":
         return run_new(args)
+    if args.command == "profile":
+        return run_profile(args)
+    if args.command == "analyze":
+        return run_analyze(args)
     parser.error(f"Unknown command {args.command}")
     return 1
 
@@ -70,54 +280,110 @@ def run_assemble(args: argparse.Namespace) -> int:
         print(f"Source file not found: {source_path}", file=sys.stderr)
         return 1
     source_text = source_path.read_text(encoding="utf-8")
-    assembler = Assembler(source_text, filename=str(source_path))
-    try:
-        result = assembler.assemble()
-    except AssemblyError as err:
-        print(f"Assembly failed: {err}", file=sys.stderr)
-        return 1
+    cache = _open_cache(args)
+    options = _cache_options(args)
+    result = cache.lookup(str(source_path), source_text, options) if cache else None
+    if result is None:
+        try:
+            assembler = Assembler(
+                source_text,
+                filename=str(source_path),
+                function_sections=getattr(args, "function_sections", False),
+                optimize=getattr(args, "optimize", False),
+                long_branches=getattr(args, "long_branches", False),
+            )
+            result = assembler.assemble()
+        except AssemblyError as err:
+            print(f"Assembly failed: {err}", file=sys.stderr)
+            return 1
+        if cache:
+            cache.store(str(source_path), source_text, options, assembler.include_lookups, result)
+    if getattr(args, "optimize", False):
+        _print_peephole_report(result)
 
     entry_point = args.entry if args.entry is not None else result.entry_point
     program_name = (args.name or source_path.stem).upper()[:32]
     comment = args.comment or ""
 
-    bin_path: pathlib.Path
-    if args.bin:
-        bin_path = args.bin
+    if any(section.kind == "zp" for section in result.sections):
+        # `.zp` variables only get addresses from the linker.
+        try:
+            linked = link_objects(
+                [object_from_assembly(result)],
+                entry_override=args.entry,
+                zp_ranges=getattr(args, "zp_range", []),
+                zp_hints=_load_zp_hints(args),
+            )
+        except (OSError, ValueError, LinkError) as err:
+            print(f"Link failed: {err}", file=sys.stderr)
+            return 1
+        _print_zero_page_report(linked)
+        stack = _stack_usage(args, linked.origin, linked.image, linked.entry_point, linked.symbols)
+        if stack is False:
+            return 1
+        _write_link_outputs(
+            linked,
+            output=args.output,
+            bin_path=args.bin,
+            map_path=args.map,
+            program_name=program_name,
+            comment=comment,
+            stack=stack,
+        )
     else:
-        bin_path = args.output.with_suffix(".bin")
-    bin_path.parent.mkdir(parents=True, exist_ok=True)
-    bin_path.write_bytes(result.machine_code)
-
-    prg_bytes = pack_prg(
-        result.origin,
-        result.machine_code,
-        entry_point,
-        program_name=program_name,
-        comment=comment,
-    )
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_bytes(prg_bytes)
+        stack = _stack_usage(args, result.origin, result.machine_code, entry_point, result.symbols)
+        if stack is False:
+            return 1
+        bin_path = args.bin or args.output.with_suffix(".bin")
+        bin_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_extents(bin_path, result.origin, result.extents)
+
+        prg_bytes = pack_prg(
+            result.origin,
+            b"",
+            entry_point,
+            segments=result.extents or None,
+            program_name=program_name,
+            comment=comment,
+        )
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_bytes(prg_bytes)
+        if args.map:
+            args.map.parent.mkdir(parents=True, exist_ok=True)
+            _write_map(args.map, result.symbols.items(), stack)
 
     if args.obj:
         args.obj.parent.mkdir(parents=True, exist_ok=True)
-        obj_payload = result.to_object_dict()
-        args.obj.write_text(json.dumps(obj_payload, indent=2), encoding="utf-8")
+        if _object_format(args) == "binary":
+            args.obj.write_bytes(result.to_object_bytes())
+        else:
+            obj_payload = result.to_object_dict()
+            args.obj.write_text(json.dumps(obj_payload, indent=2), encoding="utf-8")
 
-    if args.map:
-        args.map.parent.mkdir(parents=True, exist_ok=True)
-        _write_map(args.map, result.symbols.items())
     if args.lst:
         args.lst.parent.mkdir(parents=True, exist_ok=True)
-        _write_listing(args.lst, result.emissions)
+        try:
+            clock_hz = args.clock_hz if getattr(args, "clock_hz", None) else find_clock_hz(source_path)
+        except BuildConfigError as err:
+            print(f"Listing failed: {err}", file=sys.stderr)
+            return 1
+        _write_listing(args.lst, result.emissions, clock_hz, source=result.source)
 
     return 0
 
 
 def run_link(args: argparse.Namespace) -> int:
+    objects = []
+    libraries: list[LibraryArchive] = []
     try:
-        objects = [load_object(path) for path in args.objects]
-    except ObjectFormatError as err:
+        for path in args.objects:
+            with path.open("rb") as handle:
+                archive = is_archive(handle.read(4))
+            if archive:
+                libraries.append(load_archive(path))
+            else:
+                objects.append(load_object(path))
+    except (OSError, ObjectFormatError) as err:
         print(f"Failed to read object: {err}", file=sys.stderr)
         return 1
 
@@ -128,21 +394,287 @@ def run_link(args: argparse.Namespace) -> int:
             text_base=getattr(args, "text_base", None),
             data_base=getattr(args, "data_base", None),
             bss_base=getattr(args, "bss_base", None),
+            libraries=libraries,
+            gc_sections=getattr(args, "gc_sections", False),
+            exports=[name.upper() for name in getattr(args, "export", [])],
+            zp_ranges=getattr(args, "zp_range", []),
+            zp_hints=_load_zp_hints(args),
         )
-    except LinkError as err:
+    except (OSError, ValueError, LinkError) as err:
         print(f"Link failed: {err}", file=sys.stderr)
         return 1
+    for member in result.members:
+        print(f"Linked archive member {member}")
+    if getattr(args, "gc_sections", False):
+        _print_gc_report(result)
+    _print_zero_page_report(result)
+    stack = _stack_usage(args, result.origin, result.image, result.entry_point, result.symbols)
+    if stack is False:
+        return 1
+
+    _write_link_outputs(
+        result,
+        output=args.output,
+        bin_path=args.bin,
+        map_path=args.map,
+        program_name=(args.name or args.output.stem).upper()[:32],
+        comment=args.comment or "",
+        stack=stack,
+    )
+    return 0
+
+
+def run_ar(args: argparse.Namespace) -> int:
+    if args.list:
+        try:
+            archive = load_archive(args.archive)
+        except (OSError, ObjectFormatError) as err:
+            print(f"Failed to read archive: {err}", file=sys.stderr)
+            return 1
+        for index, member in enumerate(archive.members):
+            names = sorted(name for name, owner in archive.symbols.items() if owner == index)
+            print(f"{member.name}: {' '.join(names)}")
+        return 0
+    if not args.objects:
+        print("No objects supplied for the archive", file=sys.stderr)
+        return 1
+    try:
+        payload = pack_archive([(path.name, path.read_bytes()) for path in args.objects])
+    except (OSError, ObjectFormatError) as err:
+        print(f"Failed to read object: {err}", file=sys.stderr)
+        return 1
+    args.archive.parent.mkdir(parents=True, exist_ok=True)
+    args.archive.write_bytes(payload)
+    print(f"Archived {len(args.objects)} object(s) into {args.archive}")
+    return 0
+
+
+def run_profile(args: argparse.Namespace) -> int:
+    map_path = args.map or args.program.with_suffix(".map")
+    try:
+        symbols = read_map(map_path) if map_path.exists() else {}
+        cpu = MB8861()
+        image = load_prg(cpu, args.program)
+        clock_hz = args.clock_hz or find_clock_hz(args.program)
+    except (OSError, ValueError, BuildConfigError) as err:
+        print(f"Failed to load program: {err}", file=sys.stderr)
+        return 1
 
-    bin_path: pathlib.Path
-    if args.bin:
-        bin_path = args.bin
+    def address_of(text: str) -> int:
+        key = text.upper()
+        if key in symbols:
+            return symbols[key]
+        return int(text[1:], 16) if text.startswith("$") else int(text, 0)
+
+    units = []
+    try:
+        for spec in args.poke:
+            target, _, value = spec.partition("=")
+            cpu.write8(address_of(target), address_of(value))
+        for spec in args.reg:
+            name, _, value = spec.partition("=")
+            register = name.strip().lower()
+            if register not in ("a", "b", "x"):
+                raise ValueError(f"unknown register {name!r}")
+            setattr(cpu, register, address_of(value) & (0xFFFF if register == "x" else 0xFF))
+        calls = [address_of(label) for label in args.call]
+        for source in args.source:
+            units.append(Assembler(source.read_text(encoding="utf-8"), filename=str(source)).assemble())
+    except (OSError, ValueError) as err:
+        print(f"Profile setup failed: {err}", file=sys.stderr)
+        return 1
+    except AssemblyError as err:
+        print(f"Assembly failed: {err}", file=sys.stderr)
+        return 1
+
+    profile = Profile()
+    outcomes = []
+    if calls:
+        for label, address in zip(args.call, calls):
+            outcome, _ = profile_call(cpu, address, max_cycles=args.max_cycles, profile=profile)
+            outcomes.append((label, outcome))
+    else:
+        outcome, _ = profile_run(cpu, max_cycles=args.max_cycles, profile=profile)
+        outcomes.append((f"${image.entry_point:04X}", outcome))
+    for label, outcome in outcomes:
+        print(f"{label}: stopped by {outcome.reason} at ${outcome.pc:04X}", file=sys.stderr)
+
+    ranges = [(address, address + len(data)) for address, data in image.segments]
+    routines = RoutineIndex(symbols, ranges)
+    lines = source_lines(units, symbols)
+    limit = args.limit or None
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with args.output.open("w", encoding="utf-8") as stream:
+            write_report(stream, profile, routines, lines, clock_hz=clock_hz, limit=limit)
     else:
-        bin_path = args.output.with_suffix(".bin")
+        write_report(sys.stdout, profile, routines, lines, clock_hz=clock_hz, limit=limit)
+    if args.collapsed:
+        args.collapsed.parent.mkdir(parents=True, exist_ok=True)
+        with args.collapsed.open("w", encoding="utf-8") as stream:
+            write_collapsed(stream, profile, routines)
+    if getattr(args, "zp_hints", None):
+        args.zp_hints.parent.mkdir(parents=True, exist_ok=True)
+        with args.zp_hints.open("w", encoding="utf-8") as stream:
+            write_access_counts(stream, variable_accesses(profile, cpu.memory, RoutineIndex(symbols)))
+    return 0
+
+
+def run_analyze(args: argparse.Namespace) -> int:
+    map_path = args.map or args.program.with_suffix(".map")
+    try:
+        symbols = read_map(map_path) if map_path.exists() else {}
+        image = unpack_prg(args.program.read_bytes())
+        clock_hz = args.clock_hz or find_clock_hz(args.program)
+        budget = args.budget if args.budget is not None else find_frame_budget(args.program)
+        units = [Assembler(source.read_text(encoding="utf-8"), filename=str(source)).assemble() for source in args.source]
+    except (OSError, ValueError, BuildConfigError) as err:
+        print(f"Failed to load program: {err}", file=sys.stderr)
+        return 1
+    except AssemblyError as err:
+        print(f"Assembly failed: {err}", file=sys.stderr)
+        return 1
+
+    memory = bytearray(0x10000)
+    for address, data in image.segments:
+        memory[address : address + len(data)] = data
+    within = _check_wcet(args.wcet, memory, symbols, units, clock_hz=clock_hz, budget=budget)
+    return 0 if within else 1
+
+
+def _check_wcet(
+    labels: Sequence[str],
+    memory: bytearray,
+    symbols: dict[str, int],
+    units: Sequence[AssemblyResult],
+    *,
+    clock_hz: int,
+    budget: int | None,
+) -> bool:
+    """Report each routine's worst case; False if one is unknown, unbounded or over `budget`."""
+
+    bounds = loop_bounds(units, symbols)
+    lines = source_lines(units, symbols)
+    within = True
+    for label in labels:
+        address = symbols.get(label.upper())
+        if address is None:
+            print(f"Unknown label {label}", file=sys.stderr)
+            within = False
+            continue
+        routines = analyze_wcet(memory, address, symbols, bounds)
+        routine = routines[address]
+        write_wcet_report(sys.stdout, routine, routines, lines, clock_hz=clock_hz, budget=budget)
+        if routine.cycles is None:
+            print(f"warning: {routine.name} has no worst case; add loop bounds or remove indirect jumps", file=sys.stderr)
+            if budget is not None:
+                within = False
+        elif budget is not None and routine.cycles > budget:
+            print(
+                f"warning: {routine.name} exceeds the frame budget ({routine.cycles} > {budget} cycles)",
+                file=sys.stderr,
+            )
+            within = False
+    return within
+
+
+def run_build(args: argparse.Namespace) -> int:
+    try:
+        config = load_build_config(args.project)
+    except BuildConfigError as err:
+        print(f"Build failed: {err}", file=sys.stderr)
+        return 1
+    try:
+        built = build_project(config, jobs=args.jobs, use_cache=not args.no_cache)
+    except BuildError as err:
+        print(f"Assembly failed: {err}", file=sys.stderr)
+        return 1
+    except ObjectFormatError as err:
+        print(f"Failed to read archive: {err}", file=sys.stderr)
+        return 1
+    except OSError as err:
+        print(f"Build failed: {err}", file=sys.stderr)
+        return 1
+    except LinkError as err:
+        print(f"Link failed: {err}", file=sys.stderr)
+        return 1
+
+    if config.optimize:
+        for source in config.sources:
+            _print_peephole_report(built.units[source])
+    if config.gc_sections:
+        _print_gc_report(built.link)
+    _print_zero_page_report(built.link)
+    stack = None
+    if config.stack_usage:
+        stack = _analyze_stack_usage(config.stack_entries, built.link.origin, built.link.image, built.link.entry_point, built.link.symbols)
+        if stack is None:
+            return 1
+    try:
+        _write_link_outputs(
+            built.link,
+            output=config.output,
+            bin_path=config.bin,
+            map_path=config.map,
+            program_name=(config.name or config.output.stem).upper()[:32],
+            comment=config.comment,
+            stack=stack,
+        )
+    except OSError as err:
+        print(f"Failed to write outputs: {err}", file=sys.stderr)
+        return 1
+    print(
+        f"Built {config.output} from {len(config.sources)} source(s)"
+        f" ({built.cache_hits} cached)"
+    )
+    if config.wcet:
+        # Timing is only reported here; `jr100dev analyze` fails on an overrun.
+        _check_wcet(
+            config.wcet,
+            memory_image(built.link.origin, built.link.image),
+            built.link.symbols,
+            [built.units[source] for source in config.sources],
+            clock_hz=find_clock_hz(config.root / "jr100.toml"),
+            budget=config.frame_budget,
+        )
+    return 0
+
+
+def run_new(args: argparse.Namespace) -> int:
+    target: pathlib.Path = args.path
+    try:
+        result = create_project(target, force=args.force)
+    except ProjectGenerationError as err:
+        print(f"Project generation failed: {err}", file=sys.stderr)
+        return 1
+
+    print(f"Created project at {result.root}")
+    print("Generated files:")
+    for path in result.created:
+        rel = path.relative_to(result.root)
+        print(f"  {rel}")
+    print()
+    print("Next steps:")
+    print("  1. cd" , result.root)
+    print("  2. jr100dev assemble src/main.asm -o build/main.prg")
+    return 0
+
+
+def _write_link_outputs(
+    result: LinkResult,
+    *,
+    output: pathlib.Path,
+    bin_path: pathlib.Path | None,
+    map_path: pathlib.Path | None,
+    program_name: str,
+    comment: str,
+    stack: StackReport | None = None,
+) -> None:
+    if bin_path is None:
+        bin_path = output.with_suffix(".bin")
     bin_path.parent.mkdir(parents=True, exist_ok=True)
     bin_path.write_bytes(result.image)
 
-    program_name = (args.name or args.output.stem).upper()[:32]
-    comment = args.comment or ""
     segment_payloads = None
     if result.segments:
         segment_payloads = []
@@ -163,53 +695,186 @@ def run_link(args: argparse.Namespace) -> int:
         comment=comment,
         segments=segment_payloads,
     )
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_bytes(prg_bytes)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(prg_bytes)
 
-    if args.map:
-        args.map.parent.mkdir(parents=True, exist_ok=True)
-        _write_map(args.map, result.symbols.items())
+    if map_path:
+        map_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_map(map_path, result.symbols.items(), stack)
 
-    return 0
 
+def _write_extents(path: pathlib.Path, origin: int, extents: Sequence[tuple[int, bytes]]) -> None:
+    """Write a flat image from `origin`; gaps between extents are left as file holes."""
 
-def run_new(args: argparse.Namespace) -> int:
-    target: pathlib.Path = args.path
-    try:
-        result = create_project(target, force=args.force)
-    except ProjectGenerationError as err:
-        print(f"Project generation failed: {err}", file=sys.stderr)
-        return 1
+    with path.open("wb") as handle:
+        for address, data in extents:
+            handle.seek(address - origin)
+            handle.write(data)
 
-    print(f"Created project at {result.root}")
-    print("Generated files:")
-    for path in result.created:
-        rel = path.relative_to(result.root)
-        print(f"  {rel}")
-    print()
-    print("Next steps:")
-    print("  1. cd" , result.root)
-    print("  2. jr100dev assemble src/main.asm -o build/main.prg")
-    return 0
 
+def _print_gc_report(result: LinkResult) -> None:
+    for name in result.removed_sections:
+        print(f"Removed unused section {name}")
+    print(f"Removed {len(result.removed_sections)} section(s), reclaimed {result.reclaimed_bytes} byte(s)")
 
-def _write_map(path: pathlib.Path, symbols: Iterable[tuple[str, int]]) -> None:
-    lines = [f"{name} = ${value:04X}" for name, value in symbols]
-    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
+def _print_zero_page_report(result: LinkResult) -> None:
+    if not result.zero_page:
+        return
+    for allocation in result.zero_page:
+        accesses = f", {allocation.accesses} profiled access(es)" if allocation.accesses is not None else ""
+        print(
+            f"Direct page ${allocation.address:02X} {allocation.name} ({allocation.size} byte(s)):"
+            f" {allocation.references} DIR reference(s), -{allocation.bytes_saved} byte(s),"
+            f" -{allocation.cycles_saved} cycle(s){accesses}"
+        )
+    used = sum(allocation.size for allocation in result.zero_page)
+    saved_bytes = sum(allocation.bytes_saved for allocation in result.zero_page)
+    saved_cycles = sum(allocation.cycles_saved for allocation in result.zero_page)
+    print(
+        f"Placed {len(result.zero_page)} .zp variable(s) in {used} direct-page byte(s):"
+        f" saved {saved_bytes} byte(s) and {saved_cycles} cycle(s) per pass through every reference"
+    )
+
+
+def _load_zp_hints(args: argparse.Namespace) -> dict[str, int] | None:
+    path = getattr(args, "zp_hints", None)
+    return read_zp_hints(path) if path else None
+
+
+def _print_peephole_report(result: AssemblyResult) -> None:
+    for rewrite in result.peephole:
+        filename, line_no = result.source_location(rewrite.line_no)
+        print(
+            f"{filename}:{line_no}: {rewrite.rule}: {rewrite.text}"
+            f" (-{rewrite.bytes_saved} byte(s), -{rewrite.cycles_saved} cycle(s))"
+        )
+    saved_bytes = sum(rewrite.bytes_saved for rewrite in result.peephole)
+    saved_cycles = sum(rewrite.cycles_saved for rewrite in result.peephole)
+    print(
+        f"Optimized {len(result.peephole)} site(s): saved {saved_bytes} byte(s)"
+        f" and {saved_cycles} cycle(s) per pass through every rewritten line"
+    )
+
+
+def _object_format(args: argparse.Namespace) -> str:
+    requested = getattr(args, "obj_format", "auto")
+    if requested != "auto":
+        return requested
+    return "json" if args.obj.suffix.lower() == ".json" else "binary"
+
+
+def _open_cache(args: argparse.Namespace) -> BuildCache | None:
+    if getattr(args, "no_cache", False):
+        return None
+    directory = getattr(args, "cache_dir", None) or args.output.parent / ".cache"
+    return BuildCache(directory)
+
+
+def _cache_options(args: argparse.Namespace) -> dict[str, object]:
+    """Options that shape the assembly result and therefore the cache key.
+
+    `--entry`, `--name` and `--comment` only affect the written outputs, so
+    changing them still hits the cache.
+    """
+    options: dict[str, object] = {}
+    if getattr(args, "function_sections", False):
+        options["function_sections"] = True
+    if getattr(args, "optimize", False):
+        options["optimize"] = True
+    if getattr(args, "long_branches", False):
+        options["long_branches"] = True
+    return options
+
+
+def _write_map(path: pathlib.Path, symbols: Iterable[tuple[str, int]], stack: StackReport | None = None) -> None:
+    lines = [f"{name} = ${value:04X}" for name, value in symbols]
+    with path.open("w", encoding="utf-8") as stream:
+        stream.write("\n".join(lines) + "\n")
+        if stack is not None:
+            write_stack_report(stream, stack)
+
+
+def _stack_usage(args: argparse.Namespace, origin: int, image: bytes, entry_point: int, symbols: dict[str, int]):
+    """Run `--stack-usage` if requested: None when off, False after reporting an error."""
+
+    if not getattr(args, "stack_usage", False):
+        return None
+    report = _analyze_stack_usage(getattr(args, "stack_entry", []), origin, image, entry_point, symbols)
+    return False if report is None else report
+
+
+def _analyze_stack_usage(
+    entry_names: Sequence[str],
+    origin: int,
+    image: bytes,
+    entry_point: int,
+    symbols: dict[str, int],
+) -> StackReport | None:
+    entries = [entry_point]
+    for name in entry_names:
+        address = symbols.get(name.upper())
+        if address is None:
+            print(f"Stack analysis failed: unknown entry label {name}", file=sys.stderr)
+            return None
+        entries.append(address)
+    report = analyze_stack(memory_image(origin, image), entries, symbols)
+    for address in dict.fromkeys(entries):
+        routine = report.routines[address]
+        if routine.depth is None:
+            print(f"Stack depth from {routine.name}: unbounded (see the map for the reason)")
+        else:
+            print(f"Stack depth from {routine.name}: {routine.depth} byte(s)")
+    return report
+
+
+def _write_listing(
+    path: pathlib.Path,
+    emissions: Iterable[LineEmission],
+    clock_hz: int = DEFAULT_CLOCK_HZ,
+    *,
+    source: str | None = None,
+) -> None:
+    """Write the listing with per-instruction cycles and per-routine totals.
+
+    Rows are numbered by the line in the file they came from; a `====` row
+    names the file whenever it changes from `source`.  Macro expansions
+    carry their invocation line.  A routine runs from one address-carrying
+    label to the next; its total is the straight-line sum of its
+    instructions, i.e. one pass without loops.
+    """
 
-def _write_listing(path: pathlib.Path, emissions: Iterable[LineEmission]) -> None:
     rows = []
+    routine: str | None = None
+    total = 0
+    current_file = source
+
+    def close_routine() -> None:
+        if routine is not None and total:
+            micros = total * 1_000_000 / clock_hz
+            rows.append(f"     ---- {routine}: {total} cycles ({micros:.1f} us)")
+
     for emission in emissions:
+        line = emission.line
+        if line.file != current_file:
+            current_file = line.file
+            rows.append(f"     ==== {current_file}")
         if emission.address is None:
-            rows.append(f"{emission.line.line_no:04} ....    {emission.line.text.rstrip()}")
+            rows.append(f"{line.source_line:04} ....    {line.text.rstrip()}")
             continue
+        if line.label is not None:
+            close_routine()
+            routine, total = line.label, 0
         bytes_repr = ' '.join(f"{byte:02X}" for byte in emission.data)
+        cycles_repr = ""
+        if emission.cycles is not None:
+            cycles_repr = str(emission.cycles)
+            total += emission.cycles
         rows.append(
-            f"{emission.line.line_no:04} {emission.address:04X}  {bytes_repr:<12} {emission.line.text.rstrip()}"
+            f"{line.source_line:04} {emission.address:04X}  {bytes_repr:<12} {cycles_repr:>2}  {line.text.rstrip()}"
         )
+    close_routine()
     path.write_text("\n".join(rows) + "\n", encoding="utf-8")
 
-
 if __name__ == "__main__":
     raise SystemExit(main())
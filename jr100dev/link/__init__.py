@@ -1,7 +1,9 @@
 """Linker package exports."""
+from .archive import LibraryArchive, load_archive, pack_archive
 from .linker import LinkError, LinkResult, LinkSegment, link_objects
-from .object_loader import LinkedObject, LinkedSection, LinkedRelocation, ObjectFormatError, load_object
-from .pack_prg import pack_prg
+from .object_loader import LinkedObject, LinkedSection, LinkedRelocation, ObjectFormatError, load_object, parse_object
+from .pack_prg import PrgImage, pack_prg, unpack_prg
+from .zeropage import ZeroPageAllocation
 
 __all__ = [
     "LinkError",
@@ -10,8 +12,15 @@ __all__ = [
     "LinkedObject",
     "LinkedSection",
     "LinkedRelocation",
+    "LibraryArchive",
+    "PrgImage",
+    "ZeroPageAllocation",
     "ObjectFormatError",
     "link_objects",
+    "load_archive",
     "load_object",
+    "pack_archive",
     "pack_prg",
+    "parse_object",
+    "unpack_prg",
 ]
@@ -0,0 +1,141 @@
+"""Static library archives of jr100dev objects.
+
+Layout (all integers little-endian)::
+
+    header         magic "JRAR", version, flags, member/symbol counts,
+                   string table location
+    member table   name, data offset, size
+    symbol index   name, member index (sorted by name)
+    string table   NUL-terminated UTF-8 strings referenced by offset
+    member data    the object files (binary or JSON) stored verbatim
+
+The symbol index lets the linker decide which members to extract without
+decoding any of them.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .object_loader import LinkedObject, ObjectFormatError, SectionData, parse_object
+
+MAGIC = b"JRAR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIIII")
+_MEMBER = struct.Struct("<III")
+_SYMBOL = struct.Struct("<II")
+
+
+@dataclass
+class ArchiveMember:
+    name: str
+    data: SectionData
+
+
+@dataclass
+class LibraryArchive:
+    path: Path
+    members: List[ArchiveMember]
+    # Global symbol -> index of the first member defining it.
+    symbols: Dict[str, int]
+    backing: Optional[mmap.mmap] = field(default=None, repr=False, compare=False)
+    _loaded: Dict[int, LinkedObject] = field(default_factory=dict, repr=False, compare=False)
+
+    def load_member(self, index: int) -> LinkedObject:
+        """Decode a member on first use; later calls return the same object."""
+        obj = self._loaded.get(index)
+        if obj is None:
+            member = self.members[index]
+            obj = parse_object(member.data, Path(f"{self.path}({member.name})"), backing=self.backing)
+            self._loaded[index] = obj
+        return obj
+
+
+def is_archive(prefix: bytes) -> bool:
+    return prefix[: len(MAGIC)] == MAGIC
+
+
+def pack_archive(members: Sequence[Tuple[str, bytes]]) -> bytes:
+    """Build an archive from `(name, object file bytes)` pairs.
+
+    Every member is decoded once to collect its symbols; when several
+    members define the same symbol the first one is indexed.
+    """
+
+    strings: Dict[str, int] = {}
+    blob = bytearray()
+
+    def add(text: str) -> int:
+        offset = strings.get(text)
+        if offset is None:
+            offset = len(blob)
+            strings[text] = offset
+            blob.extend(text.encode("utf-8") + b"\0")
+        return offset
+
+    index: Dict[str, int] = {}
+    for member_index, (name, data) in enumerate(members):
+        obj = parse_object(data, Path(name))
+        for symbol in obj.symbols:
+            index.setdefault(symbol, member_index)
+
+    member_names = [add(name) for name, _ in members]
+    symbol_rows = [(add(name), member) for name, member in sorted(index.items())]
+    strtab_offset = _HEADER.size + _MEMBER.size * len(members) + _SYMBOL.size * len(symbol_rows)
+    data_offset = strtab_offset + len(blob)
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, 0, len(members), len(symbol_rows), strtab_offset, len(blob)))
+    for name_offset, (_, data) in zip(member_names, members):
+        out += _MEMBER.pack(name_offset, data_offset, len(data))
+        data_offset += len(data)
+    for row in symbol_rows:
+        out += _SYMBOL.pack(*row)
+    out += blob
+    for _, data in members:
+        out += data
+    return bytes(out)
+
+
+def load_archive(path: Path) -> LibraryArchive:
+    """Memory-map a library archive and read its member table and symbol index."""
+
+    with path.open("rb") as handle:
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            raise ObjectFormatError(f"Cannot map archive {path}: {exc}") from exc
+    view = memoryview(mapped)
+    if len(view) < _HEADER.size:
+        raise ObjectFormatError(f"Invalid archive {path}: truncated header")
+    magic, version, _flags, member_count, symbol_count, strtab_offset, strtab_size = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ObjectFormatError(f"Invalid archive {path}: bad magic")
+    if version != VERSION:
+        raise ObjectFormatError(f"Unsupported archive version {version} in {path}")
+    members_end = _HEADER.size + _MEMBER.size * member_count
+    symbols_end = members_end + _SYMBOL.size * symbol_count
+    if symbols_end > strtab_offset or strtab_offset + strtab_size > len(view):
+        raise ObjectFormatError(f"Invalid archive {path}: tables outside of file")
+    blob = bytes(view[strtab_offset : strtab_offset + strtab_size])
+
+    def string(offset: int) -> str:
+        end = blob.find(b"\0", offset)
+        if offset >= len(blob) or end < 0:
+            raise ObjectFormatError(f"Invalid archive {path}: string offset outside of string table")
+        return blob[offset:end].decode("utf-8")
+
+    members: List[ArchiveMember] = []
+    for name, offset, size in _MEMBER.iter_unpack(view[_HEADER.size : members_end]):
+        if offset + size > len(view):
+            raise ObjectFormatError(f"Invalid archive {path}: member data outside of file")
+        members.append(ArchiveMember(name=string(name), data=view[offset : offset + size]))
+    symbols: Dict[str, int] = {}
+    for name, member in _SYMBOL.iter_unpack(view[members_end:symbols_end]):
+        if member >= member_count:
+            raise ObjectFormatError(f"Invalid archive {path}: symbol refers to missing member")
+        symbols[string(name)] = member
+    return LibraryArchive(path=path, members=members, symbols=symbols, backing=mapped)
@@ -1,10 +1,18 @@
 """Linker for jr100dev object files."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Sequence
+import heapq
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Generic, List, Mapping, Optional, Sequence, Tuple, TypeVar
 
-from .object_loader import LinkedObject, LinkedSection, LinkedRelocation
+from .archive import LibraryArchive
+from .object_loader import LinkedObject, LinkedSection, LinkedRelocation, ResolvedRelocation
+from .zeropage import ZP_SECTION_PREFIX, ZeroPageAllocation, allocate_zero_page, direct_savings
+
+
+T = TypeVar("T")
 
 
 class LinkError(RuntimeError):
@@ -18,6 +26,13 @@ class LinkResult:
     image: bytes
     symbols: Dict[str, int]
     segments: List['LinkSegment']
+    # Archive members pulled in to resolve undefined symbols, as "lib(member)".
+    members: List[str] = field(default_factory=list)
+    # Sections dropped by `gc_sections`, as "source:section", and their size.
+    removed_sections: List[str] = field(default_factory=list)
+    reclaimed_bytes: int = 0
+    # `.zp` variables placed in the direct page, by address.
+    zero_page: List[ZeroPageAllocation] = field(default_factory=list)
 
 
 @dataclass
@@ -33,9 +48,16 @@ def link_objects(
     text_base: int | None = None,
     data_base: int | None = None,
     bss_base: int | None = None,
+    libraries: Sequence[LibraryArchive] = (),
+    gc_sections: bool = False,
+    exports: Sequence[str] = (),
+    zp_ranges: Sequence[Tuple[int, int]] = (),
+    zp_hints: Optional[Mapping[str, int]] = None,
 ) -> LinkResult:
     if not objects:
         raise LinkError("No objects supplied for linking")
+    explicit_objects = objects
+    objects, members = _extract_members(objects, libraries)
 
     sections: List[LinkedSection] = []
     for obj in objects:
@@ -56,10 +78,34 @@ def link_objects(
         else:
             delta_by_kind[kind] = base_override - original_base
 
+    # Bases are fixed before collection so stripping never moves live code.
+    live: Optional[set[tuple[int, str]]] = None
+    dead_symbols: set[tuple[int, str]] = set()
+    removed: List[str] = []
+    reclaimed = 0
+    if gc_sections:
+        live, dead_symbols = _live_sections(objects, len(explicit_objects), delta_by_kind, entry_override, exports)
+        for obj_index, obj in enumerate(objects):
+            for section in obj.sections:
+                if (obj_index, section.name) not in live and _section_length(section):
+                    removed.append(f"{obj.source}:{section.name}")
+                    reclaimed += _section_length(section)
+        if not live:
+            raise LinkError("No sections reachable from the entry point or exported symbols")
+
     adjusted_sections: List[LinkedSection] = []
     section_address_map: Dict[tuple[int, str], int] = {}
+    zp_requests: Dict[str, int] = {}
     for obj_index, obj in enumerate(objects):
         for section in obj.sections:
+            if live is not None and (obj_index, section.name) not in live:
+                continue
+            if section.kind == "zp":
+                name = section.name[len(ZP_SECTION_PREFIX):]
+                # The same variable may be declared by several units (a shared include).
+                if zp_requests.setdefault(name, section.bss_size) != section.bss_size:
+                    raise LinkError(f"Direct-page variable {name} declared with different sizes")
+                continue
             delta = delta_by_kind.get(section.kind, 0)
             new_address = section.address + delta
             unique_name = f"{section.name}_{obj_index}"
@@ -74,92 +120,344 @@ def link_objects(
             )
             section_address_map[(obj_index, section.name)] = new_address
 
-    origin = min(section.address for section in adjusted_sections)
-    end_address = max(
-        section.address + (len(section.data) if section.data else section.bss_size)
-        for section in adjusted_sections
-    )
+    intervals = _place_sections(adjusted_sections)
+    if intervals:
+        origin = intervals[0][0]
+        end_address = max(end for _, end, _ in intervals)
+    else:
+        origin = end_address = min(section.address for section in adjusted_sections)
     if end_address - origin > 0x10000:
         raise LinkError("Linked image exceeds 64 KiB address space")
 
-    size = end_address - origin
-    image = bytearray(size)
-    filled = bytearray(size)
-    used_end = -1
+    # BSS intervals only reserve address space; the zero-initialised image
+    # already covers them, so only initialised payloads are copied.
+    image = bytearray(end_address - origin)
+    for start, end, section in intervals:
+        if section.data:
+            image[start - origin : end - origin] = section.data
 
-    for section in sorted(adjusted_sections, key=lambda s: s.address):
-        length = len(section.data) if section.data else section.bss_size
-        if length == 0:
-            continue
-        offset = section.address - origin
-        payload = section.data if section.data else [0] * section.bss_size
-        for index, value in enumerate(payload):
-            pos = offset + index
-            if pos >= size:
-                raise LinkError("Section exceeds allocated image size")
-            if filled[pos]:
-                raise LinkError(
-                    f"Section overlap detected at address ${section.address + index:04X}"
-                )
-            image[pos] = value & 0xFF
-            filled[pos] = 1
-        section_end = offset + len(payload)
-        if section_end:
-            used_end = max(used_end, section_end - 1)
-
-    def _adjust_symbol(value: int) -> int:
-        for section in sections:
-            length = len(section.data) if section.data else section.bss_size
-            if length and section.address <= value < section.address + length:
-                return (value + delta_by_kind.get(section.kind, 0)) & 0xFFFF
-        return value & 0xFFFF
+    zero_page = _allocate_zero_page(zp_requests, zp_ranges, intervals, zp_hints)
+
+    _adjust_symbol = _address_index([s for s in sections if s.kind != "zp"], delta_by_kind)
 
     symbols: Dict[str, int] = {}
-    for obj in objects:
+    for obj_index, obj in enumerate(objects):
         for name, value in obj.symbols.items():
+            if (obj_index, name) in dead_symbols:
+                continue
             adjusted = _adjust_symbol(value)
             if name in symbols and symbols[name] != adjusted:
                 raise LinkError(f"Symbol {name} defined with conflicting values")
             symbols[name] = adjusted
+    for allocation in zero_page:
+        if allocation.name in symbols:
+            raise LinkError(f"Symbol {allocation.name} defined with conflicting values")
+        symbols[allocation.name] = allocation.address
 
     if entry_override is not None:
         entry_point = entry_override & 0xFFFF
     else:
-        adjusted_entry_points = {_adjust_symbol(obj.entry_point) for obj in objects}
+        adjusted_entry_points = {_adjust_symbol(obj.entry_point) for obj in explicit_objects}
         if len(adjusted_entry_points) == 1:
             entry_point = adjusted_entry_points.pop() & 0xFFFF
         else:
             entry_point = next(iter(adjusted_entry_points)) & 0xFFFF
 
-    _apply_relocations(objects, origin, image, symbols, section_address_map, delta_by_kind)
-
-    trimmed_image = bytes(image[: used_end + 1]) if used_end >= 0 else bytes()
-
-    merged_segments: List[tuple[int, bytearray]] = []
-    for section in sorted(adjusted_sections, key=lambda s: s.address):
-        length = len(section.data) if section.data else section.bss_size
-        if length == 0:
-            continue
-        payload = section.data if section.data else [0] * section.bss_size
-        data_bytes = bytearray(payload)
-        if merged_segments:
-            last_address, buffer = merged_segments[-1]
-            if last_address + len(buffer) == section.address:
-                buffer.extend(data_bytes)
-                continue
-        merged_segments.append((section.address, data_bytes))
+    _apply_relocations(objects, origin, image, symbols, section_address_map, delta_by_kind, live, zero_page)
 
-    segments = [LinkSegment(address=addr, data=bytes(buf)) for addr, buf in merged_segments]
+    # Adjacent intervals merge into one segment per contiguous address run.
+    runs: List[List[int]] = []
+    for start, end, _ in intervals:
+        if runs and runs[-1][1] == start:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+    segments = [
+        LinkSegment(address=start, data=bytes(image[start - origin : end - origin]))
+        for start, end in runs
+    ]
 
     return LinkResult(
         origin=origin & 0xFFFF,
         entry_point=entry_point,
-        image=trimmed_image,
+        image=bytes(image),
         symbols=symbols,
         segments=segments,
+        members=members,
+        removed_sections=removed,
+        reclaimed_bytes=reclaimed,
+        zero_page=zero_page,
+    )
+
+
+def _extract_members(
+    objects: Sequence[LinkedObject],
+    libraries: Sequence[LibraryArchive],
+) -> tuple[List[LinkedObject], List[str]]:
+    """Append the library members needed to define undefined relocation targets.
+
+    Targets are resolved breadth-first; each is looked up in the libraries
+    in command-line order and the first indexed member wins.  Members pulled
+    in may reference further symbols, which are resolved the same way.
+    """
+
+    selected = list(objects)
+    if not libraries:
+        return selected, []
+    defined = {name for obj in objects for name in obj.symbols}
+    pending = deque(relocation.target for obj in objects for relocation in obj.relocations)
+    extracted: set[tuple[int, int]] = set()
+    members: List[str] = []
+    while pending:
+        target = pending.popleft()
+        if target in defined:
+            continue
+        for library_index, library in enumerate(libraries):
+            member_index = library.symbols.get(target)
+            if member_index is None or (library_index, member_index) in extracted:
+                continue
+            extracted.add((library_index, member_index))
+            obj = library.load_member(member_index)
+            selected.append(obj)
+            members.append(f"{library.path.name}({library.members[member_index].name})")
+            defined.update(obj.symbols)
+            pending.extend(relocation.target for relocation in obj.relocations)
+            break
+    return selected, members
+
+
+def _allocate_zero_page(
+    requests: Dict[str, int],
+    ranges: Sequence[Tuple[int, int]],
+    intervals: Sequence[tuple[int, int, LinkedSection]],
+    hints: Optional[Mapping[str, int]],
+) -> List[ZeroPageAllocation]:
+    if not requests:
+        return []
+    if not ranges:
+        raise LinkError("Direct-page variables need a free range (--zp-range START-END)")
+    occupied = [(start, end) for start, end, _ in intervals if start < 0x100]
+    placed, unplaced = allocate_zero_page(requests, ranges, occupied, hints)
+    if unplaced:
+        counts = hints or {}
+        details = ", ".join(
+            f"{name} ({requests[name]} byte(s)"
+            + (f", {counts[name]} access(es))" if name in counts else ")")
+            for name in unplaced
+        )
+        raise LinkError(f"Direct page is full; move these .zp variables to .bss: {details}")
+    return sorted(
+        (
+            ZeroPageAllocation(
+                name=name,
+                address=address,
+                size=requests[name],
+                accesses=hints.get(name) if hints else None,
+            )
+            for name, address in placed.items()
+        ),
+        key=lambda allocation: allocation.address,
     )
 
 
+def _place_sections(sections: Sequence[LinkedSection]) -> List[tuple[int, int, LinkedSection]]:
+    """Return non-empty sections as sorted `(start, end, section)` intervals.
+
+    Each interval is inserted with `bisect` and only compared against its
+    neighbours, so overlap detection never touches individual bytes.
+    """
+
+    intervals: List[tuple[int, int, LinkedSection]] = []
+    starts: List[int] = []
+    for section in sections:
+        length = _section_length(section)
+        if length == 0:
+            continue
+        start = section.address
+        end = start + length
+        index = bisect_right(starts, start)
+        if index > 0 and intervals[index - 1][1] > start:
+            raise LinkError(f"Section overlap detected at address ${start:04X}")
+        if index < len(intervals) and intervals[index][0] < end:
+            raise LinkError(f"Section overlap detected at address ${intervals[index][0]:04X}")
+        starts.insert(index, start)
+        intervals.insert(index, (start, end, section))
+    return intervals
+
+
+class _RangeIndex(Generic[T]):
+    """Find the value attached to the range containing an address in O(log n).
+
+    Ranges are flattened into disjoint pieces sorted by start address.
+    Where input ranges overlap, a piece keeps the value of the range listed
+    first, which is what a linear scan over the input would find.
+    """
+
+    def __init__(self, ranges: Sequence[tuple[int, int, T]]) -> None:
+        ordered = sorted(
+            (start, end, order, value) for order, (start, end, value) in enumerate(ranges) if end > start
+        )
+        boundaries = sorted({point for start, end, _, _ in ordered for point in (start, end)})
+
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._values: List[T] = []
+        self._orders: List[int] = []
+        active: List[tuple[int, int]] = []
+        cursor = 0
+        for low, high in zip(boundaries, boundaries[1:]):
+            while cursor < len(ordered) and ordered[cursor][0] <= low:
+                _, end, order, _ = ordered[cursor]
+                heapq.heappush(active, (order, end))
+                cursor += 1
+            while active and active[0][1] <= low:
+                heapq.heappop(active)
+            if not active:
+                continue
+            order = active[0][0]
+            if self._ends and self._ends[-1] == low and self._orders[-1] == order:
+                self._ends[-1] = high
+                continue
+            self._starts.append(low)
+            self._ends.append(high)
+            self._orders.append(order)
+            self._values.append(ranges[order][2])
+
+    def find(self, address: int) -> Optional[T]:
+        index = bisect_right(self._starts, address) - 1
+        if index >= 0 and address < self._ends[index]:
+            return self._values[index]
+        return None
+
+
+def _section_length(section: LinkedSection) -> int:
+    return len(section.data) if section.data else section.bss_size
+
+
+def _address_index(sections: Sequence[LinkedSection], delta_by_kind: Dict[str, int]) -> Callable[[int], int]:
+    """Return a function mapping pre-link addresses to relocated values."""
+
+    index = _RangeIndex(
+        [
+            (section.address, section.address + _section_length(section), delta_by_kind.get(section.kind, 0))
+            for section in sections
+        ]
+    )
+
+    def adjust(value: int) -> int:
+        delta = index.find(value)
+        return (value + (delta or 0)) & 0xFFFF
+
+    return adjust
+
+
+def _live_sections(
+    objects: Sequence[LinkedObject],
+    root_objects: int,
+    delta_by_kind: Dict[str, int],
+    entry_override: int | None,
+    exports: Sequence[str],
+) -> tuple[set[tuple[int, str]], set[tuple[int, str]]]:
+    """Mark the sections reachable from the entry point and exported symbols.
+
+    Nodes are `(object index, section name)`; edges follow relocation targets
+    to the section defining them.  Objects assembled without function
+    sections carry no local references, so their sections are kept or
+    dropped together.  Returns the live nodes and the `(object index,
+    symbol)` pairs defined in dead sections.
+    """
+
+    # BSS ranges are listed first: text sections are contiguous buffers and
+    # may span BSS reserved between two code chunks.
+    # `.zp` sections have no address yet; they are defined by name instead.
+    lookups = [
+        _RangeIndex(
+            [
+                (section.address, section.address + _section_length(section), section.name)
+                for section in sorted(obj.sections, key=lambda item: item.kind != "bss")
+                if section.kind != "zp"
+            ]
+        )
+        for obj in objects
+    ]
+    definitions: Dict[str, tuple[int, str]] = {}
+    for obj_index, obj in enumerate(objects):
+        for name, value in obj.symbols.items():
+            owner = lookups[obj_index].find(value)
+            if owner is not None:
+                definitions.setdefault(name, (obj_index, owner))
+        for section in obj.sections:
+            if section.kind == "zp":
+                definitions.setdefault(section.name[len(ZP_SECTION_PREFIX):], (obj_index, section.name))
+    edges: Dict[tuple[int, str], List[str]] = {}
+    for obj_index, obj in enumerate(objects):
+        for relocation in obj.relocations:
+            edges.setdefault((obj_index, relocation.section), []).append(relocation.target)
+
+    roots: List[tuple[int, str]] = []
+    for obj_index in range(root_objects):
+        owner = lookups[obj_index].find(objects[obj_index].entry_point)
+        if owner is not None:
+            roots.append((obj_index, owner))
+    if entry_override is not None:
+        for obj_index, obj in enumerate(objects):
+            for section in obj.sections:
+                start = section.address + delta_by_kind.get(section.kind, 0)
+                if start <= entry_override < start + _section_length(section):
+                    roots.append((obj_index, section.name))
+    for name in exports:
+        if name not in definitions:
+            raise LinkError(f"Exported symbol {name} is not defined in any section")
+        roots.append(definitions[name])
+
+    live: set[tuple[int, str]] = set()
+    queue = deque(roots)
+    while queue:
+        node = queue.popleft()
+        if node in live:
+            continue
+        live.add(node)
+        obj_index, _ = node
+        if not objects[obj_index].function_sections:
+            queue.extend((obj_index, section.name) for section in objects[obj_index].sections)
+        for target in edges.get(node, ()):
+            owner_node = definitions.get(target)
+            if owner_node is not None:
+                queue.append(owner_node)
+
+    dead_symbols = {
+        (obj_index, name)
+        for obj_index, obj in enumerate(objects)
+        for name, value in obj.symbols.items()
+        if (owner := lookups[obj_index].find(value)) is not None and (obj_index, owner) not in live
+    }
+    return live, dead_symbols
+
+
+def _resolve_relocations(obj: LinkedObject) -> List[ResolvedRelocation]:
+    """Return the object's relocations bound to their sections, computed once per object."""
+
+    if obj.resolved_relocations is None:
+        sections_by_name = {section.name: section for section in obj.sections}
+        resolved: List[ResolvedRelocation] = []
+        for relocation in obj.relocations:
+            section = sections_by_name.get(relocation.section)
+            if section is None:
+                raise LinkError(f"Relocation references unknown section {relocation.section}")
+            resolved.append(
+                ResolvedRelocation(
+                    section=relocation.section,
+                    kind=section.kind,
+                    delta=relocation.offset - section.address,
+                    type=relocation.type,
+                    target=relocation.target,
+                    addend=relocation.addend,
+                )
+            )
+        obj.resolved_relocations = resolved
+    return obj.resolved_relocations
+
+
 def _apply_relocations(
     objects: Sequence[LinkedObject],
     origin: int,
@@ -167,20 +465,23 @@ def _apply_relocations(
     symbols: Dict[str, int],
     section_address_map: Dict[tuple[int, str], int],
     delta_by_kind: Dict[str, int],
+    live: Optional[set[tuple[int, str]]] = None,
+    zero_page: Sequence[ZeroPageAllocation] = (),
 ) -> None:
+    zp_by_name = {allocation.name: allocation for allocation in zero_page}
     for obj_index, obj in enumerate(objects):
-        sections_by_name = {section.name: section for section in obj.sections}
-        for relocation in obj.relocations:
-            original_section = sections_by_name.get(relocation.section)
-            if original_section is None:
-                raise LinkError(f"Relocation references unknown section {relocation.section}")
+        for relocation in _resolve_relocations(obj):
+            if relocation.type == "reference":
+                continue
+            if live is not None and (obj_index, relocation.section) not in live:
+                continue
             adjusted_base = section_address_map[(obj_index, relocation.section)]
-            absolute = adjusted_base - origin + (relocation.offset - original_section.address)
+            absolute = adjusted_base - origin + relocation.delta
             if absolute < 0 or absolute >= len(image):
                 raise LinkError("Relocation offset outside of linked image")
             if relocation.target not in symbols:
                 raise LinkError(f"Relocation target {relocation.target} is undefined")
-            delta_source = delta_by_kind.get(original_section.kind, 0)
+            delta_source = delta_by_kind.get(relocation.kind, 0)
             if relocation.type == "relative8":
                 difference = symbols[relocation.target] + relocation.addend - delta_source
                 if difference < -128 or difference > 127:
@@ -195,5 +496,11 @@ def _apply_relocations(
             elif relocation.type == "absolute8":
                 value = (symbols[relocation.target] + relocation.addend) & 0xFFFF
                 image[absolute] = value & 0xFF
+                allocation = zp_by_name.get(relocation.target)
+                saved = direct_savings(image[absolute - 1]) if allocation and absolute else None
+                if saved is not None:
+                    allocation.references += 1
+                    allocation.bytes_saved += saved[0]
+                    allocation.cycles_saved += saved[1]
             else:
                 raise LinkError(f"Unsupported relocation type {relocation.type}")
@@ -0,0 +1,188 @@
+"""Compact binary encoding (version 2) of jr100dev object files.
+
+Layout (all integers little-endian)::
+
+    header         magic "JROB", version, flags, origin, entry point,
+                   section/symbol/relocation counts, string table location,
+                   source name
+    section table  name, kind, address, size, bss_size, data offset
+    symbol table   name, value, scope
+    relocations    section, offset, type, target, signed addend
+    string table   NUL-terminated UTF-8 strings referenced by offset
+    section data   raw bytes of every non-BSS section
+
+Section payloads are stored verbatim so a reader can slice them out of the
+file without decoding.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from typing import Dict, Iterable, List, Tuple, Union
+
+MAGIC = b"JROB"
+VERSION = 2
+
+# Header flag: text was split per label and local references are recorded.
+FLAG_FUNCTION_SECTIONS = 0x0001
+
+_HEADER = struct.Struct("<4sHHHHIIIIII")
+_SECTION = struct.Struct("<IIIIII")
+_SYMBOL = struct.Struct("<IHBx")
+_RELOCATION = struct.Struct("<IIIIi")
+
+_SCOPES = {"global": 0, "local": 1}
+_SCOPE_NAMES = {value: key for key, value in _SCOPES.items()}
+
+# (name, kind, address, data, bss_size)
+SectionRecord = Tuple[str, str, int, bytes, int]
+# (name, value, scope)
+SymbolRecord = Tuple[str, int, str]
+# (section, offset, type, target, addend)
+RelocationRecord = Tuple[str, int, str, str, int]
+
+
+class BinaryObjectError(ValueError):
+    pass
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self._offsets: Dict[str, int] = {}
+        self._blob = bytearray()
+
+    def add(self, text: str) -> int:
+        offset = self._offsets.get(text)
+        if offset is None:
+            offset = len(self._blob)
+            self._offsets[text] = offset
+            self._blob += text.encode("utf-8") + b"\0"
+        return offset
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._blob)
+
+
+def is_binary_object(prefix: bytes) -> bool:
+    return prefix[: len(MAGIC)] == MAGIC
+
+
+def pack_object(
+    *,
+    source: str,
+    origin: int,
+    entry_point: int,
+    sections: Iterable[SectionRecord],
+    symbols: Iterable[SymbolRecord],
+    relocations: Iterable[RelocationRecord],
+    flags: int = 0,
+) -> bytes:
+    strings = _StringTable()
+    source_offset = strings.add(source)
+    section_rows = list(sections)
+    symbol_rows = list(symbols)
+    relocation_rows = list(relocations)
+
+    tables_size = (
+        _HEADER.size
+        + _SECTION.size * len(section_rows)
+        + _SYMBOL.size * len(symbol_rows)
+        + _RELOCATION.size * len(relocation_rows)
+    )
+    body = bytearray()
+    for name, kind, address, data, bss_size in section_rows:
+        body += _SECTION.pack(strings.add(name), strings.add(kind), address, len(data), bss_size, 0)
+    for name, value, scope in symbol_rows:
+        body += _SYMBOL.pack(strings.add(name), value & 0xFFFF, _SCOPES.get(scope, 0))
+    for section, offset, reloc_type, target, addend in relocation_rows:
+        body += _RELOCATION.pack(strings.add(section), offset, strings.add(reloc_type), strings.add(target), addend)
+    string_blob = strings.to_bytes()
+
+    # Patch the data offsets now that the string table size is known.
+    data_offset = tables_size + len(string_blob)
+    for index, (_, _, _, data, _) in enumerate(section_rows):
+        field_offset = _SECTION.size * index + 20
+        struct.pack_into("<I", body, field_offset, data_offset)
+        data_offset += len(data)
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        flags,
+        origin & 0xFFFF,
+        entry_point & 0xFFFF,
+        len(section_rows),
+        len(symbol_rows),
+        len(relocation_rows),
+        tables_size,
+        len(string_blob),
+        source_offset,
+    )
+    return b"".join([header, bytes(body), string_blob, *(bytes(row[3]) for row in section_rows)])
+
+
+def unpack_object(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+) -> Tuple[str, int, int, int, List[Tuple[str, str, int, memoryview, int]], List[SymbolRecord], List[RelocationRecord]]:
+    """Decode a version-2 object; section data are `memoryview` slices of `buffer`.
+
+    Returns `(source, flags, origin, entry_point, sections, symbols, relocations)`.
+    """
+
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise BinaryObjectError("truncated header")
+    (
+        magic,
+        version,
+        flags,
+        origin,
+        entry_point,
+        section_count,
+        symbol_count,
+        relocation_count,
+        strtab_offset,
+        strtab_size,
+        source_offset,
+    ) = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise BinaryObjectError("bad magic")
+    if version != VERSION:
+        raise BinaryObjectError(f"unsupported version {version}")
+    strtab_end = strtab_offset + strtab_size
+    if strtab_end > len(view):
+        raise BinaryObjectError("string table outside of file")
+    blob = bytes(view[strtab_offset:strtab_end])
+    decoded: Dict[int, str] = {}
+
+    def string(offset: int) -> str:
+        text = decoded.get(offset)
+        if text is None:
+            end = blob.find(b"\0", offset)
+            if offset >= len(blob) or end < 0:
+                raise BinaryObjectError("string offset outside of string table")
+            text = blob[offset:end].decode("utf-8")
+            decoded[offset] = text
+        return text
+
+    cursor = _HEADER.size
+    sections_end = cursor + _SECTION.size * section_count
+    symbols_end = sections_end + _SYMBOL.size * symbol_count
+    relocations_end = symbols_end + _RELOCATION.size * relocation_count
+    if relocations_end > strtab_offset:
+        raise BinaryObjectError("tables overlap the string table")
+
+    sections = []
+    for name, kind, address, size, bss_size, data_offset in _SECTION.iter_unpack(view[cursor:sections_end]):
+        if data_offset + size > len(view):
+            raise BinaryObjectError("section data outside of file")
+        sections.append((string(name), string(kind), address, view[data_offset : data_offset + size], bss_size))
+    symbols = [
+        (string(name), value, _SCOPE_NAMES.get(scope, "global"))
+        for name, value, scope in _SYMBOL.iter_unpack(view[sections_end:symbols_end])
+    ]
+    relocations = [
+        (string(section), offset, string(reloc_type), string(target), addend)
+        for section, offset, reloc_type, target, addend in _RELOCATION.iter_unpack(view[symbols_end:relocations_end])
+    ]
+    return string(source_offset), flags, origin, entry_point, sections, symbols, relocations
@@ -2,21 +2,29 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import mmap
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
+
+from .object_binary import FLAG_FUNCTION_SECTIONS, BinaryObjectError, is_binary_object, unpack_object
 
 
 class ObjectFormatError(RuntimeError):
     pass
 
 
+# Section payloads: `bytes` for JSON objects, zero-copy `memoryview` slices of
+# the mapped file for binary objects.
+SectionData = Union[bytes, bytearray, memoryview]
+
+
 @dataclass
 class LinkedSection:
     name: str
     kind: str
     address: int
-    data: List[int]
+    data: SectionData
     bss_size: int = 0
 
 
@@ -28,6 +36,12 @@ class LinkedObject:
     symbols: Dict[str, int]
     sections: List[LinkedSection]
     relocations: List['LinkedRelocation']
+    # Keeps the memory map backing binary section views alive.
+    backing: Optional[mmap.mmap] = field(default=None, repr=False, compare=False)
+    # Text split per label with local references recorded (`--gc-sections`).
+    function_sections: bool = False
+    # Relocations resolved against `sections` by the linker; reused on relink.
+    resolved_relocations: Optional[List['ResolvedRelocation']] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -39,9 +53,53 @@ class LinkedRelocation:
     addend: int = 0
 
 
+@dataclass(frozen=True)
+class ResolvedRelocation:
+    section: str
+    kind: str
+    # Offset of the patched byte from the start of its section.
+    delta: int
+    type: str
+    target: str
+    addend: int
+
+
 def load_object(path: Path) -> LinkedObject:
-    payload = json.loads(path.read_text(encoding="utf-8"))
-    if payload.get("format") != "jr100dev-object":
+    """Load a JSON (version 1) or binary (version 2) object file.
+
+    Binary objects are memory-mapped and their sections are exposed as
+    `memoryview` slices of the mapping, so no section byte is copied.
+    """
+    with path.open("rb") as handle:
+        if is_binary_object(handle.read(4)):
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as exc:
+                raise ObjectFormatError(f"Cannot map object {path}: {exc}") from exc
+            return _load_binary_object(mapped, path, mapped)
+        handle.seek(0)
+        raw = handle.read()
+    return _load_json_object(raw, path)
+
+
+def parse_object(buffer: SectionData, path: Path, *, backing: Optional[mmap.mmap] = None) -> LinkedObject:
+    """Decode an object held in memory, e.g. a library archive member.
+
+    `path` is only used for messages and as the fallback source name.  For
+    binary objects the sections stay views of `buffer`; pass the mapping it
+    slices as `backing` to keep it alive.
+    """
+    if is_binary_object(bytes(buffer[:4])):
+        return _load_binary_object(buffer, path, backing)
+    return _load_json_object(bytes(buffer), path)
+
+
+def _load_json_object(raw: bytes, path: Path) -> LinkedObject:
+    try:
+        payload = json.loads(raw.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ObjectFormatError(f"Unsupported object format in {path}") from exc
+    if not isinstance(payload, dict) or payload.get("format") != "jr100dev-object":
         raise ObjectFormatError(f"Unsupported object format in {path}")
     version = payload.get("version")
     if version != 1:
@@ -66,7 +124,7 @@ def load_object(path: Path) -> LinkedObject:
         if len(content) % 2 != 0:
             raise ObjectFormatError(f"Section content length must be even in {path}")
         try:
-            data = [int(content[i : i + 2], 16) for i in range(0, len(content), 2)]
+            data = bytes.fromhex(content)
         except ValueError as exc:
             raise ObjectFormatError(f"Section content is not hex in {path}") from exc
         bss_size = section.get("bss_size", 0)
@@ -114,4 +172,28 @@ def load_object(path: Path) -> LinkedObject:
         symbols=symbols,
         sections=sections,
         relocations=relocations,
+        function_sections=payload.get("function_sections") is True,
+    )
+
+
+def _load_binary_object(buffer: SectionData | mmap.mmap, path: Path, backing: Optional[mmap.mmap]) -> LinkedObject:
+    try:
+        source, flags, origin, entry, sections, symbols, relocations = unpack_object(buffer)
+    except (BinaryObjectError, UnicodeDecodeError) as exc:
+        raise ObjectFormatError(f"Invalid binary object {path}: {exc}") from exc
+    return LinkedObject(
+        source=source or path.name,
+        origin=origin,
+        entry_point=entry,
+        symbols={name: value for name, value, _scope in symbols},
+        sections=[
+            LinkedSection(name=name, kind=kind, address=address, data=data, bss_size=bss_size)
+            for name, kind, address, data, bss_size in sections
+        ],
+        relocations=[
+            LinkedRelocation(section=section, offset=offset, type=reloc_type, target=target, addend=addend)
+            for section, offset, reloc_type, target, addend in relocations
+        ],
+        backing=backing,
+        function_sections=bool(flags & FLAG_FUNCTION_SECTIONS),
     )
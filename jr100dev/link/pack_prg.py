@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 import struct
-from typing import Iterable, Sequence, Tuple
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence, Tuple
 
 _MAGIC = b"PROG"
 _SECTION_PNAM = b"PNAM"
@@ -88,3 +89,64 @@ def _guard_overlap(ranges: Iterable[tuple[int, int]], start: int, length: int) -
     for existing_start, existing_end in ranges:
         if not (end <= existing_start or start >= existing_end):
             raise ValueError("segment ranges overlap")
+
+
+@dataclass
+class PrgImage:
+    program_name: str
+    entry_point: int
+    segments: List[Segment]
+    comment: str = ""
+
+
+def unpack_prg(payload: bytes) -> PrgImage:
+    """Decode a PROG container written by `pack_prg`.
+
+    エントリーポイントは先頭 PBIN のコメント `entry=$xxxx` から取得し、
+    無い場合は先頭セグメントのアドレスを使う。
+    """
+
+    if payload[:4] != _MAGIC:
+        raise ValueError("not a PROG container")
+    if len(payload) < 8 or struct.unpack_from("<I", payload, 4)[0] != 2:
+        raise ValueError("unsupported PROG version")
+    offset = 8
+    name = ""
+    comment = ""
+    entry: int | None = None
+    segments: List[Segment] = []
+    while offset < len(payload):
+        if offset + 8 > len(payload):
+            raise ValueError("truncated section header")
+        identifier = payload[offset : offset + 4]
+        (length,) = struct.unpack_from("<I", payload, offset + 4)
+        body = payload[offset + 8 : offset + 8 + length]
+        if len(body) != length:
+            raise ValueError("truncated section payload")
+        offset += 8 + length
+        if identifier == _SECTION_PNAM:
+            name = _read_text(body, 0)
+        elif identifier == _SECTION_CMNT:
+            comment = _read_text(body, 0)
+        elif identifier == _SECTION_PBIN:
+            address, size = struct.unpack_from("<II", body, 0)
+            data = bytes(body[8 : 8 + size])
+            if len(data) != size:
+                raise ValueError("truncated PBIN data")
+            segments.append((address, data))
+            note = _read_text(body, 8 + size) if len(body) >= 12 + size else ""
+            if entry is None and note.startswith("entry=$"):
+                entry = int(note[len("entry=$"):], 16)
+    if not segments:
+        raise ValueError("PROG container has no PBIN section")
+    return PrgImage(
+        program_name=name,
+        entry_point=entry if entry is not None else segments[0][0],
+        segments=segments,
+        comment=comment,
+    )
+
+
+def _read_text(body: bytes, offset: int) -> str:
+    (length,) = struct.unpack_from("<I", body, offset)
+    return body[offset + 4 : offset + 4 + length].decode("utf-8")
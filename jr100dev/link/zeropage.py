@@ -0,0 +1,124 @@
+"""Direct-page allocation for `.zp` variables.
+
+The assembler emits one `zp.<NAME>` section per variable and encodes every
+access it can as DIR with an `absolute8` relocation.  The linker hands the
+requests to `allocate_zero_page`, which places them first-fit in the free
+direct-page ranges, hottest first when access counts from the profiler are
+available.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ..asm import opcodes_mb8861h
+
+ZP_SECTION_PREFIX = "zp."
+
+_EXTENDED = {spec['mnemonic']: spec for spec in opcodes_mb8861h.OPCODES if spec['addressing'] == 'EXT'}
+# DIR opcode -> (bytes, cycles) saved compared with the EXT form.
+_DIRECT_SAVINGS: Dict[int, Tuple[int, int]] = {
+    spec['opcode']: (ext['size'] - spec['size'], ext['cycles'] - spec['cycles'])
+    for spec in opcodes_mb8861h.OPCODES
+    if spec['addressing'] == 'DIR' and (ext := _EXTENDED.get(spec['mnemonic'])) is not None
+}
+
+
+@dataclass
+class ZeroPageAllocation:
+    name: str
+    address: int
+    size: int
+    # Accesses encoded as DIR and what they save over EXT; cycles are per
+    # pass through every referencing instruction.
+    references: int = 0
+    bytes_saved: int = 0
+    cycles_saved: int = 0
+    # Executed accesses from `profile --zp-hints`, if given.
+    accesses: Optional[int] = None
+
+
+def parse_zp_range(text: str) -> Tuple[int, int]:
+    """Parse an inclusive `START-END` range (e.g. `$C0-$FF`) into `(start, end)` with `end` exclusive."""
+
+    low, sep, high = text.partition("-")
+    if not sep:
+        raise ValueError(f"expected START-END, got {text!r}")
+    start, end = _parse_number(low), _parse_number(high)
+    if not 0 <= start <= end <= 0xFF:
+        raise ValueError(f"direct-page range must lie within $00-$FF: {text!r}")
+    return start, end + 1
+
+
+def read_zp_hints(path: Path) -> Dict[str, int]:
+    """Read `NAME COUNT` lines as written by `jr100dev profile --zp-hints`."""
+
+    hints: Dict[str, int] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        text = line.split("#", 1)[0].strip()
+        if not text:
+            continue
+        name, _, count = text.partition(" ")
+        hints[name.upper()] = int(count.strip() or "0")
+    return hints
+
+
+def allocate_zero_page(
+    requests: Mapping[str, int],
+    ranges: Sequence[Tuple[int, int]],
+    occupied: Sequence[Tuple[int, int]] = (),
+    hints: Optional[Mapping[str, int]] = None,
+) -> Tuple[Dict[str, int], List[str]]:
+    """Place `name -> size` requests in the free bytes of `ranges`.
+
+    Bytes covered by `occupied` intervals (sections placed in the direct
+    page) are skipped.  Variables with more profiled accesses are placed
+    first; the rest keep their declaration order.  Returns the addresses
+    and the names that did not fit.
+    """
+
+    free = [False] * 0x100
+    for start, end in ranges:
+        for address in range(start, end):
+            free[address] = True
+    for start, end in occupied:
+        for address in range(max(start, 0), min(end, 0x100)):
+            free[address] = False
+
+    counts = hints or {}
+    order = sorted(requests, key=lambda name: -counts.get(name, 0))
+    placed: Dict[str, int] = {}
+    unplaced: List[str] = []
+    for name in order:
+        size = requests[name]
+        address = _first_fit(free, size)
+        if address is None:
+            unplaced.append(name)
+            continue
+        for offset in range(size):
+            free[address + offset] = False
+        placed[name] = address
+    return placed, unplaced
+
+
+def direct_savings(opcode: int) -> Optional[Tuple[int, int]]:
+    """`(bytes, cycles)` a DIR instruction saves over EXT, or None for other opcodes."""
+
+    return _DIRECT_SAVINGS.get(opcode)
+
+
+def _first_fit(free: List[bool], size: int) -> Optional[int]:
+    run = 0
+    for address, available in enumerate(free):
+        run = run + 1 if available else 0
+        if run == size:
+            return address - size + 1
+    return None
+
+
+def _parse_number(text: str) -> int:
+    text = text.strip()
+    if text.startswith("$"):
+        return int(text[1:], 16)
+    return int(text, 0)
@@ -1,8 +1,30 @@
 """Project utilities for jr100dev."""
 
+from .build import (
+    DEFAULT_CLOCK_HZ,
+    BuildConfig,
+    BuildConfigError,
+    BuildError,
+    ProjectBuildResult,
+    build_project,
+    find_clock_hz,
+    find_frame_budget,
+    load_build_config,
+    object_from_assembly,
+)
 from .new import ProjectGenerationError, ProjectScaffoldResult, create_project
 
 __all__ = [
+    "DEFAULT_CLOCK_HZ",
+    "BuildConfig",
+    "BuildConfigError",
+    "BuildError",
+    "ProjectBuildResult",
+    "build_project",
+    "find_clock_hz",
+    "find_frame_budget",
+    "load_build_config",
+    "object_from_assembly",
     "ProjectGenerationError",
     "ProjectScaffoldResult",
     "create_project",
@@ -0,0 +1,368 @@
+"""Project builds driven by `jr100.toml` for `jr100dev build`."""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # pragma: no cover - Python < 3.11
+    import tomli as tomllib  # type: ignore[no-redef]
+
+from ..asm.cache import BuildCache
+from ..asm.encoder import Assembler, AssemblyError, AssemblyResult
+from ..link import LinkedObject, LinkedRelocation, LinkedSection, LinkResult, link_objects, load_archive
+from ..link.zeropage import parse_zp_range, read_zp_hints
+
+CONFIG_NAME = "jr100.toml"
+# MB8861H clock of the JR-100, used when no `[cpu] clock_hz` is configured.
+DEFAULT_CLOCK_HZ = 894_000
+
+
+class BuildConfigError(RuntimeError):
+    """Raised when `jr100.toml` has no usable `[build]` table."""
+
+
+class BuildError(RuntimeError):
+    """Raised when one or more translation units fail to assemble."""
+
+
+@dataclass
+class BuildConfig:
+    root: Path
+    sources: List[Path]
+    output: Path
+    bin: Optional[Path] = None
+    map: Optional[Path] = None
+    name: Optional[str] = None
+    comment: str = ""
+    entry: Optional[int] = None
+    text_base: Optional[int] = None
+    data_base: Optional[int] = None
+    bss_base: Optional[int] = None
+    cache_dir: Optional[Path] = None
+    libraries: List[Path] = field(default_factory=list)
+    gc_sections: bool = False
+    exports: List[str] = field(default_factory=list)
+    optimize: bool = False
+    long_branches: bool = False
+    # Free direct-page bytes as (start, end) with `end` exclusive.
+    zp_ranges: List[Tuple[int, int]] = field(default_factory=list)
+    zp_hints: Optional[Path] = None
+    stack_usage: bool = False
+    stack_entries: List[str] = field(default_factory=list)
+    # `[analyze]`: routines whose worst case is checked after each build.
+    wcet: List[str] = field(default_factory=list)
+    frame_budget: Optional[int] = None
+
+
+@dataclass
+class ProjectBuildResult:
+    config: BuildConfig
+    units: Dict[Path, AssemblyResult]
+    link: LinkResult
+    cache_hits: int = 0
+
+
+def load_build_config(path: Path) -> BuildConfig:
+    """Read the `[build]` table of a project configuration.
+
+    `path` may point at `jr100.toml` itself or at the project directory.
+    Paths are resolved relative to the directory containing the file and
+    addresses accept `"$3000"`, `"0x3000"` or plain integers.
+    """
+
+    config_path = path / CONFIG_NAME if path.is_dir() else path
+    try:
+        with config_path.open("rb") as handle:
+            payload = tomllib.load(handle)
+    except FileNotFoundError as err:
+        raise BuildConfigError(f"{config_path} が見つかりません") from err
+    except tomllib.TOMLDecodeError as err:
+        raise BuildConfigError(f"{config_path} の解析に失敗しました: {err}") from err
+
+    build = payload.get("build")
+    if not isinstance(build, dict):
+        raise BuildConfigError(f"{config_path} に [build] セクションがありません")
+    root = config_path.resolve().parent
+    sources = build.get("sources")
+    if not isinstance(sources, list) or not sources or not all(isinstance(item, str) for item in sources):
+        raise BuildConfigError("[build] sources には 1 つ以上のソースパスを指定してください")
+    output = build.get("output", "build/main.prg")
+    if not isinstance(output, str):
+        raise BuildConfigError("[build] output は文字列で指定してください")
+
+    def optional_path(key: str) -> Optional[Path]:
+        value = build.get(key)
+        if value is None:
+            return None
+        if not isinstance(value, str):
+            raise BuildConfigError(f"[build] {key} は文字列で指定してください")
+        return root / value
+
+    def optional_address(key: str) -> Optional[int]:
+        value = build.get(key)
+        if value is None:
+            return None
+        try:
+            return parse_address(value)
+        except ValueError as err:
+            raise BuildConfigError(f"[build] {key} のアドレスが不正です: {value!r}") from err
+
+    libraries = build.get("libraries", [])
+    if not isinstance(libraries, list) or not all(isinstance(item, str) for item in libraries):
+        raise BuildConfigError("[build] libraries はアーカイブパスの配列で指定してください")
+
+    gc_sections = build.get("gc_sections", False)
+    if not isinstance(gc_sections, bool):
+        raise BuildConfigError("[build] gc_sections は true/false で指定してください")
+    optimize = build.get("optimize", False)
+    if not isinstance(optimize, bool):
+        raise BuildConfigError("[build] optimize は true/false で指定してください")
+    long_branches = build.get("long_branches", False)
+    if not isinstance(long_branches, bool):
+        raise BuildConfigError("[build] long_branches は true/false で指定してください")
+    zp_ranges = build.get("zp_ranges", [])
+    if not isinstance(zp_ranges, list) or not all(isinstance(item, str) for item in zp_ranges):
+        raise BuildConfigError('[build] zp_ranges は "$C0-$FF" 形式の文字列の配列で指定してください')
+    try:
+        parsed_zp_ranges = [parse_zp_range(item) for item in zp_ranges]
+    except ValueError as err:
+        raise BuildConfigError(f"[build] zp_ranges が不正です: {err}") from err
+    stack_usage = build.get("stack_usage", False)
+    if not isinstance(stack_usage, bool):
+        raise BuildConfigError("[build] stack_usage は true/false で指定してください")
+    stack_entries = build.get("stack_entries", [])
+    if not isinstance(stack_entries, list) or not all(isinstance(item, str) for item in stack_entries):
+        raise BuildConfigError("[build] stack_entries はラベル名の配列で指定してください")
+    analyze = payload.get("analyze", {})
+    if not isinstance(analyze, dict):
+        raise BuildConfigError("[analyze] はテーブルで指定してください")
+    wcet = analyze.get("wcet", [])
+    if not isinstance(wcet, list) or not all(isinstance(item, str) for item in wcet):
+        raise BuildConfigError("[analyze] wcet はラベル名の配列で指定してください")
+    frame_budget = _frame_budget(analyze, config_path)
+    exports = build.get("exports", [])
+    if not isinstance(exports, list) or not all(isinstance(item, str) for item in exports):
+        raise BuildConfigError("[build] exports はシンボル名の配列で指定してください")
+
+    name = build.get("name")
+    comment = build.get("comment", "")
+    return BuildConfig(
+        root=root,
+        sources=[root / item for item in sources],
+        output=root / output,
+        bin=optional_path("bin"),
+        map=optional_path("map"),
+        name=str(name) if name is not None else None,
+        comment=str(comment),
+        entry=optional_address("entry"),
+        text_base=optional_address("text_base"),
+        data_base=optional_address("data_base"),
+        bss_base=optional_address("bss_base"),
+        cache_dir=optional_path("cache_dir"),
+        libraries=[root / item for item in libraries],
+        gc_sections=gc_sections,
+        exports=[item.upper() for item in exports],
+        optimize=optimize,
+        long_branches=long_branches,
+        zp_ranges=parsed_zp_ranges,
+        zp_hints=optional_path("zp_hints"),
+        stack_usage=stack_usage,
+        stack_entries=[item.upper() for item in stack_entries],
+        wcet=[item.upper() for item in wcet],
+        frame_budget=frame_budget,
+    )
+
+
+def find_clock_hz(source: Path) -> int:
+    """Return `[cpu] clock_hz` of the nearest `jr100.toml` above `source`."""
+
+    found = _nearest_config(source)
+    if found is None:
+        return DEFAULT_CLOCK_HZ
+    config_path, payload = found
+    cpu = payload.get("cpu")
+    value = cpu.get("clock_hz", DEFAULT_CLOCK_HZ) if isinstance(cpu, dict) else DEFAULT_CLOCK_HZ
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise BuildConfigError(f"{config_path} の [cpu] clock_hz は正の整数で指定してください")
+    return value
+
+
+def find_frame_budget(source: Path) -> Optional[int]:
+    """Return `[analyze] frame_budget` (cycles) of the nearest `jr100.toml` above `source`."""
+
+    found = _nearest_config(source)
+    if found is None:
+        return None
+    config_path, payload = found
+    analyze = payload.get("analyze")
+    return _frame_budget(analyze, config_path) if isinstance(analyze, dict) else None
+
+
+def _nearest_config(source: Path) -> Optional[Tuple[Path, dict]]:
+    for directory in source.resolve().parents:
+        config_path = directory / CONFIG_NAME
+        if not config_path.is_file():
+            continue
+        try:
+            with config_path.open("rb") as handle:
+                return config_path, tomllib.load(handle)
+        except (OSError, tomllib.TOMLDecodeError) as err:
+            raise BuildConfigError(f"{config_path} の解析に失敗しました: {err}") from err
+    return None
+
+
+def _frame_budget(analyze: dict, config_path: Path) -> Optional[int]:
+    value = analyze.get("frame_budget")
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise BuildConfigError(f"{config_path} の [analyze] frame_budget は正の整数（サイクル数）で指定してください")
+    return value
+
+
+def parse_address(value: object) -> int:
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("$"):
+            return int(text[1:], 16)
+        return int(text, 0)
+    raise ValueError(value)
+
+
+def build_project(config: BuildConfig, *, jobs: Optional[int] = None, use_cache: bool = True) -> ProjectBuildResult:
+    """Assemble every source in parallel and link the results in memory."""
+
+    cache_dir: Optional[Path] = None
+    if use_cache:
+        cache_dir = config.cache_dir or config.output.parent / ".cache"
+    tasks = [
+        (
+            str(source),
+            str(cache_dir) if cache_dir else None,
+            config.gc_sections,
+            config.optimize,
+            config.long_branches,
+        )
+        for source in config.sources
+    ]
+    workers = jobs or min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1 or len(tasks) == 1:
+        outcomes = [_assemble_unit(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_assemble_unit, *zip(*tasks)))
+
+    units: Dict[Path, AssemblyResult] = {}
+    failures: List[str] = []
+    hits = 0
+    for source, (result, error, cached) in zip(config.sources, outcomes):
+        if error is not None:
+            failures.append(f"{source}: {error}")
+            continue
+        units[source] = result
+        hits += int(cached)
+    if failures:
+        raise BuildError("\n".join(failures))
+
+    zp_hints = None
+    if config.zp_hints is not None:
+        try:
+            zp_hints = read_zp_hints(config.zp_hints)
+        except (OSError, ValueError) as err:
+            raise BuildError(f"{config.zp_hints}: アクセス数ヒントを読み込めません: {err}") from err
+
+    linked = link_objects(
+        [object_from_assembly(units[source]) for source in config.sources],
+        entry_override=config.entry,
+        text_base=config.text_base,
+        data_base=config.data_base,
+        bss_base=config.bss_base,
+        libraries=[load_archive(path) for path in config.libraries],
+        gc_sections=config.gc_sections,
+        exports=config.exports,
+        zp_ranges=config.zp_ranges,
+        zp_hints=zp_hints,
+    )
+    return ProjectBuildResult(config=config, units=units, link=linked, cache_hits=hits)
+
+
+def object_from_assembly(result: AssemblyResult) -> LinkedObject:
+    """Convert an in-memory assembly result into a linker object."""
+
+    return LinkedObject(
+        source=result.source,
+        origin=result.origin & 0xFFFF,
+        entry_point=result.entry_point & 0xFFFF,
+        symbols={name: value & 0xFFFF for name, value in result.symbols.items()},
+        sections=[
+            LinkedSection(
+                name=section.name,
+                kind=section.kind,
+                address=section.address,
+                data=bytes(section.data),
+                bss_size=section.bss_size,
+            )
+            for section in result.sections
+        ],
+        relocations=[
+            LinkedRelocation(
+                section=relocation.section,
+                offset=relocation.offset,
+                type=relocation.type,
+                target=relocation.target,
+                addend=relocation.addend,
+            )
+            for relocation in result.relocations
+        ],
+        function_sections=result.function_sections,
+    )
+
+
+def _assemble_unit(
+    source: str,
+    cache_dir: Optional[str],
+    function_sections: bool = False,
+    optimize: bool = False,
+    long_branches: bool = False,
+) -> tuple[Optional[AssemblyResult], Optional[str], bool]:
+    path = Path(source)
+    # Only non-default options enter the cache key.
+    options: Dict[str, object] = {}
+    if function_sections:
+        options["function_sections"] = True
+    if optimize:
+        options["optimize"] = True
+    if long_branches:
+        options["long_branches"] = True
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as err:
+        return None, f"ソースを読み込めません: {err}", False
+    cache = BuildCache(Path(cache_dir)) if cache_dir else None
+    if cache is not None:
+        cached = cache.lookup(source, text, options)
+        if cached is not None:
+            return cached, None, True
+    try:
+        assembler = Assembler(
+            text,
+            filename=source,
+            function_sections=function_sections,
+            optimize=optimize,
+            long_branches=long_branches,
+        )
+        result = assembler.assemble()
+    except AssemblyError as err:
+        return None, str(err), False
+    if cache is not None:
+        cache.store(source, text, options, assembler.include_lookups, result)
+    return result, None, False
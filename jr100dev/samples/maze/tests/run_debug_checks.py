@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Smoke checks for maze test cartridges using the local jr100 emulator."""
+"""Smoke checks for maze test cartridges using the in-repo MB8861H simulator."""
 
 from __future__ import annotations
 
@@ -11,19 +11,15 @@ from typing import Dict, Iterable, List, Sequence
 
 
 REPO_ROOT = Path(__file__).resolve().parents[4]
-PYJR100EMU_SRC = REPO_ROOT / "external" / "pyjr100emu" / "src"
 
-if str(PYJR100EMU_SRC) not in sys.path:
-    sys.path.insert(0, str(PYJR100EMU_SRC))
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-from jr100emu.debug_runner import (  # type: ignore  # pylint: disable=wrong-import-position
-    _execute_program,
-    _initialise_cpu_state,
-    _load_program,
-    _setup_computer,
-)
+from jr100dev.sim import MB8861, load_prg  # pylint: disable=wrong-import-position
 
 
+CLOCK_HZ = 894_000
+STACK_POINTER = 0x0244
 TEST_DIR = Path(__file__).resolve().parent
 MAZE_SAMPLE_DIR = TEST_DIR.parent
 MAZE_SAMPLE_BUILD = MAZE_SAMPLE_DIR / "build"
@@ -35,9 +31,9 @@ class MemoryExpectation:
     base: int
     values: Sequence[int]
 
-    def verify(self, memory) -> None:
+    def verify(self, memory: bytearray) -> None:
         for offset, expected in enumerate(self.values):
-            actual = memory.load8(self.base + offset) & 0xFF
+            actual = memory[self.base + offset]
             if actual != expected:
                 raise AssertionError(
                     f"addr=0x{self.base + offset:04X}: expected 0x{expected:02X}, got 0x{actual:02X}"
@@ -51,17 +47,18 @@ def build_prg(target: str) -> Path:
     return prg_path
 
 
-def run_cartridge(prg_path: Path, *, seconds: float = 1.0) -> object:
-    computer = _setup_computer(None)
-    _load_program(computer, str(prg_path))
-    _initialise_cpu_state(computer, start_address=0x0300, stack_pointer=0x0244)
-    _execute_program(
-        computer,
-        max_cycles=None,
-        breakpoints=[],
-        max_seconds=seconds,
-    )
-    return computer.memory
+def run_cartridge(prg_path: Path, *, seconds: float = 1.0) -> bytearray:
+    """Run a test cartridge from START until it halts or `seconds` of JR-100 time pass.
+
+    Cartridges that place tables ahead of their code (via included headers)
+    would otherwise begin by executing data at $0300.
+    """
+    cpu = MB8861()
+    load_prg(cpu, prg_path)
+    start = load_symbol_map(prg_path.with_suffix(".map")).get("START", 0x0300)
+    cpu.reset(start, STACK_POINTER)
+    cpu.run(max_cycles=int(seconds * CLOCK_HZ))
+    return cpu.memory
 
 
 def ensure_maze_sample() -> Path:
@@ -71,9 +68,8 @@ def ensure_maze_sample() -> Path:
     return prg_path
 
 
-def load_symbol_map() -> Dict[str, int]:
+def load_symbol_map(map_path: Path = MAZE_SAMPLE_BUILD / "maze.map") -> Dict[str, int]:
     symbol_map: Dict[str, int] = {}
-    map_path = MAZE_SAMPLE_BUILD / "maze.map"
     with map_path.open(encoding="utf-8") as stream:
         for line in stream:
             line = line.strip()
@@ -87,7 +83,7 @@ def load_symbol_map() -> Dict[str, int]:
     return symbol_map
 
 
-def run_maze_generation(level_index: int, seconds: float) -> object:
+def run_maze_generation(level_index: int, seconds: float) -> bytearray:
     prg_path = ensure_maze_sample()
     symbols = load_symbol_map()
     required = ("MAZE_APPLY_LEVEL", "MAZE_GENERATE", "MENU_SELECTED")
@@ -95,30 +91,17 @@ def run_maze_generation(level_index: int, seconds: float) -> object:
     if missing:
         raise RuntimeError(f"Missing symbol(s) in maze.map: {', '.join(missing)}")
 
-    computer = _setup_computer(None)
-    _load_program(computer, str(prg_path))
-    memory = computer.memory
-    memory.store8(symbols["MENU_SELECTED"], level_index & 0xFF)
-
-    _initialise_cpu_state(computer, start_address=symbols["MAZE_APPLY_LEVEL"], stack_pointer=0x0244)
-    if computer.cpu_core is None:
-        raise RuntimeError("CPU core is unavailable")
-    computer.cpu_core.registers.acc_a = level_index & 0xFF
-    _execute_program(
-        computer,
-        max_cycles=2000,
-        breakpoints=[],
-        max_seconds=None,
-    )
+    cpu = MB8861()
+    load_prg(cpu, prg_path)
+    cpu.write8(symbols["MENU_SELECTED"], level_index)
 
-    _initialise_cpu_state(computer, start_address=symbols["MAZE_GENERATE"], stack_pointer=0x0244)
-    _execute_program(
-        computer,
-        max_cycles=None,
-        breakpoints=[],
-        max_seconds=seconds,
-    )
-    return memory
+    cpu.reset(symbols["MAZE_APPLY_LEVEL"], STACK_POINTER)
+    cpu.a = level_index & 0xFF
+    cpu.call(symbols["MAZE_APPLY_LEVEL"], max_cycles=2000)
+
+    cpu.reset(symbols["MAZE_GENERATE"], STACK_POINTER)
+    cpu.call(symbols["MAZE_GENERATE"], max_cycles=int(seconds * CLOCK_HZ))
+    return cpu.memory
 
 
 def check_maze_init() -> None:
@@ -210,7 +193,7 @@ def check_maze_scroll() -> None:
         11: 3,  # draw_y after top scroll
     }
     for offset, value in expected.items():
-        actual = memory.load8(base + offset) & 0xFF
+        actual = memory[base + offset]
         if actual != value:
             raise AssertionError(
                 f"maze_scroll_test: offset {offset:#04x} expected {value:#04x}, got {actual:#04x}"
@@ -233,18 +216,18 @@ def check_maze_level(level_index: int, expected_width: int, expected_height: int
     seconds = 30.0 if expected_width >= 32 else 2.0
     memory = run_maze_generation(level_index, seconds=seconds)
 
-    width = memory.load8(0x0600)
-    height = memory.load8(0x0601)
+    width = memory[0x0600]
+    height = memory[0x0601]
     if width != expected_width or height != expected_height:
         raise AssertionError(f"{label}: expected size {expected_width}x{expected_height}, got {width}x{height}")
 
     symbols = load_symbol_map()
     maze_base = symbols["MAZE_MAP"]
-    cell_w = memory.load8(0x0602)
-    cell_h = memory.load8(0x0603)
-    top = [memory.load8(maze_base + col) & 0xFF for col in range(width)]
+    cell_w = memory[0x0602]
+    cell_h = memory[0x0603]
+    top = [memory[maze_base + col] for col in range(width)]
     bottom_base = maze_base + width * (height - 1)
-    bottom = [memory.load8(bottom_base + col) & 0xFF for col in range(width)]
+    bottom = [memory[bottom_base + col] for col in range(width)]
     if any(value != 0x23 for value in top):
         raise AssertionError(f"{label}: top border is not sealed")
     if any(value != 0x23 for value in bottom):
@@ -254,7 +237,7 @@ def check_maze_level(level_index: int, expected_width: int, expected_height: int
     for row in range(1, height - 1):
         row_base = maze_base + row * width
         for col in range(1, width - 1):
-            if memory.load8(row_base + col) & 0xFF == 0x20:
+            if memory[row_base + col] == 0x20:
                 inner_paths += 1
     if inner_paths == 0:
         raise AssertionError(f"{label}: no passages carved in maze interior")
@@ -264,7 +247,7 @@ def check_maze_level(level_index: int, expected_width: int, expected_height: int
     visited_count = sum(
         1
         for index in range(expected_cells)
-        if (memory.load8(visited_base + index) & 0xFF) == CELL_VISITED_FLAG
+        if memory[visited_base + index] == CELL_VISITED_FLAG
     )
     if visited_count / max(expected_cells, 1) < 0.9:
         raise AssertionError(
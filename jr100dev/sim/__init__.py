@@ -0,0 +1,38 @@
+"""Headless MB8861H simulator for running assembled programs."""
+
+from .cpu import MB8861, RETURN_SENTINEL, RunResult, SimulatorError, cycles_for
+from .loader import DEFAULT_STACK, load_prg
+from .profile import (
+    Profile,
+    RoutineIndex,
+    SourceLine,
+    profile_call,
+    profile_run,
+    read_map,
+    source_lines,
+    variable_accesses,
+    write_access_counts,
+    write_collapsed,
+    write_report,
+)
+
+__all__ = [
+    "DEFAULT_STACK",
+    "MB8861",
+    "Profile",
+    "RETURN_SENTINEL",
+    "RoutineIndex",
+    "RunResult",
+    "SimulatorError",
+    "SourceLine",
+    "cycles_for",
+    "load_prg",
+    "profile_call",
+    "profile_run",
+    "read_map",
+    "source_lines",
+    "variable_accesses",
+    "write_access_counts",
+    "write_collapsed",
+    "write_report",
+]
@@ -0,0 +1,676 @@
+"""Instruction-level MB8861H (6800 compatible) core with flat 64 KiB memory."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..asm import opcodes_mb8861h
+
+FLAG_C = 0x01
+FLAG_V = 0x02
+FLAG_Z = 0x04
+FLAG_N = 0x08
+FLAG_I = 0x10
+FLAG_H = 0x20
+
+SWI_VECTOR = 0xFFFA
+# Return address pushed by `MB8861.call`; lies in the JR-100 ROM.
+RETURN_SENTINEL = 0xFFFE
+
+_ALU8 = {"ADD", "ADC", "SUB", "SBC", "CMP", "AND", "BIT", "EOR", "ORA", "LDA"}
+_RMW = {"NEG", "COM", "LSR", "ROR", "ASR", "ASL", "ROL", "DEC", "INC", "TST", "CLR"}
+
+
+class SimulatorError(RuntimeError):
+    pass
+
+
+@dataclass
+class RunResult:
+    """Why `MB8861.run` returned.
+
+    `reason` is one of `"breakpoint"`, `"cycles"`, `"instructions"`,
+    `"halt"` (a branch or jump to itself, or WAI) and `"illegal"`.
+    """
+
+    reason: str
+    pc: int
+    cycles: int
+    instructions: int
+
+
+Handler = Callable[["MB8861", int], None]
+
+
+class MB8861:
+    """MB8861H core executing from a 64 KiB `bytearray`.
+
+    Instructions are dispatched through a 256-entry table built from
+    `opcodes_mb8861h.OPCODES`; memory-mapped I/O is not modelled, so the
+    VIA and VRAM are plain RAM.
+    """
+
+    __slots__ = ("memory", "a", "b", "x", "sp", "pc", "cc", "cycles", "instructions", "halted", "_table")
+
+    def __init__(self, memory: Optional[bytearray] = None) -> None:
+        if memory is None:
+            memory = bytearray(0x10000)
+        if len(memory) != 0x10000:
+            raise ValueError("memory must be exactly 64 KiB")
+        self.memory = memory
+        self.a = 0
+        self.b = 0
+        self.x = 0
+        self.sp = 0
+        self.pc = 0
+        self.cc = 0xC0
+        self.cycles = 0
+        self.instructions = 0
+        self.halted = False
+        self._table = _DISPATCH
+
+    # -- memory helpers -------------------------------------------------
+
+    def load(self, address: int, data: bytes) -> None:
+        end = address + len(data)
+        if address < 0 or end > 0x10000:
+            raise ValueError(f"data at ${address:04X} does not fit in memory")
+        self.memory[address:end] = data
+
+    def read8(self, address: int) -> int:
+        return self.memory[address & 0xFFFF]
+
+    def read16(self, address: int) -> int:
+        memory = self.memory
+        return (memory[address & 0xFFFF] << 8) | memory[(address + 1) & 0xFFFF]
+
+    def write8(self, address: int, value: int) -> None:
+        self.memory[address & 0xFFFF] = value & 0xFF
+
+    def write16(self, address: int, value: int) -> None:
+        self.memory[address & 0xFFFF] = (value >> 8) & 0xFF
+        self.memory[(address + 1) & 0xFFFF] = value & 0xFF
+
+    def reset(self, pc: int, sp: int = 0x0244) -> None:
+        self.pc = pc & 0xFFFF
+        self.sp = sp & 0xFFFF
+        self.cc = 0xC0 | FLAG_I
+        self.halted = False
+
+    # -- execution -----------------------------------------------------
+
+    def step(self) -> int:
+        """Execute one instruction and return the cycles it took."""
+        pc = self.pc
+        entry = self._table[self.memory[pc]]
+        if entry is None:
+            raise SimulatorError(f"Illegal opcode ${self.memory[pc]:02X} at ${pc:04X}")
+        handler, size, cycles = entry
+        self.pc = (pc + size) & 0xFFFF
+        handler(self, pc)
+        self.cycles += cycles
+        self.instructions += 1
+        return cycles
+
+    def run(
+        self,
+        *,
+        max_cycles: Optional[int] = None,
+        breakpoints: Iterable[int] = (),
+        max_instructions: Optional[int] = None,
+    ) -> RunResult:
+        """Run until a breakpoint, a cycle or instruction budget, or a halt.
+
+        Breakpoints are checked before each instruction except the first, so
+        a run can be resumed from the breakpoint it stopped at.
+        """
+
+        cycle_limit = self.cycles + max_cycles if max_cycles is not None else None
+        instruction_limit = self.instructions + max_instructions if max_instructions is not None else None
+        stops = frozenset(address & 0xFFFF for address in breakpoints)
+        table = self._table
+        memory = self.memory
+        first = True
+        self.halted = False
+        while True:
+            pc = self.pc
+            if stops and not first and pc in stops:
+                return RunResult("breakpoint", pc, self.cycles, self.instructions)
+            if cycle_limit is not None and self.cycles >= cycle_limit:
+                return RunResult("cycles", pc, self.cycles, self.instructions)
+            if instruction_limit is not None and self.instructions >= instruction_limit:
+                return RunResult("instructions", pc, self.cycles, self.instructions)
+            first = False
+            entry = table[memory[pc]]
+            if entry is None:
+                return RunResult("illegal", pc, self.cycles, self.instructions)
+            handler, size, cycles = entry
+            self.pc = (pc + size) & 0xFFFF
+            handler(self, pc)
+            self.cycles += cycles
+            self.instructions += 1
+            if self.halted or self.pc == pc:
+                self.halted = True
+                return RunResult("halt", self.pc, self.cycles, self.instructions)
+
+    def call(
+        self,
+        address: int,
+        *,
+        max_cycles: Optional[int] = None,
+        breakpoints: Iterable[int] = (),
+    ) -> RunResult:
+        """Run the subroutine at `address` until it returns.
+
+        A sentinel return address is pushed and used as an extra breakpoint,
+        so the result reason is `"breakpoint"` with `pc == RETURN_SENTINEL`
+        once the routine executes its final RTS.
+        """
+
+        self.push16(RETURN_SENTINEL)
+        self.pc = address & 0xFFFF
+        return self.run(max_cycles=max_cycles, breakpoints=[*breakpoints, RETURN_SENTINEL])
+
+    # -- stack -----------------------------------------------------------
+
+    def push8(self, value: int) -> None:
+        self.memory[self.sp] = value & 0xFF
+        self.sp = (self.sp - 1) & 0xFFFF
+
+    def pull8(self) -> int:
+        self.sp = (self.sp + 1) & 0xFFFF
+        return self.memory[self.sp]
+
+    def push16(self, value: int) -> None:
+        self.push8(value)
+        self.push8(value >> 8)
+
+    def pull16(self) -> int:
+        high = self.pull8()
+        return (high << 8) | self.pull8()
+
+
+# -- flag helpers ---------------------------------------------------------
+
+
+def _nz8(value: int) -> int:
+    return (value & 0x80 and FLAG_N) | (0 if value & 0xFF else FLAG_Z)
+
+
+def _nz16(value: int) -> int:
+    return (value & 0x8000 and FLAG_N) | (0 if value & 0xFFFF else FLAG_Z)
+
+
+def _add8(cpu: MB8861, left: int, right: int, carry: int) -> int:
+    result = left + right + carry
+    flags = _nz8(result)
+    if result > 0xFF:
+        flags |= FLAG_C
+    if ~(left ^ right) & (left ^ result) & 0x80:
+        flags |= FLAG_V
+    if (left & 0x0F) + (right & 0x0F) + carry > 0x0F:
+        flags |= FLAG_H
+    cpu.cc = (cpu.cc & ~(FLAG_H | FLAG_N | FLAG_Z | FLAG_V | FLAG_C)) | flags
+    return result & 0xFF
+
+
+def _sub8(cpu: MB8861, left: int, right: int, borrow: int) -> int:
+    result = left - right - borrow
+    flags = _nz8(result)
+    if result < 0:
+        flags |= FLAG_C
+    if (left ^ right) & (left ^ result) & 0x80:
+        flags |= FLAG_V
+    cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V | FLAG_C)) | flags
+    return result & 0xFF
+
+
+def _logic8(cpu: MB8861, value: int) -> int:
+    cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V)) | _nz8(value)
+    return value
+
+
+def _logic16(cpu: MB8861, value: int) -> int:
+    cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V)) | _nz16(value)
+    return value
+
+
+def _shift_flags(cpu: MB8861, result: int, carry: int) -> int:
+    flags = _nz8(result) | carry
+    if bool(flags & FLAG_N) != bool(carry):
+        flags |= FLAG_V
+    cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V | FLAG_C)) | flags
+    return result
+
+
+def _rmw(cpu: MB8861, name: str, value: int) -> Optional[int]:
+    if name == "NEG":
+        result = (-value) & 0xFF
+        flags = _nz8(result) | (FLAG_C if result else 0) | (FLAG_V if result == 0x80 else 0)
+        cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V | FLAG_C)) | flags
+        return result
+    if name == "COM":
+        result = ~value & 0xFF
+        cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V)) | _nz8(result) | FLAG_C
+        return result
+    if name == "LSR":
+        return _shift_flags(cpu, value >> 1, value & 1)
+    if name == "ROR":
+        return _shift_flags(cpu, (value >> 1) | ((cpu.cc & FLAG_C) << 7), value & 1)
+    if name == "ASR":
+        return _shift_flags(cpu, (value >> 1) | (value & 0x80), value & 1)
+    if name == "ASL":
+        return _shift_flags(cpu, (value << 1) & 0xFF, value >> 7)
+    if name == "ROL":
+        return _shift_flags(cpu, ((value << 1) | (cpu.cc & FLAG_C)) & 0xFF, value >> 7)
+    if name == "DEC":
+        result = (value - 1) & 0xFF
+        cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V)) | _nz8(result) | (FLAG_V if value == 0x80 else 0)
+        return result
+    if name == "INC":
+        result = (value + 1) & 0xFF
+        cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V)) | _nz8(result) | (FLAG_V if value == 0x7F else 0)
+        return result
+    if name == "TST":
+        cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V | FLAG_C)) | _nz8(value)
+        return None
+    if name == "CLR":
+        cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_V | FLAG_C)) | FLAG_Z
+        return 0
+    raise SimulatorError(f"Unsupported read-modify-write operation {name}")
+
+
+# -- addressing -----------------------------------------------------------
+
+
+def _address_dir(cpu: MB8861, pc: int) -> int:
+    return cpu.memory[(pc + 1) & 0xFFFF]
+
+
+def _address_ext(cpu: MB8861, pc: int) -> int:
+    memory = cpu.memory
+    return (memory[(pc + 1) & 0xFFFF] << 8) | memory[(pc + 2) & 0xFFFF]
+
+
+def _address_idx(cpu: MB8861, pc: int) -> int:
+    return (cpu.x + cpu.memory[(pc + 1) & 0xFFFF]) & 0xFFFF
+
+
+_ADDRESSING: Dict[str, Callable[[MB8861, int], int]] = {
+    "DIR": _address_dir,
+    "EXT": _address_ext,
+    "IDX": _address_idx,
+}
+
+
+def _read8_operand(mode: str) -> Callable[[MB8861, int], int]:
+    if mode == "IMM":
+        return lambda cpu, pc: cpu.memory[(pc + 1) & 0xFFFF]
+    address = _ADDRESSING[mode]
+    return lambda cpu, pc: cpu.memory[address(cpu, pc)]
+
+
+def _read16_operand(mode: str) -> Callable[[MB8861, int], int]:
+    if mode == "IMM":
+        return _address_ext
+    address = _ADDRESSING[mode]
+    return lambda cpu, pc: cpu.read16(address(cpu, pc))
+
+
+# -- instruction families ---------------------------------------------------
+
+
+def _discard(_result: int) -> None:
+    """Compare and bit-test only update the flags."""
+    return None
+
+
+_ALU8_OPERATIONS: Dict[str, Callable[[MB8861, int, int], Optional[int]]] = {
+    "ADD": lambda cpu, left, right: _add8(cpu, left, right, 0),
+    "ADC": lambda cpu, left, right: _add8(cpu, left, right, cpu.cc & FLAG_C),
+    "SUB": lambda cpu, left, right: _sub8(cpu, left, right, 0),
+    "SBC": lambda cpu, left, right: _sub8(cpu, left, right, cpu.cc & FLAG_C),
+    "CMP": lambda cpu, left, right: _discard(_sub8(cpu, left, right, 0)),
+    "AND": lambda cpu, left, right: _logic8(cpu, left & right),
+    "BIT": lambda cpu, left, right: _discard(_logic8(cpu, left & right)),
+    "EOR": lambda cpu, left, right: _logic8(cpu, left ^ right),
+    "ORA": lambda cpu, left, right: _logic8(cpu, left | right),
+    "LDA": lambda cpu, left, right: _logic8(cpu, right),
+}
+
+
+def _make_alu8(operation: str, register: str, mode: str) -> Handler:
+    read = _read8_operand(mode)
+    apply = _ALU8_OPERATIONS[operation]
+    if register == "a":
+
+        def accumulator_a(cpu: MB8861, pc: int) -> None:
+            result = apply(cpu, cpu.a, read(cpu, pc))
+            if result is not None:
+                cpu.a = result
+
+        return accumulator_a
+
+    def accumulator_b(cpu: MB8861, pc: int) -> None:
+        result = apply(cpu, cpu.b, read(cpu, pc))
+        if result is not None:
+            cpu.b = result
+
+    return accumulator_b
+
+
+def _make_store8(register: str, mode: str) -> Handler:
+    address = _ADDRESSING[mode]
+
+    def handler(cpu: MB8861, pc: int) -> None:
+        value = getattr(cpu, register)
+        cpu.memory[address(cpu, pc)] = value
+        _logic8(cpu, value)
+
+    return handler
+
+
+def _make_alu16(mnemonic: str, mode: str) -> Handler:
+    read = _read16_operand(mode) if not (mnemonic == "ADX" and mode == "IMM") else _read8_operand(mode)
+
+    def handler(cpu: MB8861, pc: int) -> None:
+        value = read(cpu, pc)
+        if mnemonic == "LDX":
+            cpu.x = _logic16(cpu, value)
+        elif mnemonic == "LDS":
+            cpu.sp = _logic16(cpu, value)
+        elif mnemonic == "CPX":
+            result = cpu.x - value
+            flags = _nz16(result)
+            if (cpu.x ^ value) & (cpu.x ^ result) & 0x8000:
+                flags |= FLAG_V
+            cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V)) | flags
+        else:  # ADX
+            result = cpu.x + value
+            flags = _nz16(result) | (FLAG_C if result > 0xFFFF else 0)
+            if ~(cpu.x ^ value) & (cpu.x ^ result) & 0x8000:
+                flags |= FLAG_V
+            cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V | FLAG_C)) | flags
+            cpu.x = result & 0xFFFF
+
+    return handler
+
+
+def _make_store16(mnemonic: str, mode: str) -> Handler:
+    address = _ADDRESSING[mode]
+    register = "x" if mnemonic == "STX" else "sp"
+
+    def handler(cpu: MB8861, pc: int) -> None:
+        value = getattr(cpu, register)
+        cpu.write16(address(cpu, pc), value)
+        _logic16(cpu, value)
+
+    return handler
+
+
+def _make_rmw_memory(operation: str, mode: str) -> Handler:
+    address = _ADDRESSING[mode]
+
+    def handler(cpu: MB8861, pc: int) -> None:
+        target = address(cpu, pc)
+        result = _rmw(cpu, operation, cpu.memory[target])
+        if result is not None:
+            cpu.memory[target] = result
+
+    return handler
+
+
+def _make_rmw_register(operation: str, register: str) -> Handler:
+    def handler(cpu: MB8861, pc: int) -> None:
+        result = _rmw(cpu, operation, getattr(cpu, register))
+        if result is not None:
+            setattr(cpu, register, result)
+
+    return handler
+
+
+_BRANCH_CONDITIONS: Dict[str, Callable[[int], bool]] = {
+    "BRA": lambda cc: True,
+    "BHI": lambda cc: not cc & (FLAG_C | FLAG_Z),
+    "BLS": lambda cc: bool(cc & (FLAG_C | FLAG_Z)),
+    "BCC": lambda cc: not cc & FLAG_C,
+    "BCS": lambda cc: bool(cc & FLAG_C),
+    "BNE": lambda cc: not cc & FLAG_Z,
+    "BEQ": lambda cc: bool(cc & FLAG_Z),
+    "BVC": lambda cc: not cc & FLAG_V,
+    "BVS": lambda cc: bool(cc & FLAG_V),
+    "BPL": lambda cc: not cc & FLAG_N,
+    "BMI": lambda cc: bool(cc & FLAG_N),
+    "BGE": lambda cc: not _n_xor_v(cc),
+    "BLT": lambda cc: _n_xor_v(cc),
+    "BGT": lambda cc: not (cc & FLAG_Z or _n_xor_v(cc)),
+    "BLE": lambda cc: bool(cc & FLAG_Z or _n_xor_v(cc)),
+}
+
+
+def _n_xor_v(cc: int) -> bool:
+    return bool(cc & FLAG_N) != bool(cc & FLAG_V)
+
+
+def _relative_target(cpu: MB8861, pc: int) -> int:
+    offset = cpu.memory[(pc + 1) & 0xFFFF]
+    if offset & 0x80:
+        offset -= 0x100
+    return (pc + 2 + offset) & 0xFFFF
+
+
+def _make_branch(mnemonic: str) -> Handler:
+    if mnemonic == "BSR":
+
+        def branch_subroutine(cpu: MB8861, pc: int) -> None:
+            cpu.push16(cpu.pc)
+            cpu.pc = _relative_target(cpu, pc)
+
+        return branch_subroutine
+    condition = _BRANCH_CONDITIONS[mnemonic]
+
+    def handler(cpu: MB8861, pc: int) -> None:
+        if condition(cpu.cc):
+            cpu.pc = _relative_target(cpu, pc)
+
+    return handler
+
+
+def _make_jump(mnemonic: str, mode: str) -> Handler:
+    address = _ADDRESSING[mode]
+    if mnemonic == "JSR":
+
+        def jump_subroutine(cpu: MB8861, pc: int) -> None:
+            target = address(cpu, pc)
+            cpu.push16(cpu.pc)
+            cpu.pc = target
+
+        return jump_subroutine
+
+    def jump(cpu: MB8861, pc: int) -> None:
+        cpu.pc = address(cpu, pc)
+
+    return jump
+
+
+def _make_immediate_memory(mnemonic: str) -> Handler:
+    """NIM/OIM/XIM/TMM: `op #imm, disp,X` encoded as opcode, imm, disp."""
+
+    def handler(cpu: MB8861, pc: int) -> None:
+        memory = cpu.memory
+        mask = memory[(pc + 1) & 0xFFFF]
+        target = (cpu.x + memory[(pc + 2) & 0xFFFF]) & 0xFFFF
+        value = memory[target]
+        if mnemonic == "TMM":
+            if mask == 0 or value == 0:
+                flags = FLAG_Z
+            elif value == 0xFF:
+                flags = FLAG_V
+            else:
+                flags = FLAG_N
+            cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V)) | flags
+            return
+        if mnemonic == "NIM":
+            value &= mask
+        elif mnemonic == "OIM":
+            value |= mask
+        else:
+            value ^= mask
+        memory[target] = _logic8(cpu, value)
+
+    return handler
+
+
+def _inherent(mnemonic: str) -> Handler:
+    def set_flags(mask: int, value: int) -> Handler:
+        def handler(cpu: MB8861, pc: int) -> None:
+            cpu.cc = (cpu.cc & ~mask) | value
+
+        return handler
+
+    flag_ops = {
+        "CLC": (FLAG_C, 0), "SEC": (FLAG_C, FLAG_C),
+        "CLV": (FLAG_V, 0), "SEV": (FLAG_V, FLAG_V),
+        "CLI": (FLAG_I, 0), "SEI": (FLAG_I, FLAG_I),
+    }
+    if mnemonic in flag_ops:
+        return set_flags(*flag_ops[mnemonic])
+    if mnemonic == "NOP":
+        return lambda cpu, pc: None
+
+    def handler(cpu: MB8861, pc: int) -> None:
+        if mnemonic == "TAP":
+            cpu.cc = cpu.a | 0xC0
+        elif mnemonic == "TPA":
+            cpu.a = cpu.cc | 0xC0
+        elif mnemonic == "INX":
+            cpu.x = (cpu.x + 1) & 0xFFFF
+            cpu.cc = (cpu.cc & ~FLAG_Z) | (0 if cpu.x else FLAG_Z)
+        elif mnemonic == "DEX":
+            cpu.x = (cpu.x - 1) & 0xFFFF
+            cpu.cc = (cpu.cc & ~FLAG_Z) | (0 if cpu.x else FLAG_Z)
+        elif mnemonic == "INS":
+            cpu.sp = (cpu.sp + 1) & 0xFFFF
+        elif mnemonic == "DES":
+            cpu.sp = (cpu.sp - 1) & 0xFFFF
+        elif mnemonic == "TSX":
+            cpu.x = (cpu.sp + 1) & 0xFFFF
+        elif mnemonic == "TXS":
+            cpu.sp = (cpu.x - 1) & 0xFFFF
+        elif mnemonic == "SBA":
+            cpu.a = _sub8(cpu, cpu.a, cpu.b, 0)
+        elif mnemonic == "CBA":
+            _sub8(cpu, cpu.a, cpu.b, 0)
+        elif mnemonic == "ABA":
+            cpu.a = _add8(cpu, cpu.a, cpu.b, 0)
+        elif mnemonic == "TAB":
+            cpu.b = _logic8(cpu, cpu.a)
+        elif mnemonic == "TBA":
+            cpu.a = _logic8(cpu, cpu.b)
+        elif mnemonic == "DAA":
+            _decimal_adjust(cpu)
+        elif mnemonic == "PSHA":
+            cpu.push8(cpu.a)
+        elif mnemonic == "PSHB":
+            cpu.push8(cpu.b)
+        elif mnemonic == "PULA":
+            cpu.a = cpu.pull8()
+        elif mnemonic == "PULB":
+            cpu.b = cpu.pull8()
+        elif mnemonic == "RTS":
+            cpu.pc = cpu.pull16()
+        elif mnemonic == "RTI":
+            cpu.cc = cpu.pull8() | 0xC0
+            cpu.b = cpu.pull8()
+            cpu.a = cpu.pull8()
+            cpu.x = cpu.pull16()
+            cpu.pc = cpu.pull16()
+        elif mnemonic in ("SWI", "WAI"):
+            cpu.push16(cpu.pc)
+            cpu.push16(cpu.x)
+            cpu.push8(cpu.a)
+            cpu.push8(cpu.b)
+            cpu.push8(cpu.cc)
+            if mnemonic == "SWI":
+                cpu.cc |= FLAG_I
+                cpu.pc = cpu.read16(SWI_VECTOR)
+            else:
+                cpu.halted = True
+        else:
+            raise SimulatorError(f"Unsupported inherent instruction {mnemonic}")
+
+    return handler
+
+
+def _decimal_adjust(cpu: MB8861) -> None:
+    value = cpu.a
+    correction = 0
+    carry = cpu.cc & FLAG_C
+    if cpu.cc & FLAG_H or (value & 0x0F) > 9:
+        correction |= 0x06
+    high = value >> 4
+    if carry or high > 9 or (high > 8 and (value & 0x0F) > 9):
+        correction |= 0x60
+    result = value + correction
+    flags = _nz8(result) | (FLAG_C if carry or result > 0xFF else 0)
+    cpu.cc = (cpu.cc & ~(FLAG_N | FLAG_Z | FLAG_V | FLAG_C)) | flags
+    cpu.a = result & 0xFF
+
+
+def _family(mnemonic: str) -> Tuple[str, Optional[str]]:
+    """Split `LDAA` into (`LDA`, `a`); register-less names return `None`."""
+    if mnemonic[:-1] in _ALU8 and mnemonic[-1] in "AB":
+        return mnemonic[:-1], mnemonic[-1].lower()
+    if mnemonic in ("STAA", "STAB"):
+        return "STA", mnemonic[-1].lower()
+    if mnemonic[:-1] in _RMW and mnemonic[-1] in "AB":
+        return mnemonic[:-1], mnemonic[-1].lower()
+    return mnemonic, None
+
+
+def cycles_for(mnemonic: str, mode: str) -> int:
+    """Base cycle count of `mnemonic` in addressing `mode` (e.g. `"LDAA"`, `"IMM"`)."""
+    cycles = _CYCLES.get((mnemonic.upper(), mode.upper()))
+    if cycles is None:
+        raise SimulatorError(f"No cycle count for {mnemonic} {mode}")
+    return cycles
+
+
+def _handler_for(mnemonic: str, mode: str) -> Handler:
+    family, register = _family(mnemonic)
+    if mode == "REL":
+        return _make_branch(mnemonic)
+    if mnemonic in ("JMP", "JSR"):
+        return _make_jump(mnemonic, mode)
+    if mnemonic in ("NIM", "OIM", "XIM", "TMM"):
+        return _make_immediate_memory(mnemonic)
+    if family in _ALU8 and register:
+        return _make_alu8(family, register, mode)
+    if family == "STA":
+        return _make_store8(register or "a", mode)
+    if mnemonic in ("LDX", "LDS", "CPX", "ADX"):
+        return _make_alu16(mnemonic, mode)
+    if mnemonic in ("STX", "STS"):
+        return _make_store16(mnemonic, mode)
+    if family in _RMW:
+        if register:
+            return _make_rmw_register(family, register)
+        return _make_rmw_memory(family, mode)
+    if mode == "INH":
+        return _inherent(mnemonic)
+    raise SimulatorError(f"Unsupported instruction {mnemonic} {mode}")
+
+
+def _build_dispatch() -> List[Optional[Tuple[Handler, int, int]]]:
+    table: List[Optional[Tuple[Handler, int, int]]] = [None] * 256
+    for item in opcodes_mb8861h.OPCODES:
+        mnemonic = item["mnemonic"]
+        mode = item["addressing"]
+        table[item["opcode"]] = (_handler_for(mnemonic, mode), item["size"], item["cycles"])
+    return table
+
+
+_CYCLES = {(item["mnemonic"], item["addressing"]): item["cycles"] for item in opcodes_mb8861h.OPCODES}
+
+
+_DISPATCH = _build_dispatch()
@@ -0,0 +1,22 @@
+"""Load `.prg` containers into a simulated JR-100 memory."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Union
+
+from ..link.pack_prg import PrgImage, unpack_prg
+from .cpu import MB8861
+
+# Stack pointer used by the BASIC `USR` entry of the JR-100 monitor.
+DEFAULT_STACK = 0x0244
+
+
+def load_prg(cpu: MB8861, source: Union[str, Path, bytes], *, stack_pointer: int = DEFAULT_STACK) -> PrgImage:
+    """Copy every PBIN segment into memory and reset the CPU at the entry point."""
+
+    payload = source if isinstance(source, (bytes, bytearray)) else Path(source).read_bytes()
+    image = unpack_prg(payload)
+    for address, data in image.segments:
+        cpu.load(address, data)
+    cpu.reset(image.entry_point, stack_pointer)
+    return image
@@ -0,0 +1,255 @@
+"""Cycle-level profiling of simulated programs.
+
+`profile_run` executes instructions one by one, charging every cycle to the
+address of the instruction and to the current call stack.  The helpers below
+fold those counts back to source lines (through the assembler's
+`LineEmission` records) and to routine labels (through `.map` symbols).
+"""
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, TextIO, Tuple
+
+from ..asm import opcodes_mb8861h
+from ..asm.encoder import AssemblyResult
+from .cpu import MB8861, RETURN_SENTINEL, RunResult, SimulatorError
+
+_CALL_OPCODES = frozenset({0x8D, 0xAD, 0xBD, 0x3F})  # BSR, JSR ,X, JSR ext, SWI
+_RETURN_OPCODES = frozenset({0x39, 0x3B})  # RTS, RTI
+
+# Opcodes that read or write a DIR/EXT data operand -> (operand size, cycles).
+_DATA_OPERANDS: Dict[int, Tuple[int, int]] = {
+    spec['opcode']: (spec['size'] - 1, spec['cycles'])
+    for spec in opcodes_mb8861h.OPCODES
+    if spec['addressing'] in ('DIR', 'EXT') and spec['mnemonic'] not in ('JMP', 'JSR')
+}
+
+
+@dataclass
+class Profile:
+    # Cycles charged to the first byte of each executed instruction.
+    cycles: List[int] = field(default_factory=lambda: [0] * 0x10000)
+    # (entry addresses of the active calls, pc) -> cycles.
+    stacks: Dict[Tuple[Tuple[int, ...], int], int] = field(default_factory=lambda: defaultdict(int))
+    total: int = 0
+    instructions: int = 0
+
+
+@dataclass(frozen=True)
+class SourceLine:
+    file: str
+    line: int
+    text: str
+
+
+def profile_run(
+    cpu: MB8861,
+    *,
+    max_cycles: Optional[int] = None,
+    breakpoints: Iterable[int] = (),
+    profile: Optional[Profile] = None,
+    root: Optional[int] = None,
+) -> Tuple[RunResult, Profile]:
+    """Like `MB8861.run`, but record where every cycle was spent.
+
+    `root` names the routine at the bottom of the recorded call stack
+    (defaults to the current pc).  Pass the same `profile` to accumulate
+    several runs, e.g. a setup call followed by the routine of interest.
+    """
+
+    profile = profile if profile is not None else Profile()
+    cycle_limit = cpu.cycles + max_cycles if max_cycles is not None else None
+    stops = frozenset(address & 0xFFFF for address in breakpoints)
+    memory = cpu.memory
+    counts = profile.cycles
+    stacks = profile.stacks
+    frames: Tuple[int, ...] = (cpu.pc if root is None else root,)
+    first = True
+    cpu.halted = False
+    while True:
+        pc = cpu.pc
+        if stops and not first and pc in stops:
+            return RunResult("breakpoint", pc, cpu.cycles, cpu.instructions), profile
+        if cycle_limit is not None and cpu.cycles >= cycle_limit:
+            return RunResult("cycles", pc, cpu.cycles, cpu.instructions), profile
+        first = False
+        opcode = memory[pc]
+        try:
+            cycles = cpu.step()
+        except SimulatorError:
+            return RunResult("illegal", pc, cpu.cycles, cpu.instructions), profile
+        counts[pc] += cycles
+        stacks[(frames, pc)] += cycles
+        profile.total += cycles
+        profile.instructions += 1
+        if opcode in _CALL_OPCODES:
+            frames = frames + (cpu.pc,)
+        elif opcode in _RETURN_OPCODES and len(frames) > 1:
+            frames = frames[:-1]
+        if cpu.halted or cpu.pc == pc:
+            cpu.halted = True
+            return RunResult("halt", cpu.pc, cpu.cycles, cpu.instructions), profile
+
+
+def profile_call(
+    cpu: MB8861,
+    address: int,
+    *,
+    max_cycles: Optional[int] = None,
+    profile: Optional[Profile] = None,
+) -> Tuple[RunResult, Profile]:
+    """Profile the subroutine at `address` until it returns (see `MB8861.call`)."""
+
+    cpu.push16(RETURN_SENTINEL)
+    cpu.pc = address & 0xFFFF
+    return profile_run(cpu, max_cycles=max_cycles, breakpoints=[RETURN_SENTINEL], profile=profile)
+
+
+def read_map(path: Path) -> Dict[str, int]:
+    """Parse the `NAME = $XXXX` lines written by `assemble --map` / `link --map`."""
+
+    symbols: Dict[str, int] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        name, sep, value = line.partition("=")
+        value = value.strip()
+        if sep and value.startswith("$"):
+            symbols[name.strip()] = int(value[1:].split()[0], 16)
+    return symbols
+
+
+class RoutineIndex:
+    """Resolve an address to the closest symbol at or below it."""
+
+    def __init__(self, symbols: Mapping[str, int], ranges: Sequence[Tuple[int, int]] = ()) -> None:
+        # Only symbols inside the loaded image name routines; .equ constants
+        # such as I/O ports or work areas would otherwise shadow code labels.
+        inside = [
+            (address, name)
+            for name, address in symbols.items()
+            if not ranges or any(start <= address < end for start, end in ranges)
+        ]
+        inside.sort()
+        self._addresses = [address for address, _ in inside]
+        self._names = [name for _, name in inside]
+
+    def name(self, address: int) -> str:
+        index = bisect.bisect_right(self._addresses, address) - 1
+        if index < 0:
+            return f"${address:04X}"
+        return self._names[index]
+
+
+def source_lines(units: Iterable[AssemblyResult], symbols: Mapping[str, int]) -> Dict[int, SourceLine]:
+    """Map instruction addresses of each assembled unit to their source line.
+
+    Addresses are shifted by the distance between each label's assembled
+    value and its value in `symbols`, so units moved by the linker still
+    line up with the final image.
+    """
+
+    table: Dict[int, SourceLine] = {}
+    for result in units:
+        delta = 0
+        for emission in result.emissions:
+            if emission.address is None:
+                continue
+            label = emission.line.label
+            if label is not None and label in symbols and label in result.symbols:
+                delta = symbols[label] - result.symbols[label]
+            if emission.cycles is None:
+                continue
+            filename, line_no = result.source_location(emission.line.line_no)
+            table[(emission.address + delta) & 0xFFFF] = SourceLine(
+                file=_display_path(filename),
+                line=line_no,
+                text=emission.line.text.strip(),
+            )
+    return table
+
+
+def _display_path(filename: str) -> str:
+    try:
+        return str(Path(filename).resolve().relative_to(Path.cwd()))
+    except ValueError:
+        return filename
+
+
+def write_report(
+    stream: TextIO,
+    profile: Profile,
+    routines: RoutineIndex,
+    lines: Mapping[int, SourceLine],
+    *,
+    clock_hz: int,
+    limit: Optional[int] = None,
+) -> None:
+    """Write per-routine and per-line tables, hottest first."""
+
+    total = profile.total or 1
+    by_routine: Dict[str, int] = defaultdict(int)
+    hot: List[Tuple[int, int]] = []
+    for address, cycles in enumerate(profile.cycles):
+        if cycles:
+            by_routine[routines.name(address)] += cycles
+            hot.append((cycles, address))
+    hot.sort(key=lambda item: (-item[0], item[1]))
+
+    millis = profile.total * 1000 / clock_hz
+    stream.write(f"total {profile.total} cycles ({millis:.1f} ms @ {clock_hz} Hz), {profile.instructions} instructions\n")
+    stream.write("\n   cycles      %  routine\n")
+    ranked = sorted(by_routine.items(), key=lambda item: (-item[1], item[0]))
+    for name, cycles in ranked[:limit]:
+        stream.write(f"{cycles:>9} {cycles * 100 / total:>6.2f}  {name}\n")
+    stream.write("\n   cycles      %  addr   location                 routine / source\n")
+    for cycles, address in hot[:limit]:
+        line = lines.get(address)
+        location = f"{line.file}:{line.line}" if line else "?"
+        text = line.text if line else ""
+        stream.write(
+            f"{cycles:>9} {cycles * 100 / total:>6.2f}  ${address:04X}  {location:<24} {routines.name(address)}: {text}\n"
+        )
+
+
+def write_collapsed(stream: TextIO, profile: Profile, routines: RoutineIndex) -> None:
+    """Write `frame;frame;leaf cycles` lines for flamegraph.pl / speedscope."""
+
+    folded: Dict[str, int] = defaultdict(int)
+    for (frames, pc), cycles in profile.stacks.items():
+        names = [routines.name(address) for address in frames]
+        leaf = routines.name(pc)
+        if leaf != names[-1]:
+            names.append(leaf)
+        folded[";".join(names)] += cycles
+    for stack in sorted(folded):
+        stream.write(f"{stack} {folded[stack]}\n")
+
+
+def variable_accesses(profile: Profile, memory: Sequence[int], variables: RoutineIndex) -> Dict[str, int]:
+    """Count executed DIR/EXT data accesses per variable (the closest symbol at or below).
+
+    Executions are recovered from the cycles charged to each instruction,
+    which are fixed for these addressing modes.
+    """
+
+    counts: Dict[str, int] = defaultdict(int)
+    for pc, cycles in enumerate(profile.cycles):
+        operand = _DATA_OPERANDS.get(memory[pc]) if cycles else None
+        if operand is None:
+            continue
+        size, per_run = operand
+        if size == 1:
+            address = memory[(pc + 1) & 0xFFFF]
+        else:
+            address = (memory[(pc + 1) & 0xFFFF] << 8) | memory[(pc + 2) & 0xFFFF]
+        counts[variables.name(address)] += cycles // per_run
+    return dict(counts)
+
+
+def write_access_counts(stream: TextIO, counts: Mapping[str, int]) -> None:
+    """Write `NAME COUNT` lines, most accessed first (`link --zp-hints` input)."""
+
+    for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+        stream.write(f"{name} {count}\n")
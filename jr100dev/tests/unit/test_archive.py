@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from jr100dev.cli.main import run_ar, run_assemble, run_link
+from jr100dev.link import ObjectFormatError, link_objects, load_archive, load_object
+
+
+def _assemble(tmp_path, name, source):
+    src = tmp_path / f"{name}.asm"
+    src.write_text(source)
+    obj = tmp_path / f"{name}.obj"
+    args = SimpleNamespace(
+        source=src,
+        output=tmp_path / f"{name}.prg",
+        bin=None,
+        obj=obj,
+        map=None,
+        lst=None,
+        entry=None,
+        name=None,
+        comment=None,
+        no_cache=True,
+    )
+    assert run_assemble(args) == 0
+    return obj
+
+
+def _library(tmp_path):
+    members = [
+        _assemble(tmp_path, "putc", "        .org $0400\nPUTC:   JSR HEXOUT\n        RTS\n"),
+        _assemble(tmp_path, "hexout", "        .org $0410\nHEXOUT: RTS\n"),
+        _assemble(tmp_path, "unused", "        .org $0420\nUNUSED: RTS\n"),
+    ]
+    lib = tmp_path / "std.lib"
+    assert run_ar(SimpleNamespace(archive=lib, objects=members, list=False)) == 0
+    return lib
+
+
+def test_archive_index_lists_member_symbols(tmp_path):
+    archive = load_archive(_library(tmp_path))
+    assert [member.name for member in archive.members] == ["putc.obj", "hexout.obj", "unused.obj"]
+    assert archive.symbols == {"PUTC": 0, "HEXOUT": 1, "UNUSED": 2}
+
+
+def test_link_extracts_only_referenced_members(tmp_path):
+    lib = load_archive(_library(tmp_path))
+    main = _assemble(tmp_path, "main", "        .org $0300\nSTART:  JSR PUTC\n        RTS\n")
+    result = link_objects([load_object(main)], libraries=[lib])
+    assert result.members == ["std.lib(putc.obj)", "std.lib(hexout.obj)"]
+    assert "UNUSED" not in result.symbols
+    assert result.entry_point == 0x0300
+    assert result.image[1:3] == bytes([0x04, 0x00])
+    assert result.image[0x0401 - 0x0300 : 0x0403 - 0x0300] == bytes([0x04, 0x10])
+
+
+def test_cli_link_accepts_archives(tmp_path):
+    lib = _library(tmp_path)
+    main = _assemble(tmp_path, "main", "        .org $0300\nSTART:  JSR HEXOUT\n        RTS\n")
+    args = SimpleNamespace(
+        objects=[main, lib],
+        output=tmp_path / "out.prg",
+        bin=None,
+        map=tmp_path / "out.map",
+        entry=None,
+        name=None,
+        comment=None,
+    )
+    assert run_link(args) == 0
+    assert "HEXOUT = $0410" in (tmp_path / "out.map").read_text()
+    assert "PUTC" not in (tmp_path / "out.map").read_text()
+
+
+def test_corrupt_archive_rejected(tmp_path):
+    path = tmp_path / "broken.lib"
+    path.write_bytes(b"JRAR\x01\x00")
+    with pytest.raises(ObjectFormatError):
+        load_archive(path)
@@ -1,8 +1,13 @@
 import json
 from types import SimpleNamespace
 
-from jr100dev.asm.encoder import Assembler
+import pytest
+
+from jr100dev.asm.encoder import AssemblyError, Assembler
+from jr100dev.asm.eval import compile_expression
+from jr100dev.asm.parser import parse_source
 from jr100dev.cli.main import run_assemble
+from jr100dev.link import unpack_prg
 
 
 def assemble(source: str):
@@ -186,3 +191,240 @@ START:  LDAA #$42
     assert data["sections"][0]["content"].startswith("86")
     assert (tmp_path / "prog.bin").exists()
     assert args.output.exists()
+
+
+def test_forward_direct_operand_shifts_later_labels():
+    source = """
+        .org $0300
+        LDAA FWD
+LOOP:   NOP
+        JMP LOOP
+FWD:    .equ $10
+    """
+    result = assemble(source)
+    assert result.machine_code == bytes([0x96, 0x10, 0x01, 0x7E, 0x03, 0x02])
+    assert result.symbols["LOOP"] == 0x0302
+
+
+def test_relaxation_realigns_and_updates_dependent_equ():
+    source = """
+        .org $0300
+        LDAA ZP
+        .align 4
+TABLE:  .byte 1
+AFTER:  .equ TABLE + 1
+        LDAA AFTER
+ZP:     .equ $20
+    """
+    result = assemble(source)
+    assert result.symbols["TABLE"] == 0x0304
+    assert result.symbols["AFTER"] == 0x0305
+    assert result.machine_code == bytes([0x96, 0x20, 0x00, 0x00, 0x01, 0xB6, 0x03, 0x05])
+
+
+def test_long_branches_widen_only_out_of_range_branches():
+    source = """
+        .org $0300
+START:  BEQ FAR
+        BRA NEAR
+NEAR:   BSR FAR
+        .fill 200
+FAR:    RTS
+    """
+    with pytest.raises(AssemblyError, match="--long-branches"):
+        assemble(source)
+    result = Assembler(source, filename="test.asm", long_branches=True).assemble()
+    assert result.symbols["FAR"] == 0x03D2
+    assert result.machine_code[:10] == bytes([0x26, 0x03, 0x7E, 0x03, 0xD2, 0x20, 0x00, 0xBD, 0x03, 0xD2])
+
+
+def test_long_branch_shrinks_back_when_direct_operand_shrinks():
+    # LDAA ZP is EXT until ZP resolves, so BNE first widens, then fits again.
+    source = """
+        .org $0300
+LOOP:   BNE DONE
+        LDAA ZP
+        .fill 125
+DONE:   BRA LOOP
+ZP:     .equ $20
+    """
+    result = Assembler(source, filename="test.asm", long_branches=True).assemble()
+    assert result.symbols["DONE"] == 0x0381
+    assert result.machine_code[:4] == bytes([0x26, 0x7F, 0x96, 0x20])
+    assert result.machine_code[-3:] == bytes([0x7E, 0x03, 0x00])
+
+
+def test_listing_shows_cycles_and_routine_totals(tmp_path):
+    src = tmp_path / "prog.asm"
+    src.write_text(
+        """
+        .org $0300
+START:  LDX #$C100
+LOOP:   STAA ,X
+        INX
+        CPX #$C400
+        BNE LOOP
+        RTS
+MSG:    .byte 1, 2
+        """
+    )
+    (tmp_path / "jr100.toml").write_text("[cpu]\nclock_hz = 1000000\n", encoding="utf-8")
+    lst_path = tmp_path / "prog.lst"
+    args = SimpleNamespace(
+        source=src,
+        output=tmp_path / "prog.prg",
+        bin=None,
+        obj=None,
+        map=None,
+        lst=lst_path,
+        entry=None,
+        name=None,
+        comment=None,
+        no_cache=True,
+    )
+    assert run_assemble(args) == 0
+    rows = lst_path.read_text().splitlines()
+    assert rows[1].startswith("0003 0300  CE C1 00      3  START:")
+    assert "---- START: 3 cycles (3.0 us)" in rows[2]
+    assert "---- LOOP: 22 cycles (22.0 us)" in rows[8]
+    assert "MSG" in rows[-1]
+
+
+def test_parser_tokenizes_each_line_once_into_typed_operands():
+    lines = parse_source('LOOP: LDAA <COUNT+1 ; c\n  STX 2,x\t\n  .byte "a,b;c", \',\', <$1234\n  LDAB #\'A\'\n')
+
+    load, store, data, immediate = lines
+    assert (load.label, load.op, load.operands[0].hint, load.operands[0].text) == ("LOOP", "LDAA", "DIR", "COUNT+1")
+    assert [operand.is_index_register for operand in store.operands] == [False, True]
+    # Strings and chars keep their commas and semicolons; directives take no hint.
+    assert [operand.text for operand in data.operands] == ['"a,b;c"', "','", "<$1234"]
+    assert data.operands[0].is_string and data.operands[2].hint is None
+    assert immediate.operands[0].immediate and immediate.operands[0].expression == "'A'"
+
+    # The evaluator consumes the parser's tokens as they are.
+    compiled = compile_expression(load.operands[0].expression, "t:1", load.operands[0].tokens)
+    assert compiled.symbols == {"COUNT"}
+    assert assemble("  .org $0300\n  .byte <$1234, \",\"\n").machine_code == bytes([0x34, 0x2C])
+
+
+def test_semicolons_and_colons_inside_literals_survive_preprocessing():
+    result = assemble(
+        """
+        .org $0300
+        .byte "a;b",1
+        LDAA #';' ; load a semicolon
+        .byte ":", 2 ; c:d
+MACRO TAG V
+        .ascii "\\V;:" ; keep \\V
+ENDM
+        TAG 7
+    """
+    )
+    assert result.machine_code == b"a;b\x01" + bytes([0x86, 0x3B]) + b":\x02" + b"7;:"
+    with pytest.raises(AssemblyError, match="Unterminated string"):
+        assemble('        .org $0300\n        .byte "a;b\n')
+
+
+def test_intermediate_state_is_slotted_with_byte_payloads():
+    result = Assembler("  .org $0300\nSTART: LDAA #1\n\n  .byte 2, 3\n  RTS\n", filename="t.asm").assemble()
+
+    payloads = [emission.data for emission in result.emissions if emission.data]
+    assert payloads == [b"\x86\x01", b"\x02", b"\x03", b"\x39"]
+    assert isinstance(result.sections[0].data, bytes)
+    emission = result.emissions[1]
+    assert not hasattr(emission, "__dict__") and not hasattr(emission.line, "__dict__")
+    # Origins are stored as arrays but still read back as (file, line) pairs.
+    assert list(result.line_origins) == [("t.asm", line) for line in range(1, 6)]
+    assert result.source_location(4) == ("t.asm", 4)
+
+
+def test_second_pass_writes_interleaved_sections_into_one_image():
+    source = """
+        .org $0300
+        LDAA #1
+        .data
+TABLE:  .byte $AA
+        .word $1234
+        .code
+        LDX #TABLE
+        .bss
+BUF:    .res 2
+        .code
+        BNE FAR
+        .fill 3, $EE
+        .align 4
+        .res 200
+FAR:    RTS
+    """
+    result = Assembler(source, filename="t.asm", long_branches=True).assemble()
+
+    sections = {section.kind: section for section in result.sections}
+    # The data bytes inside the text range read as zero in the text section.
+    assert sections["text"].data[:8] == bytes([0x86, 0x01, 0, 0, 0, 0xCE, 0x03, 0x02])
+    assert sections["data"].data == bytes([0xAA, 0x12, 0x34])
+    # BSS reserves a gap in the image; the long branch is BEQ *+5 / JMP FAR.
+    assert result.machine_code[5:15] == bytes([0xCE, 0x03, 0x02, 0, 0, 0x27, 0x03, 0x7E, 0x03, 0xDC])
+    assert result.machine_code[15:19] == bytes([0xEE, 0xEE, 0xEE, 0])
+    assert result.machine_code[-1] == 0x39 and len(result.machine_code) == 0xDD
+
+
+def test_multiple_org_regions_become_sparse_extents(tmp_path):
+    source = """
+        .org $2000
+START:  LDAA LATER
+        LDX #TABLE
+        JSR SUB
+        RTS
+        .org $0600
+        .data
+TABLE:  .byte 1, 2
+        .word START
+        .code
+        .org $2100
+SUB:    LDAA TABLE
+        RTS
+LATER:  .equ $10
+    """
+    result = assemble(source)
+    # LDAA LATER shrinks to DIR without moving the regions behind it.
+    assert result.symbols["SUB"] == 0x2100 and result.symbols["TABLE"] == 0x0600
+    assert (result.origin, result.entry_point) == (0x0600, 0x2000)
+    assert result.extents == [
+        (0x0600, bytes([1, 2, 0x20, 0x00])),
+        (0x2000, bytes([0x96, 0x10, 0xCE, 0x06, 0x00, 0xBD, 0x21, 0x00, 0x39])),
+        (0x2100, bytes([0xB6, 0x06, 0x00, 0x39])),
+    ]
+    assert [(section.name, section.address) for section in result.sections] == [
+        ("text", 0x2000),
+        ("text@2100", 0x2100),
+        ("data", 0x0600),
+    ]
+
+    relocated = assemble(source.replace("SUB:    LDAA TABLE", "SUB:    JSR PUTS"))
+    assert [(reloc.section, reloc.offset) for reloc in relocated.relocations] == [("text@2100", 0x2101)]
+
+    src = tmp_path / "prog.asm"
+    src.write_text(source)
+    args = SimpleNamespace(
+        source=src,
+        output=tmp_path / "prog.prg",
+        bin=None,
+        obj=None,
+        map=None,
+        lst=None,
+        entry=None,
+        name=None,
+        comment=None,
+        no_cache=True,
+    )
+    assert run_assemble(args) == 0
+    prg = unpack_prg(args.output.read_bytes())
+    assert prg.segments == result.extents and prg.entry_point == 0x2000
+    image = (tmp_path / "prog.bin").read_bytes()
+    assert len(image) == 0x2104 - 0x0600 and image == result.machine_code
+    assert image[0x2000 - 0x0600 :].startswith(result.extents[1][1])
+
+    with pytest.raises(AssemblyError, match=r"\.org region at \$0302 overlaps \$0300-\$0303"):
+        assemble("        .org $0300\n        .byte 1, 2, 3, 4\n        .org $0302\n        .byte 5\n")
+    with pytest.raises(AssemblyError, match="must not depend on labels"):
+        assemble("        .org $0300\nHERE:   NOP\n        .org HERE+$100\n        NOP\n")
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from jr100dev.cli.main import run_build
+from jr100dev.proj import BuildConfigError, build_project, load_build_config
+
+
+def _write_project(root):
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.asm").write_text(
+        """
+        .org $0300
+MAIN:   JSR HELPER
+        RTS
+        """,
+        encoding="utf-8",
+    )
+    (root / "src" / "helper.asm").write_text(
+        """
+        .org $0320
+HELPER: LDAA #$2A
+        STAA BUF
+        RTS
+        .bss
+BUF:    .res 2
+        """,
+        encoding="utf-8",
+    )
+    (root / "jr100.toml").write_text(
+        """
+[build]
+sources = ["src/main.asm", "src/helper.asm"]
+output = "build/game.prg"
+map = "build/game.map"
+bss_base = "$4000"
+        """,
+        encoding="utf-8",
+    )
+
+
+def test_load_build_config_resolves_paths(tmp_path):
+    _write_project(tmp_path)
+    config = load_build_config(tmp_path)
+    assert config.sources == [tmp_path / "src" / "main.asm", tmp_path / "src" / "helper.asm"]
+    assert config.output == tmp_path / "build" / "game.prg"
+    assert config.bss_base == 0x4000
+    assert config.text_base is None
+
+
+def test_build_project_links_in_memory(tmp_path):
+    _write_project(tmp_path)
+    built = build_project(load_build_config(tmp_path), jobs=2, use_cache=False)
+    image = built.link.image
+    assert built.link.symbols["HELPER"] == 0x0320
+    assert built.link.symbols["BUF"] == 0x4000
+    assert image[0:3] == bytes([0xBD, 0x03, 0x20])
+    assert set(built.units) == set(built.config.sources)
+
+
+def test_cli_build_writes_outputs_and_uses_cache(tmp_path, capsys):
+    _write_project(tmp_path)
+    args = SimpleNamespace(project=tmp_path, jobs=1, no_cache=False)
+    assert run_build(args) == 0
+    assert (tmp_path / "build" / "game.prg").exists()
+    assert (tmp_path / "build" / "game.bin").exists()
+    assert "HELPER = $0320" in (tmp_path / "build" / "game.map").read_text()
+    assert run_build(args) == 0
+    assert "(2 cached)" in capsys.readouterr().out
+
+
+def test_cli_build_reports_unwritable_output(tmp_path, capsys):
+    _write_project(tmp_path)
+    (tmp_path / "blocker").write_text("", encoding="utf-8")
+    toml = (tmp_path / "jr100.toml").read_text(encoding="utf-8")
+    (tmp_path / "jr100.toml").write_text(toml.replace("build/game", "blocker/game"), encoding="utf-8")
+    args = SimpleNamespace(project=tmp_path, jobs=1, no_cache=True)
+    assert run_build(args) == 1
+    assert capsys.readouterr().err.startswith("Failed to write outputs: ")
+
+
+def test_missing_build_table_is_reported(tmp_path):
+    (tmp_path / "jr100.toml").write_text("[cpu]\nclock_hz = 894000\n", encoding="utf-8")
+    with pytest.raises(BuildConfigError):
+        load_build_config(tmp_path)
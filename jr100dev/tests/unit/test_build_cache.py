@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+from jr100dev.asm.cache import BuildCache
+from jr100dev.asm.encoder import Assembler
+from jr100dev.cli import main as cli
+
+
+def _args(tmp_path, src, **overrides):
+    values = dict(
+        source=src,
+        output=tmp_path / "build" / "prog.prg",
+        bin=None,
+        obj=tmp_path / "build" / "prog.json",
+        map=tmp_path / "build" / "prog.map",
+        lst=tmp_path / "build" / "prog.lst",
+        entry=None,
+        name=None,
+        comment=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _write_project(tmp_path):
+    (tmp_path / "defs.inc").write_text("VALUE: .equ $42\n", encoding="utf-8")
+    src = tmp_path / "prog.asm"
+    src.write_text(
+        """
+        .org $0300
+        .include "defs.inc"
+START:  LDAA #VALUE
+        RTS
+        """,
+        encoding="utf-8",
+    )
+    return src
+
+
+def test_cache_hit_skips_assembler(tmp_path, monkeypatch):
+    src = _write_project(tmp_path)
+    assert cli.run_assemble(_args(tmp_path, src)) == 0
+    first_prg = (tmp_path / "build" / "prog.prg").read_bytes()
+    assert any((tmp_path / "build" / ".cache").iterdir())
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("Assembler should not run on a cache hit")
+
+    monkeypatch.setattr(cli, "Assembler", _fail)
+    (tmp_path / "build" / "prog.prg").unlink()
+    assert cli.run_assemble(_args(tmp_path, src)) == 0
+    assert (tmp_path / "build" / "prog.prg").read_bytes() == first_prg
+    assert (tmp_path / "build" / "prog.lst").exists()
+
+    # Output-only options are applied to the cached result.
+    assert cli.run_assemble(_args(tmp_path, src, name="renamed", comment="hi", entry=0x0302)) == 0
+    renamed = (tmp_path / "build" / "prog.prg").read_bytes()
+    assert b"RENAMED" in renamed and b"entry=$0302" in renamed and b"hi" in renamed
+
+
+def test_include_change_invalidates_cache(tmp_path):
+    src = _write_project(tmp_path)
+    cache = BuildCache(tmp_path / "cache")
+    source = src.read_text(encoding="utf-8")
+    assembler = Assembler(source, filename=str(src))
+    result = assembler.assemble()
+    assert assembler.included_files == [(tmp_path / "defs.inc").resolve()]
+    cache.store(str(src), source, {}, assembler.include_lookups, result)
+
+    cached = cache.lookup(str(src), source, {})
+    assert cached is not None and cached.machine_code == result.machine_code
+    assert cache.lookup(str(src), source, {"optimize": True}) is None
+
+    (tmp_path / "defs.inc").write_text("VALUE: .equ $43\n", encoding="utf-8")
+    assert cache.lookup(str(src), source, {}) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_include_shadowed_earlier_on_the_search_path_misses(tmp_path):
+    src = tmp_path / "prog.asm"
+    src.write_text('        .org $0300\n        .include "macro.inc"\n        RTS\n', encoding="utf-8")
+    assert cli.run_assemble(_args(tmp_path, src)) == 0
+    standard = (tmp_path / "build" / "prog.bin").read_bytes()
+    assert standard[-1] == 0x39 and len(standard) > 2
+
+    # A local macro.inc now comes before std/macro.inc on the search path.
+    (tmp_path / "macro.inc").write_text("        .byte 1\n", encoding="utf-8")
+    assert cli.run_assemble(_args(tmp_path, src)) == 0
+    assert (tmp_path / "build" / "prog.bin").read_bytes() == bytes([0x01, 0x39])
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = BuildCache(tmp_path / "cache", max_bytes=1)
+    source = "        .org $0300\n        RTS\n"
+    result = Assembler(source, filename="a.asm").assemble()
+    cache.store("a.asm", source, {}, [], result)
+    assert list((tmp_path / "cache").iterdir()) == []
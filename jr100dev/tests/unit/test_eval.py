@@ -0,0 +1,61 @@
+import pytest
+
+from jr100dev.asm.encoder import Assembler
+from jr100dev.asm.eval import ExpressionCache, ExpressionError, compile_expression, evaluate
+
+
+def test_literals_and_operators():
+    symbols = {"BASE": 0x0600, "WIDTH": 41}
+    assert evaluate("$FF", symbols, "t:1") == 0xFF
+    assert evaluate("%1010", symbols, "t:1") == 0b1010
+    assert evaluate("'A'", symbols, "t:1") == 0x41
+    assert evaluate("'\\n'", symbols, "t:1") == 0x0A
+    assert evaluate("BASE + WIDTH * 2", symbols, "t:1") == 0x0600 + 82
+    assert evaluate("((BASE >> 8) & $00FF)", symbols, "t:1") == 0x06
+    assert evaluate("<BASE+1", symbols, "t:1") == 0x01
+    assert evaluate(">BASE", symbols, "t:1") == 0x06
+    assert evaluate("-1", symbols, "t:1") == 0xFFFF
+    assert evaluate("WIDTH / 2", symbols, "t:1") == 20
+
+
+def test_compiled_expression_folds_constants_and_tracks_symbols():
+    constant = compile_expression("(3 + 4) << 2", "t:1")
+    assert constant.constant == 28
+    assert constant.symbols == frozenset()
+    compiled = compile_expression("base + OFFSET", "t:1")
+    assert compiled.constant is None
+    assert compiled.symbols == {"BASE", "OFFSET"}
+    assert compiled.evaluate({"BASE": 1, "OFFSET": 2}, "t:1") == 3
+
+
+def test_expression_errors():
+    with pytest.raises(ExpressionError, match="Undefined symbol MISSING"):
+        evaluate("MISSING + 1", {}, "t:1")
+    with pytest.raises(ExpressionError, match="Division by zero"):
+        evaluate("1 / 0", {}, "t:1")
+    with pytest.raises(ExpressionError, match="Invalid expression"):
+        evaluate("__import__('os')", {}, "t:1")
+    with pytest.raises(ExpressionError, match="Invalid expression"):
+        evaluate("(1 + 2", {}, "t:1")
+
+
+def test_expression_cache_reuses_compiled_entries():
+    cache = ExpressionCache()
+    first = cache.compile("LABEL + 1", "t:1")
+    second = cache.compile("LABEL + 1", "t:2")
+    assert first is second
+    assert len(cache) == 1
+    assert cache.evaluate("LABEL + 1", {"LABEL": 9}, "t:3") == 10
+
+
+def test_hi_lo_operators_in_immediates():
+    source = """
+        .org $0300
+TABLE:  .equ $1234
+        LDAA #>TABLE
+        LDAB #<TABLE
+        RTS
+    """
+    result = Assembler(source, filename="hilo.asm").assemble()
+    assert result.machine_code == bytes([0x86, 0x12, 0xC6, 0x34, 0x39])
+    assert result.relocations == []
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+
+from jr100dev.asm.encoder import Assembler
+from jr100dev.link import LinkError, parse_object
+from jr100dev.link.linker import link_objects
+from jr100dev.proj.build import object_from_assembly
+
+SOURCE = """
+        .org $0300
+START:  JSR USED
+        LDX #TABLE
+        RTS
+USED:   LDAA #1
+LOOP:   DECA
+        BNE LOOP
+NEXT:   STAA FLAG
+        RTS
+UNUSED: LDAA #2
+        RTS
+EXPORTED:
+        RTS
+        .data
+TABLE:  .byte 1, 2, 3
+        .bss
+FLAG:   .res 1
+SPARE:  .res 16
+"""
+
+
+def _object(source=SOURCE, **kwargs):
+    return object_from_assembly(Assembler(source, filename="gc.asm", **kwargs).assemble())
+
+
+def test_function_sections_split_text_per_label():
+    result = Assembler(SOURCE, filename="gc.asm", function_sections=True).assemble()
+    names = [section.name for section in result.sections if section.kind == "text"]
+    assert names == ["text.START", "text.USED", "text.LOOP", "text.NEXT", "text.UNUSED", "text.EXPORTED"]
+    references = {(r.section, r.target) for r in result.relocations if r.type == "reference"}
+    assert ("text.START", "USED") in references
+    assert ("text.START", "TABLE") in references
+    # USED falls through into LOOP; NEXT ends in RTS and does not reach UNUSED.
+    assert ("text.USED", "LOOP") in references
+    assert ("text.NEXT", "UNUSED") not in references
+    assert result.to_object_dict()["function_sections"] is True
+    assert parse_object(result.to_object_bytes(), Path("gc.obj")).function_sections
+
+
+def test_gc_sections_keeps_reachable_code_only():
+    plain = link_objects([_object(function_sections=True)])
+    linked = link_objects([_object(function_sections=True)], gc_sections=True)
+    assert "UNUSED" not in linked.symbols
+    assert "SPARE" not in linked.symbols
+    assert {"USED", "LOOP", "NEXT", "TABLE", "FLAG"} <= set(linked.symbols)
+    assert linked.reclaimed_bytes == 3 + 1 + 16
+    start = 0x0300 - linked.origin
+    end = linked.symbols["USED"] - linked.origin
+    assert linked.image[start:end] == plain.image[start:end]
+
+
+def test_gc_sections_honours_exports_and_coarse_objects():
+    linked = link_objects([_object(function_sections=True)], gc_sections=True, exports=["EXPORTED"])
+    assert "EXPORTED" in linked.symbols
+    coarse = link_objects([_object()], gc_sections=True)
+    assert coarse.reclaimed_bytes == 0
+    with pytest.raises(LinkError):
+        link_objects([_object(function_sections=True)], gc_sections=True, exports=["MISSING"])
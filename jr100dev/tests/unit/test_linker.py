@@ -6,7 +6,7 @@ import pytest
 
 from jr100dev.cli.main import run_assemble, run_link
 from jr100dev.link.linker import LinkError, link_objects
-from jr100dev.link.object_loader import load_object
+from jr100dev.link.object_loader import ObjectFormatError, load_object
 
 
 def _assemble_to_object(tmp_path, name: str, source: str):
@@ -204,6 +204,67 @@ BUFFER: .res 8
     assert [segment.address for segment in linked.segments] == [0x0400]
 
 
+def test_large_bss_reserved_and_overlap_detected(tmp_path):
+    obj = _assemble_to_object(
+        tmp_path,
+        "bigbss",
+        """
+        .org $0300
+START:  LDX #BUF
+        RTS
+        .bss
+BUF:    .res $4000
+        """,
+    )
+    linked = link_objects([load_object(obj)], bss_base=0x3000)
+    assert linked.symbols["BUF"] == 0x3000
+    assert [(segment.address, len(segment.data)) for segment in linked.segments] == [(0x0300, 4), (0x3000, 0x4000)]
+
+    clash = _assemble_to_object(
+        tmp_path,
+        "clash",
+        """
+        .org $5000
+        RTS
+        """,
+    )
+    with pytest.raises(LinkError, match=r"\$5000"):
+        link_objects([load_object(obj), load_object(clash)], bss_base=0x3000)
+
+
+def test_relink_reuses_resolved_relocations(tmp_path):
+    caller = _assemble_to_object(
+        tmp_path,
+        "caller",
+        """
+        .org $0300
+        JSR TARGET
+        RTS
+        """,
+    )
+    callee = _assemble_to_object(
+        tmp_path,
+        "callee",
+        """
+        .org $0320
+TARGET: LDX #SCRATCH
+        RTS
+        .bss
+SCRATCH: .res 2
+        """,
+    )
+    objects = [load_object(caller), load_object(callee)]
+    first = link_objects(objects, bss_base=0x4000)
+    table = objects[0].resolved_relocations
+    assert table is not None and table[0].target == "TARGET"
+    second = link_objects(objects, bss_base=0x5000)
+    assert objects[0].resolved_relocations is table
+    assert first.symbols["SCRATCH"] == 0x4000
+    assert second.symbols["SCRATCH"] == 0x5000
+    assert second.symbols["TARGET"] == 0x0320
+    assert second.image[1:3] == bytes([0x03, 0x20])
+
+
 def test_cli_link_command(tmp_path):
     obj1 = _assemble_to_object(
         tmp_path,
@@ -308,3 +369,88 @@ def _parse_prg_sections(path):
         offset += length
         sections.append((ident, payload))
     return sections
+
+
+def test_binary_object_round_trip_matches_json(tmp_path):
+    source = """
+        .org $0300
+START:  LDAA #$2A
+        JSR EXTERN
+        BRA START
+        .data
+TABLE:  .byte 1, 2, 3
+        .bss
+BUF:    .res 16
+    """
+    json_path = _assemble_to_object(tmp_path, "both", source)
+    bin_path = tmp_path / "both.obj"
+    args = SimpleNamespace(
+        source=tmp_path / "both.asm",
+        output=tmp_path / "both_bin.prg",
+        bin=None,
+        obj=bin_path,
+        map=None,
+        lst=None,
+        entry=None,
+        name=None,
+        comment=None,
+    )
+    assert run_assemble(args) == 0
+    assert bin_path.read_bytes()[:4] == b"JROB"
+    assert bin_path.stat().st_size * 2 < json_path.stat().st_size
+
+    from_json = load_object(json_path)
+    from_binary = load_object(bin_path)
+    assert from_binary.origin == from_json.origin
+    assert from_binary.entry_point == from_json.entry_point
+    assert from_binary.symbols == from_json.symbols
+    assert from_binary.relocations == from_json.relocations
+    assert [(s.name, s.kind, s.address, bytes(s.data), s.bss_size) for s in from_binary.sections] == [
+        (s.name, s.kind, s.address, bytes(s.data), s.bss_size) for s in from_json.sections
+    ]
+
+
+def test_corrupt_binary_object_rejected(tmp_path):
+    path = tmp_path / "broken.obj"
+    path.write_bytes(b"JROB\x02\x00")
+    with pytest.raises(ObjectFormatError):
+        load_object(path)
+
+
+def test_binary_object_sections_are_zero_copy_views(tmp_path):
+    src = tmp_path / "view.asm"
+    src.write_text(
+        """
+        .org $0300
+START:  LDAA #1
+        JSR EXTERN
+        RTS
+        """
+    )
+    obj_path = tmp_path / "view.obj"
+    args = SimpleNamespace(
+        source=src,
+        output=tmp_path / "view.prg",
+        bin=None,
+        obj=obj_path,
+        map=None,
+        lst=None,
+        entry=None,
+        name=None,
+        comment=None,
+    )
+    assert run_assemble(args) == 0
+    target = _assemble_to_object(
+        tmp_path,
+        "extern",
+        """
+        .org $0320
+EXTERN: RTS
+        """,
+    )
+
+    obj = load_object(obj_path)
+    assert isinstance(obj.sections[0].data, memoryview)
+    assert obj.backing is not None
+    result = link_objects([obj, load_object(target)])
+    assert result.image[:6] == bytes([0x86, 0x01, 0xBD, 0x03, 0x20, 0x39])
@@ -1,4 +1,10 @@
-from jr100dev.asm.encoder import Assembler
+from types import SimpleNamespace
+
+import pytest
+
+from jr100dev.asm.encoder import Assembler, AssemblyError
+from jr100dev.asm.preprocessor import Expansion, IncludeCache, MacroDefinition, preprocess_lines, preprocess_source
+from jr100dev.cli.main import run_assemble
 
 
 def _assemble_with_macros(tmp_path, body: str):
@@ -59,3 +65,133 @@ GREETING: .ascii "HI\\0"
     assert symbols["STD_SRC_PTR"] >= result.origin
     assert "__STD_PRINT_STR" in symbols
     assert "__STD_CLEAR_VRAM" in symbols
+
+
+def test_expanded_lines_keep_their_original_location(tmp_path):
+    body = """
+        LDX #STD_VRAM_BASE
+        PUT_CHAR
+        RTS
+    """
+    result = _assemble_with_macros(tmp_path, body)
+    locations = {
+        em.line.text.strip(): result.source_location(em.line.line_no)
+        for em in result.emissions
+        if em.address is not None
+    }
+    program = str(tmp_path / "program.asm")
+    assert locations["LDX #STD_VRAM_BASE"] == (program, 5)
+    # Macro bodies point at the invocation line.
+    assert locations["STAA ,X"] == (program, 6)
+    assert locations["RTS"] == (program, 7)
+    assert any(path.endswith("macro.inc") for path, _ in locations.values())
+
+
+def test_errors_point_at_the_included_file_and_macro_body_line(tmp_path):
+    (tmp_path / "ctl.inc").write_text(
+        "MACRO STEP N\n        INCA\n        JMP #\\N\nENDM\n        LDAA #1\n",
+        encoding="utf-8",
+    )
+    source_path = tmp_path / "main.asm"
+    source = '        .org $0300\n        .include "ctl.inc"\n        STEP 1\n'
+    source_path.write_text(source, encoding="utf-8")
+    with pytest.raises(AssemblyError) as excinfo:
+        Assembler(source, filename=str(source_path)).assemble()
+    ctl = (tmp_path / "ctl.inc").resolve()
+    assert str(excinfo.value).startswith(f"{source_path}:3 (macro STEP at {ctl}:3): ")
+    # Expression errors name the line after the include, not the expanded line number.
+    with pytest.raises(AssemblyError, match=r"Division by zero at .*main\.asm:3$"):
+        Assembler('        .org $0300\n        .include "ctl.inc"\n        LDAA #1/0\n', filename=str(source_path)).assemble()
+
+    records = list(
+        preprocess_lines(source, filename=str(source_path), include_dirs=[], cache=IncludeCache())
+    )
+    assert [(record.text, record.file, record.line) for record in records] == [
+        (".org $0300", str(source_path), 1),
+        ("LDAA #1", str(ctl), 5),
+        ("        INCA", str(source_path), 3),
+        ("        JMP #1", str(source_path), 3),
+    ]
+    assert records[2].expansion == (Expansion("STEP", str(ctl), 2),)
+
+
+def test_listing_numbers_rows_by_their_own_file_and_line(tmp_path):
+    (tmp_path / "ctl.inc").write_text("\nMACRO TWICE\n        INCA\n        INCA\nENDM\n        NOP\n", encoding="utf-8")
+    source_path = tmp_path / "main.asm"
+    source_path.write_text('        .org $0300\n        .include "ctl.inc"\n\n        TWICE\n        RTS\n')
+    args = SimpleNamespace(
+        source=source_path,
+        output=tmp_path / "main.prg",
+        bin=None,
+        obj=None,
+        map=None,
+        lst=tmp_path / "main.lst",
+        entry=None,
+        name=None,
+        comment=None,
+        no_cache=True,
+    )
+    assert run_assemble(args) == 0
+    rows = [row for row in args.lst.read_text().splitlines() if "----" not in row]
+    ctl = (tmp_path / "ctl.inc").resolve()
+    assert [row if "====" in row else row[:9] for row in rows] == [
+        "0001 ....",
+        f"     ==== {ctl}",
+        "0006 0300",
+        f"     ==== {source_path}",
+        # Both expanded lines carry the invocation line.
+        "0004 0301",
+        "0004 0302",
+        "0005 0303",
+    ]
+
+
+def test_include_cache_parses_each_file_once_and_reloads_on_change(tmp_path):
+    cache = IncludeCache()
+    shared = tmp_path / "shared.inc"
+    shared.write_text("MACRO TWICE REG\n        INC\\REG\n        INC\\REG\nENDM\n", encoding="utf-8")
+    sources = []
+    for name in ("a", "b"):
+        path = tmp_path / f"{name}.asm"
+        path.write_text('        .include "shared.inc"\n        TWICE A\n', encoding="utf-8")
+        sources.append(path)
+
+    outputs = [
+        preprocess_source(path.read_text(), filename=str(path), include_dirs=[], cache=cache) for path in sources
+    ]
+    assert outputs[0] == outputs[1]
+    assert "INCA" in outputs[0]
+    assert (cache.misses, cache.hits) == (1, 1)
+    (entry,) = cache.entries.values()
+    assert [macro.name for macro in entry.macros] == ["TWICE"]
+
+    shared.write_text("MACRO TWICE REG\n        DEC\\REG\n        DEC\\REG\n        NOP\nENDM\n", encoding="utf-8")
+    output = preprocess_source(sources[0].read_text(), filename=str(sources[0]), include_dirs=[], cache=cache)
+    assert "DECA" in output
+    assert (cache.misses, cache.hits) == (2, 1)
+
+
+def test_macro_body_is_compiled_once_into_segments(tmp_path):
+    definition = MacroDefinition(
+        name="PAIR",
+        params=["DST", "VALUE"],
+        lines=["L\\@: LDAA #\\VALUE ; load \\1", "        STAA \\DST  "],
+        defined_at="inline:1",
+    )
+    assert definition.template == [["L", -1, ": LDAA #", 1, " ;load \\1"], ["        STAA ", 0]]
+
+    source = """
+MACRO PAIR DST, VALUE
+L\\@:    LDAA #\\VALUE ; keep \\DST here
+        STAA \\DST
+ENDM
+        PAIR $10, $20
+        PAIR $11, $21
+"""
+    output = preprocess_source(source, filename=str(tmp_path / "p.asm"), include_dirs=[])
+    assert [line.strip() for line in output.splitlines() if line.strip()] == [
+        "L__PAIR_0001:    LDAA #$20 ;keep \\DST here",
+        "STAA $10",
+        "L__PAIR_0002:    LDAA #$21 ;keep \\DST here",
+        "STAA $11",
+    ]
@@ -0,0 +1,124 @@
+from jr100dev.asm.encoder import Assembler
+from jr100dev.sim import MB8861
+
+PROGRAM = """
+        .org $0300
+        .include "ctl.inc"
+START:  ADD8 COUNT, #1
+        ADD8 COUNT, #2
+        FOR_BEGIN TOP, DONE, I, 0, 3
+        IF_EQ NEXT, I, 2
+        JSR BUMP
+NEXT:
+        FOR_END TOP, DONE, I
+        JSR FINISH
+STOP:   BRA STOP
+BUMP:   INC COUNT
+        RTS
+FINISH: LDAB COUNT
+        STAB RESULT
+        RTS
+COUNT:  .byte 0
+I:      .byte 0
+RESULT: .byte 0
+"""
+
+
+def _assemble(source: str, optimize: bool):
+    return Assembler(source, filename="peephole.asm", optimize=optimize).assemble()
+
+
+def _rules(result):
+    return [rewrite.rule for rewrite in result.peephole]
+
+
+def test_rewrites_ctl_macro_output_and_keeps_behaviour():
+    plain = _assemble(PROGRAM, optimize=False)
+    optimized = _assemble(PROGRAM, optimize=True)
+    assert plain.peephole == []
+    assert _rules(optimized) == ["redundant-load", "clear-register"]
+    assert len(optimized.machine_code) == len(plain.machine_code) - 4
+
+    results = []
+    for result in (plain, optimized):
+        cpu = MB8861()
+        cpu.load(result.origin, result.machine_code)
+        cpu.reset(result.origin)
+        outcome = cpu.run(max_cycles=10_000)
+        assert outcome.reason == "halt"
+        results.append((cpu.memory[result.symbols["RESULT"]], cpu.cycles))
+    assert results[0][0] == results[1][0] == 4
+    assert results[1][1] < results[0][1]
+
+
+def test_tail_call_becomes_jump_and_drops_rts():
+    result = _assemble(
+        """
+        .org $0300
+MAIN:   JSR SUB
+        RTS
+SUB:    RTS
+        """,
+        optimize=True,
+    )
+    assert result.machine_code == bytes([0x7E, 0x03, 0x03, 0x39])
+    (rewrite,) = result.peephole
+    assert (rewrite.rule, rewrite.bytes_saved, rewrite.cycles_saved) == ("tail-call", 1, 9 + 5 - 3)
+    assert result.symbols["SUB"] == 0x0303
+
+
+def test_branch_chains_are_retargeted():
+    result = _assemble(
+        """
+        .org $0300
+        TSTA
+        BEQ HOP
+        JMP ONE
+ONE:    JMP TWO
+HOP:    BRA TWO
+TWO:    RTS
+        """,
+        optimize=True,
+    )
+    assert [(rewrite.rule, rewrite.cycles_saved) for rewrite in result.peephole] == [
+        ("branch-chain", 4),
+        ("branch-chain", 3),
+    ]
+    assert result.machine_code[1:6] == bytes([0x27, 0x08, 0x7E, 0x03, 0x0B])
+
+
+def test_labelled_or_io_lines_are_left_alone():
+    result = _assemble(
+        """
+        .org $0300
+        STAA $C800
+        LDAA $C800
+        STAA BUF
+AGAIN:  LDAA BUF
+        LDAA #0
+        RTS
+BUF:    .byte 0
+        """,
+        optimize=True,
+    )
+    # VIA reads, a labelled reload and a CLRA before RTS (carry may be live) stay.
+    assert result.peephole == []
+
+
+def test_symbols_and_dependent_equ_follow_removed_bytes():
+    result = _assemble(
+        """
+        .org $0300
+        STAA BUF
+        LDAA BUF
+TABLE:  .byte 1, 2
+AFTER:  .equ TABLE + 2
+        LDX #AFTER
+BUF:    .byte 0
+        """,
+        optimize=True,
+    )
+    assert _rules(result) == ["redundant-load"]
+    assert result.symbols["TABLE"] == 0x0303
+    assert result.symbols["AFTER"] == 0x0305
+    assert result.machine_code[5:8] == bytes([0xCE, 0x03, 0x05])
@@ -0,0 +1,96 @@
+import io
+from types import SimpleNamespace
+
+from jr100dev.asm.encoder import Assembler
+from jr100dev.cli.main import run_profile
+from jr100dev.link import pack_prg
+from jr100dev.sim import (
+    MB8861,
+    RoutineIndex,
+    load_prg,
+    profile_run,
+    source_lines,
+    write_collapsed,
+    write_report,
+)
+
+MAIN = """
+        .org $0300
+START:  JSR FILL
+STOP:   BRA STOP
+        .include "lib.inc"
+"""
+
+LIB = """
+FILL:   LDX #$0400
+        CLRA
+FILL_LOOP:
+        STAA ,X
+        INX
+        CPX #$0404
+        BNE FILL_LOOP
+        RTS
+"""
+
+
+def _assemble(tmp_path):
+    (tmp_path / "lib.inc").write_text(LIB, encoding="utf-8")
+    source = tmp_path / "main.asm"
+    source.write_text(MAIN, encoding="utf-8")
+    return Assembler(MAIN, filename=str(source)).assemble()
+
+
+def test_cycles_fold_back_to_included_source_lines(tmp_path):
+    result = _assemble(tmp_path)
+    cpu = MB8861()
+    load_prg(cpu, pack_prg(result.origin, result.machine_code, result.entry_point))
+    outcome, profile = profile_run(cpu, max_cycles=1000)
+    assert outcome.reason == "halt"
+
+    # JSR 9 + LDX 3 + CLRA 2 + 4 * (STAA 6 + INX 4 + CPX 3 + BNE 4) + RTS 5 + BRA 4
+    assert profile.total == 9 + 3 + 2 + 4 * 17 + 5 + 4
+    assert profile.cycles[result.symbols["FILL_LOOP"]] == 4 * 6
+
+    lines = source_lines([result], result.symbols)
+    location = lines[result.symbols["FILL_LOOP"]]
+    assert location.file.endswith("lib.inc")
+    assert location.line == 5
+    assert location.text.startswith("STAA")
+
+    routines = RoutineIndex(result.symbols, [(0x0300, 0x0300 + len(result.machine_code))])
+    report = io.StringIO()
+    write_report(report, profile, routines, lines, clock_hz=1_000_000)
+    assert "FILL_LOOP" in report.getvalue().splitlines()[3]
+
+    collapsed = io.StringIO()
+    write_collapsed(collapsed, profile, routines)
+    folded = dict(line.rsplit(" ", 1) for line in collapsed.getvalue().splitlines())
+    assert folded["START"] == "9"
+    assert folded["START;STOP"] == "4"
+    assert folded["START;FILL;FILL_LOOP"] == str(4 * 17 + 5)  # loop plus RTS
+
+
+def test_cli_profile_writes_report_and_collapsed_stacks(tmp_path, capsys):
+    result = _assemble(tmp_path)
+    prg = tmp_path / "main.prg"
+    prg.write_bytes(pack_prg(result.origin, result.machine_code, result.entry_point))
+    (tmp_path / "main.map").write_text(
+        "".join(f"{name} = ${value:04X}\n" for name, value in result.symbols.items()), encoding="utf-8"
+    )
+    args = SimpleNamespace(
+        program=prg,
+        map=None,
+        source=[tmp_path / "main.asm"],
+        call=[],
+        poke=["$0400=$55"],
+        reg=["A=1"],
+        max_cycles=10_000,
+        clock_hz=894_000,
+        limit=0,
+        output=tmp_path / "report.txt",
+        collapsed=tmp_path / "main.folded",
+    )
+    assert run_profile(args) == 0
+    assert "stopped by halt" in capsys.readouterr().err
+    assert "lib.inc:5" in args.output.read_text()
+    assert "START;FILL;FILL_LOOP 73" in args.collapsed.read_text()
@@ -0,0 +1,73 @@
+from jr100dev.asm.encoder import Assembler
+from jr100dev.link import pack_prg, unpack_prg
+from jr100dev.sim import MB8861, RETURN_SENTINEL, cycles_for, load_prg
+
+SOURCE = """
+        .org $0300
+START:  LDAA #5
+        CLRB
+LOOP:   ADDB #3
+        DECA
+        BNE LOOP
+        STAB RESULT
+        LDX #TABLE
+        LDAA 1,X
+        STAA RESULT+1
+        JSR DOUBLE
+STOP:   BRA STOP
+DOUBLE: ASLB
+        STAB RESULT+2
+        RTS
+TABLE:  .byte $11, $22, $33
+RESULT: .res 3
+"""
+
+
+def _load(source: str = SOURCE):
+    result = Assembler(source, filename="sim.asm").assemble()
+    payload = pack_prg(result.origin, result.machine_code, result.entry_point, comment="sim")
+    cpu = MB8861()
+    image = load_prg(cpu, payload)
+    return cpu, result, image
+
+
+def test_prg_round_trip_and_run_to_halt():
+    cpu, result, image = _load()
+    assert image.entry_point == 0x0300
+    assert unpack_prg(pack_prg(0x0300, b"\x01", 0x0300)).segments == [(0x0300, b"\x01")]
+
+    outcome = cpu.run(max_cycles=10_000)
+    assert outcome.reason == "halt"
+    assert outcome.pc == result.symbols["STOP"]
+    base = result.symbols["RESULT"]
+    assert cpu.memory[base : base + 3] == bytes([15, 0x22, 30])
+    assert cpu.sp == 0x0244
+
+
+def test_cycle_counts_follow_the_data_sheet():
+    cpu, _, _ = _load()
+    assert cycles_for("LDAA", "imm") == 2
+    assert cycles_for("JSR", "ext") == 9
+    assert cpu.step() == 2
+    assert cpu.cycles == 2
+
+
+def test_breakpoint_and_call():
+    cpu, result, _ = _load()
+    outcome = cpu.run(breakpoints=[result.symbols["DOUBLE"]], max_cycles=10_000)
+    assert outcome.reason == "breakpoint"
+    assert outcome.pc == result.symbols["DOUBLE"]
+
+    cpu.reset(result.symbols["DOUBLE"])
+    cpu.b = 0x81
+    outcome = cpu.call(result.symbols["DOUBLE"], max_cycles=100)
+    assert outcome.reason == "breakpoint"
+    assert outcome.pc == RETURN_SENTINEL
+    assert cpu.b == 0x02
+    assert cpu.cc & 0x01  # carry out of ASLB
+
+
+def test_illegal_opcode_stops_the_run():
+    cpu = MB8861()
+    cpu.reset(0x0300)
+    assert cpu.run(max_instructions=10).reason == "illegal"
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+from jr100dev.analysis import analyze_stack, memory_image
+from jr100dev.asm.encoder import Assembler
+from jr100dev.cli.main import run_assemble
+from jr100dev.sim import read_map
+
+SOURCE = """
+        .org $0300
+START:  LDS #$0244
+        JSR OUTER
+        JSR OUTER
+STOP:   BRA STOP
+OUTER:  PSHA
+        PSHB
+        BSR INNER
+        PULB
+        PULA
+        RTS
+INNER:  DES
+        INS
+        RTS
+GROW:   PSHA
+        BNE GROW
+        RTS
+REC:    TSTA
+        BEQ DONE
+        DECA
+        BSR REC
+DONE:   RTS
+"""
+
+
+def _report(*entries):
+    result = Assembler(SOURCE).assemble()
+    roots = [result.entry_point] + [result.symbols[name] for name in entries]
+    return analyze_stack(memory_image(result.origin, result.machine_code), roots, result.symbols)
+
+
+def test_depth_adds_pushes_and_return_addresses_along_the_deepest_chain():
+    report = _report()
+    outer = report.routine("OUTER")
+    assert (outer.frame, outer.depth) == (2, 2 + 2 + 1)
+    start = report.routine("START")
+    assert start.depth == 2 + outer.depth
+    assert [report.routines[address].name for address in start.chain] == ["START", "OUTER", "INNER"]
+    assert [report.routines[address].name for address in start.calls] == ["OUTER"]
+    assert any("resets S" in note for note in start.notes)
+
+
+def test_unbalanced_loops_and_recursion_are_unbounded():
+    report = _report("GROW", "REC")
+    assert report.routine("GROW").depth is None
+    assert any("differs between paths" in note for note in report.routine("GROW").notes)
+    rec = report.routine("REC")
+    assert rec.depth is None
+    assert rec.calls == [rec.address]
+
+
+def test_cli_appends_stack_report_to_map(tmp_path, capsys):
+    source = tmp_path / "main.asm"
+    source.write_text(SOURCE, encoding="utf-8")
+    args = SimpleNamespace(
+        source=source,
+        output=tmp_path / "main.prg",
+        bin=None,
+        obj=None,
+        map=tmp_path / "main.map",
+        lst=None,
+        entry=None,
+        name=None,
+        comment=None,
+        stack_usage=True,
+        stack_entry=[],
+    )
+    assert run_assemble(args) == 0
+    assert "Stack depth from START: 7 byte(s)" in capsys.readouterr().out
+    text = args.map.read_text()
+    assert "; OUTER -> INNER" in text
+    assert read_map(args.map) == Assembler(SOURCE).assemble().symbols
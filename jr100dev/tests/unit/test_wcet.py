@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+from jr100dev.analysis import analyze_wcet, loop_bounds, memory_image
+from jr100dev.asm.encoder import Assembler
+from jr100dev.cli.main import run_analyze
+from jr100dev.link import pack_prg
+from jr100dev.sim import MB8861, profile_call
+
+SOURCE = """
+        .org $0300
+        .include "ctl.inc"
+START:  JSR WORK
+STOP:   BRA STOP
+WORK:   FOR_BEGIN TOP, DONE, I, 1, 4
+        LDAB #3
+INNER:  DECB            ; @loop 3
+        BNE INNER
+        JSR LEAF
+        FOR_END TOP, DONE, I
+        RTS
+LEAF:   NOP
+        RTS
+SPIN:   DEX
+        BNE SPIN
+        RTS
+I:      .byte 0
+"""
+
+
+def _assemble(tmp_path):
+    source = tmp_path / "main.asm"
+    source.write_text(SOURCE, encoding="utf-8")
+    return Assembler(SOURCE, filename=str(source)).assemble()
+
+
+def test_worst_case_matches_simulated_cycles_of_bounded_loops(tmp_path):
+    result = _assemble(tmp_path)
+    work = result.symbols["WORK"]
+    routines = analyze_wcet(
+        memory_image(result.origin, result.machine_code), work, result.symbols, loop_bounds([result], result.symbols)
+    )
+
+    cpu = MB8861()
+    cpu.load(result.origin, result.machine_code)
+    _, profile = profile_call(cpu, work, max_cycles=10_000)
+    assert routines[work].cycles == profile.total
+
+    outer, inner = routines[work].loops
+    assert (outer.iterations, outer.repeats, outer.origin.endswith("FOR_BEGIN")) == (4, 4, True)
+    assert (inner.iterations, inner.repeats, inner.origin.endswith("@loop")) == (3, 2, True)
+    assert routines[result.symbols["LEAF"]].cycles == 2 + 5
+
+
+def test_unannotated_loop_is_unbounded(tmp_path):
+    result = _assemble(tmp_path)
+    spin = result.symbols["SPIN"]
+    routine = analyze_wcet(memory_image(result.origin, result.machine_code), spin, result.symbols, {})[spin]
+    assert routine.cycles is None
+    assert "has no bound" in routine.notes[0]
+
+
+def test_cli_fails_when_budget_is_exceeded(tmp_path, capsys):
+    result = _assemble(tmp_path)
+    prg = tmp_path / "main.prg"
+    prg.write_bytes(pack_prg(result.origin, result.machine_code, result.entry_point))
+    (tmp_path / "main.map").write_text(
+        "".join(f"{name} = ${value:04X}\n" for name, value in result.symbols.items()), encoding="utf-8"
+    )
+    args = SimpleNamespace(
+        program=prg,
+        map=None,
+        source=[tmp_path / "main.asm"],
+        wcet=["work"],
+        budget=100,
+        clock_hz=894_000,
+    )
+    assert run_analyze(args) == 1
+    captured = capsys.readouterr()
+    assert "WORK: worst case 246 cycles" in captured.out
+    assert "main.asm:6" in captured.out  # the FOR_BEGIN line
+    assert "exceeds the frame budget (246 > 100 cycles)" in captured.err
+
+    args.budget = 300
+    assert run_analyze(args) == 0
@@ -0,0 +1,99 @@
+import pytest
+
+from jr100dev.asm.encoder import Assembler, AssemblyError
+from jr100dev.link.linker import LinkError, link_objects
+from jr100dev.link.pack_prg import pack_prg
+from jr100dev.link.zeropage import allocate_zero_page, parse_zp_range
+from jr100dev.proj import object_from_assembly
+from jr100dev.sim import MB8861, RoutineIndex, load_prg, profile_run, variable_accesses
+
+VARIABLES = """
+        .zp
+COUNT:  .res 1
+PTR:    .res 2
+        .code
+"""
+
+MAIN = """
+        .org $0300
+        .include "vars.inc"
+START:  LDAA COUNT
+        ADDA #1
+        STAA COUNT
+        INC COUNT
+        LDX #PTR
+        JSR BUMP
+STOP:   BRA STOP
+"""
+
+LIB = """
+        .org $0340
+        .include "vars.inc"
+BUMP:   LDX PTR
+        INX
+        STX PTR
+        RTS
+"""
+
+
+def _objects(tmp_path):
+    (tmp_path / "vars.inc").write_text(VARIABLES, encoding="utf-8")
+    objects = []
+    for name, source in (("main", MAIN), ("lib", LIB)):
+        path = tmp_path / f"{name}.asm"
+        path.write_text(source, encoding="utf-8")
+        objects.append(object_from_assembly(Assembler(source, filename=str(path)).assemble()))
+    return objects
+
+
+def test_linker_places_shared_variables_and_counts_direct_savings(tmp_path):
+    result = link_objects(_objects(tmp_path), zp_ranges=[parse_zp_range("$C0-$FF")])
+
+    assert result.symbols["COUNT"] == 0xC0
+    assert result.symbols["PTR"] == 0xC1
+    # LDAA/STAA use DIR; INC has no direct form and keeps a 16-bit operand.
+    assert result.image[:10] == bytes([0x96, 0xC0, 0x8B, 0x01, 0x97, 0xC0, 0x7C, 0x00, 0xC0, 0xCE])
+    bump = result.symbols["BUMP"] - result.origin
+    assert result.image[bump : bump + 5] == bytes([0xDE, 0xC1, 0x08, 0xDF, 0xC1])
+
+    report = {allocation.name: allocation for allocation in result.zero_page}
+    assert (report["COUNT"].references, report["COUNT"].bytes_saved, report["COUNT"].cycles_saved) == (2, 2, 2)
+    assert (report["PTR"].references, report["PTR"].bytes_saved) == (2, 2)
+
+
+def test_hints_place_hot_variables_first_and_overflow_is_reported(tmp_path):
+    objects = _objects(tmp_path)
+    result = link_objects(objects, zp_ranges=[(0xC0, 0x100)], zp_hints={"PTR": 40, "COUNT": 3})
+    assert result.symbols["PTR"] == 0xC0
+    assert result.symbols["COUNT"] == 0xC2
+    assert result.zero_page[0].accesses == 40
+
+    with pytest.raises(LinkError, match="need a free range"):
+        link_objects(objects)
+    with pytest.raises(LinkError, match=r"full.*COUNT"):
+        link_objects(objects, zp_ranges=[(0xC0, 0xC2)], zp_hints={"PTR": 40, "COUNT": 3})
+
+
+def test_allocator_skips_occupied_bytes_and_keeps_declaration_order():
+    placed, unplaced = allocate_zero_page({"A": 1, "B": 2, "C": 4}, [(0x80, 0x86)], occupied=[(0x81, 0x82)])
+    assert placed == {"A": 0x80, "B": 0x82}
+    assert unplaced == ["C"]
+
+
+def test_zp_section_only_accepts_labelled_res():
+    with pytest.raises(AssemblyError, match=".zp only accepts"):
+        Assembler("        .zp\nVAL:    .byte 1\n").assemble()
+    with pytest.raises(AssemblyError):
+        Assembler("        .zp\n        .res 1\n").assemble()
+
+
+def test_profiler_counts_variable_accesses(tmp_path):
+    result = link_objects(_objects(tmp_path), zp_ranges=[(0xC0, 0x100)])
+    cpu = MB8861()
+    load_prg(cpu, pack_prg(result.origin, result.image, result.entry_point))
+    outcome, profile = profile_run(cpu, max_cycles=1000)
+    assert outcome.reason == "halt"
+
+    variables = {name: result.symbols[name] for name in ("COUNT", "PTR")}
+    counts = variable_accesses(profile, cpu.memory, RoutineIndex(variables, [(0xC0, 0xC3)]))
+    assert counts == {"COUNT": 3, "PTR": 2}
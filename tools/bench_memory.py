@@ -0,0 +1,70 @@
+"""Memory benchmark for the assembler's intermediate state.
+
+Assembles a synthetic program whose macro invocations expand to `--lines`
+lines and reports, via tracemalloc, the peak allocated during assembly and
+what the returned `AssemblyResult` (parsed lines, emissions, sections and
+relocations) keeps alive afterwards.
+
+    PYTHONPATH=. python tools/bench_memory.py --lines 30000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from typing import List
+
+from jr100dev.asm.encoder import Assembler
+from jr100dev.asm.preprocessor import INCLUDE_CACHE
+
+# Three body lines per invocation; 5 bytes of code and data per expansion.
+_PRELUDE = """\
+        .org $0300
+MACRO STEP VALUE
+        LDAA #\\VALUE
+        STAA $10
+        .byte \\VALUE, \\VALUE+1
+ENDM
+"""
+
+
+def synthetic_source(lines: int) -> str:
+    body = [_PRELUDE]
+    for index in range(lines // 3):
+        body.append(f"        STEP {index & 0x7F}\n")
+    body.append("        RTS\n")
+    return "".join(body)
+
+
+def measure(source: str) -> tuple[int, int]:
+    """Return (peak bytes during assembly, bytes retained by the result)."""
+    INCLUDE_CACHE.clear()
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = Assembler(source, filename="<bench>").assemble()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak - baseline, retained - baseline
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure assembler memory on a synthetic expanded program")
+    parser.add_argument("--lines", type=int, default=30000, help="Expanded source lines (default: 30000)")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    peak, retained = measure(synthetic_source(args.lines))
+    print(f"lines:    {args.lines}")
+    print(f"peak:     {peak / 1024 / 1024:8.2f} MiB ({peak / args.lines:.0f} bytes/line)")
+    print(f"retained: {retained / 1024 / 1024:8.2f} MiB ({retained / args.lines:.0f} bytes/line)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
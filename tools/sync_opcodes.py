@@ -16,6 +16,7 @@ class OpcodeEntry:
     addressing: str
     opcode: int
     size: int
+    cycles: int
 
 
 def load_cpu_spec(emulator_root: pathlib.Path) -> List[OpcodeEntry]:
@@ -48,6 +49,7 @@ def load_cpu_spec(emulator_root: pathlib.Path) -> List[OpcodeEntry]:
                 addressing=addressing,
                 opcode=opcode,
                 size=size,
+                cycles=instruction_cycles(mnemonic, addressing),
             )
         )
 
@@ -55,6 +57,28 @@ def load_cpu_spec(emulator_root: pathlib.Path) -> List[OpcodeEntry]:
     return entries
 
 
+def instruction_cycles(mnemonic: str, addressing: str) -> int:
+    """Return the MB8861H (6800 compatible) base cycle count from the data sheet.
+
+    Conditional branches take the same number of cycles whether or not they
+    are taken, so every entry is a single fixed value.
+    """
+    special = _SPECIAL_CYCLES.get((mnemonic, addressing))
+    if special is not None:
+        return special
+    if addressing == "INH":
+        return _INHERENT_CYCLES.get(mnemonic, 2)
+    if addressing == "REL":
+        return 4
+    family = mnemonic[:-1] if mnemonic[-1:] in ("A", "B") and mnemonic[:-1] in _FAMILY_MODES else mnemonic
+    for group, families in _CYCLE_GROUPS.items():
+        if family in families:
+            cycles = _CYCLES_BY_MODE[group].get(addressing)
+            if cycles is not None:
+                return cycles
+    raise ValueError(f"No cycle count for {mnemonic} {addressing}")
+
+
 def emit_python(entries: Iterable[OpcodeEntry], target: pathlib.Path) -> None:
     """Write the synchronized opcode table as a Python module."""
     rows = list(entries)
@@ -66,7 +90,7 @@ def emit_python(entries: Iterable[OpcodeEntry], target: pathlib.Path) -> None:
     for entry in rows:
         lines.append(
             f"    {{'mnemonic': {entry.mnemonic!r}, 'addressing': {entry.addressing!r}, "
-            f"'opcode': 0x{entry.opcode:02X}, 'size': {entry.size}}},"
+            f"'opcode': 0x{entry.opcode:02X}, 'size': {entry.size}, 'cycles': {entry.cycles}}},"
         )
     lines.append("]")
     lines.append("")
@@ -81,6 +105,7 @@ def emit_manifest(entries: Iterable[OpcodeEntry], target: pathlib.Path) -> None:
             "addressing": entry.addressing,
             "opcode": entry.opcode,
             "size": entry.size,
+            "cycles": entry.cycles,
         }
         for entry in entries
     ]
@@ -233,6 +258,41 @@ def _estimate_operand_size(func: ast.FunctionDef) -> int:
     return 1 + count8 + (count16 * 2)
 
 
+# Cycle counts per addressing mode for each instruction group (6800 data sheet).
+_CYCLES_BY_MODE = {
+    "alu8": {"IMM": 2, "DIR": 3, "IDX": 5, "EXT": 4},
+    "store8": {"DIR": 4, "IDX": 6, "EXT": 5},
+    "alu16": {"IMM": 3, "DIR": 4, "IDX": 6, "EXT": 5},
+    "store16": {"DIR": 5, "IDX": 7, "EXT": 6},
+    "rmw": {"IDX": 7, "EXT": 6},
+}
+
+_CYCLE_GROUPS = {
+    "alu8": {"ADD", "ADC", "SUB", "SBC", "CMP", "AND", "BIT", "EOR", "ORA", "LDA"},
+    "store8": {"STA"},
+    "alu16": {"LDX", "LDS", "CPX"},
+    "store16": {"STX", "STS"},
+    "rmw": {"NEG", "COM", "LSR", "ROR", "ASR", "ASL", "ROL", "DEC", "INC", "TST", "CLR"},
+}
+
+_FAMILY_MODES = set().union(*_CYCLE_GROUPS.values())
+
+_INHERENT_CYCLES = {
+    "INX": 4, "DEX": 4, "INS": 4, "DES": 4, "TSX": 4, "TXS": 4,
+    "PSHA": 4, "PSHB": 4, "PULA": 4, "PULB": 4,
+    "RTS": 5, "RTI": 10, "WAI": 9, "SWI": 12,
+}
+
+# Instructions whose timing does not follow their group, including the
+# MB8861H extensions (NIM/OIM/XIM/TMM/ADX).
+_SPECIAL_CYCLES = {
+    ("JMP", "IDX"): 4, ("JMP", "EXT"): 3,
+    ("JSR", "IDX"): 8, ("JSR", "EXT"): 9,
+    ("BSR", "REL"): 8,
+    ("NIM", "IDX"): 8, ("OIM", "IDX"): 8, ("XIM", "IDX"): 8, ("TMM", "IDX"): 7,
+    ("ADX", "IMM"): 3, ("ADX", "EXT"): 7,
+}
+
 _ADDRESSING_MAP = {
     "IMP": "INH",
     "IMM": "IMM",